@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Measure parallel file decoding, and the cost of returning decoded messages
+from the worker processes.
+
+Run from the repository root with::
+
+    python benchmarks/parallel.py [messages] [workers]
+"""
+
+import os
+import pickle
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from starstruct.message import Message  # noqa: E402 pylint: disable=wrong-import-position
+from starstruct.modes import Mode  # noqa: E402 pylint: disable=wrong-import-position
+from starstruct.parallel import record_offsets, unpack_file, unpack_range  # noqa: E402 pylint: disable=wrong-import-position
+
+
+Sample = Message('Sample', [
+    ('x', 'B'),
+    ('y', 'h'),
+], Mode.Big)
+
+Frame = Message('Frame', [
+    ('seq', 'I'),
+    ('source', 'H'),
+    ('length', 'B', 'samples'),
+    ('samples', Sample, 'length'),
+], Mode.Big)
+
+
+def timed(func):
+    start = time.perf_counter()
+    ret = func()
+    return (ret, time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else os.cpu_count()
+
+    data = b''.join(Frame.pack(seq=i, source=i % 7, samples=[{'x': j, 'y': i % 1000} for j in range(i % 4)])
+                    for i in range(count))
+    (fd, path) = tempfile.mkstemp()
+    with os.fdopen(fd, 'wb') as f:
+        f.write(data)
+
+    try:
+        (offsets, skim) = timed(lambda: record_offsets(data, Frame))
+        (msgs, decode) = timed(lambda: unpack_range(data, Frame, 0, len(data)))
+        (pickled, dump) = timed(lambda: pickle.dumps(msgs, pickle.HIGHEST_PROTOCOL))
+        (_, load) = timed(lambda: pickle.loads(pickled))
+
+        print('{} messages, {} bytes'.format(count, len(data)))
+        print('skim:      {:8.0f} msgs/sec'.format(count / skim))
+        print('decode:    {:8.0f} msgs/sec'.format(count / decode))
+        print('transfer:  {:8.0f} msgs/sec ({:.1f} bytes/msg, {:.0%} of decode time)'.format(
+            count / (dump + load), len(pickled) / count, (dump + load) / decode))
+
+        for num in sorted({1, workers}):
+            (total, elapsed) = timed(lambda: sum(len(batch) for batch in unpack_file(
+                path, Frame, workers=num, offsets=offsets)))
+            print('{} workers: {:8.0f} msgs/sec'.format(num, total / elapsed))
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+"""
+Measure pack/unpack throughput of one message shared by multiple threads.
+
+Run from the repository root with::
+
+    python benchmarks/threads.py [max_threads]
+
+On a CPython build with the GIL the throughput stays roughly constant as
+threads are added, on a free-threaded build it should scale with the number
+of cores.
+"""
+
+import os
+import sys
+import time
+from binascii import crc32
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from starstruct.message import Message  # noqa: E402 pylint: disable=wrong-import-position
+from starstruct.modes import Mode  # noqa: E402 pylint: disable=wrong-import-position
+
+
+def frame_crc(*parts):
+    return crc32(b''.join(parts))
+
+
+Sample = Message('Sample', [
+    ('x', 'B'),
+    ('y', 'h'),
+    ('value', 'F', 'I', 8),
+], Mode.Big)
+
+Frame = Message('Frame', [
+    ('sync', 'H', (0xeb90,)),
+    ('seq', 'I'),
+    ('length', 'B', 'samples'),
+    ('samples', Sample, 'length'),
+    ('crc', 'I', {(frame_crc, b'seq', b'samples')}),
+], Mode.Big)
+
+ITERATIONS = 5000
+
+
+def worker(_):
+    values = {
+        'seq': 1,
+        'samples': [{'x': i, 'y': -i, 'value': i / 4} for i in range(4)],
+    }
+    for i in range(ITERATIONS):
+        values['seq'] = i
+        Frame.unpack(Frame.pack(values))
+    return ITERATIONS
+
+
+def main():
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    print('{:>8} {:>12} {:>8}'.format('threads', 'msgs/sec', 'scaling'))
+
+    base = None
+    for threads in range(1, max_threads + 1):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(threads) as executor:
+            total = sum(executor.map(worker, range(threads)))
+        rate = total / (time.perf_counter() - start)
+
+        base = base or rate
+        print('{:>8} {:>12.0f} {:>8.2f}'.format(threads, rate, rate / base))
+
+
+if __name__ == '__main__':
+    main()
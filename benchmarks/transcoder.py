@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+"""
+Measure converting version 1 frames to version 2 frames with a compiled
+transcoder, against unpacking, making and packing each frame.
+
+Run from the repository root with::
+
+    python benchmarks/transcoder.py [messages]
+"""
+
+import enum
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from starstruct.message import Message  # noqa: E402 pylint: disable=wrong-import-position
+from starstruct.modes import Mode  # noqa: E402 pylint: disable=wrong-import-position
+from starstruct.transcoder import transcoder  # noqa: E402 pylint: disable=wrong-import-position
+
+
+class Kind(enum.Enum):
+    data = 1
+    ack = 2
+    nack = 3
+
+
+FrameV1 = Message('FrameV1', [
+    ('kind', 'B', Kind),
+    ('src', 'H'),
+    ('dst', 'H'),
+    ('seq', 'I'),
+    ('length', 'B'),
+    ('name', '8s'),
+    ('temp', 'f'),
+    ('pressure', 'H'),
+], Mode.Big)
+
+FrameV2 = Message('FrameV2', [
+    ('version', 'B'),
+    ('kind', 'H', Kind),
+    ('source', 'H'),
+    ('dst', 'H'),
+    ('seq', 'I'),
+    ('name', '8s'),
+    ('length', 'I'),
+    ('temp', 'd'),
+    ('pressure', 'I'),
+], Mode.Big)
+
+MAPPING = {'source': 'src', 'version': 2}
+
+
+def timed(func):
+    start = time.perf_counter()
+    ret = func()
+    return (ret, time.perf_counter() - start)
+
+
+def round_trip(data):
+    out = bytearray()
+    offset = 0
+    while offset < len(data):
+        (msg, offset) = FrameV1.unpack_from(data, offset)
+        values = msg._asdict()
+        values['source'] = values.pop('src')
+        values['version'] = 2
+        out += FrameV2.pack(FrameV2.make(values))
+    return bytes(out)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    data = b''.join(FrameV1.pack(kind=Kind(i % 3 + 1), src=i % 100, dst=i % 7, seq=i, length=i % 256,
+                                 name='node{}'.format(i % 10), temp=i / 4, pressure=i % 60000)
+                    for i in range(count))
+
+    upgrade = transcoder(FrameV1, FrameV2, MAPPING)
+    (expected, slow) = timed(lambda: round_trip(data))
+    (converted, fast) = timed(lambda: upgrade.convert_many(data))
+    assert converted == expected
+
+    print('{} messages, {} copies, {} converted with struct, {} unpacked and packed'.format(
+        count, len(upgrade.copies), len(upgrade.raw_writes), len(upgrade.converted)))
+    print('unpack/make/pack: {:8.0f} msgs/sec'.format(count / slow))
+    print('transcoder:       {:8.0f} msgs/sec ({:.1f}x)'.format(count / fast, slow / fast))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+
+"""
+Measure unpacking and making frames with a trusted variant of a message,
+which doesn't check callable, enum and string values, against the checked
+message.
+
+Run from the repository root with::
+
+    python benchmarks/trusted.py [messages]
+"""
+
+import enum
+import os
+import sys
+import time
+from binascii import crc32
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from starstruct.message import Message  # noqa: E402 pylint: disable=wrong-import-position
+from starstruct.modes import Mode  # noqa: E402 pylint: disable=wrong-import-position
+
+
+class Kind(enum.Enum):
+    data = 1
+    ack = 2
+    nack = 3
+
+
+class Priority(enum.Enum):
+    low = 0
+    normal = 1
+    high = 2
+
+
+def checksum(*fields):
+    return crc32(b''.join(fields))
+
+
+Reading = Message('Reading', [
+    ('sensor', 'B', Kind),
+    ('value', 'H'),
+], Mode.Big)
+
+Frame = Message('Frame', [
+    ('kind', 'B', Kind),
+    ('priority', 'B', Priority),
+    ('seq', 'I'),
+    ('name', '8s'),
+    ('count', 'B', 'readings'),
+    ('readings', Reading, 'count'),
+    ('crc', 'I', {(checksum, b'kind', b'priority', b'seq', b'name')}),
+], Mode.Big)
+
+
+def timed(func):
+    start = time.perf_counter()
+    ret = func()
+    return (ret, time.perf_counter() - start)
+
+
+def unpack_all(message, data):
+    msgs = []
+    offset = 0
+    while offset < len(data):
+        (msg, offset) = message.unpack_from(data, offset)
+        msgs.append(msg)
+    return msgs
+
+
+def make_all(message, values):
+    return [message.make(val) for val in values]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    values = [{
+        'kind': Kind(i % 3 + 1),
+        'priority': Priority(i % 3),
+        'seq': i,
+        'name': 'node{}'.format(i % 10),
+        'readings': [{'sensor': Kind(j % 3 + 1), 'value': i + j} for j in range(4)],
+    } for i in range(count)]
+    data = b''.join(Frame.pack(val) for val in values)
+
+    trusted = Frame.with_mode(trusted=True)
+    (checked_msgs, checked_unpack) = timed(lambda: unpack_all(Frame, data))
+    (trusted_msgs, trusted_unpack) = timed(lambda: unpack_all(trusted, data))
+    assert trusted_msgs == checked_msgs
+
+    made = [msg._asdict() for msg in checked_msgs]
+    (_, checked_make) = timed(lambda: make_all(Frame, made))
+    (_, trusted_make) = timed(lambda: make_all(trusted, made))
+
+    print('{} messages'.format(count))
+    print('unpack checked: {:8.0f} msgs/sec'.format(count / checked_unpack))
+    print('unpack trusted: {:8.0f} msgs/sec ({:.2f}x)'.format(
+        count / trusted_unpack, checked_unpack / trusted_unpack))
+    print('make checked:   {:8.0f} msgs/sec'.format(count / checked_make))
+    print('make trusted:   {:8.0f} msgs/sec ({:.2f}x)'.format(
+        count / trusted_make, checked_make / trusted_make))
+
+
+if __name__ == '__main__':
+    main()
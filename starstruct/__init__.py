@@ -46,4 +46,13 @@ assert BitField
 from starstruct.packedbitfield import PackedBitField
 assert PackedBitField
 
-__all__ = ['Message', 'Mode', 'StarTuple', 'BitField', 'PackedBitField']
+from starstruct.messageset import MessageSet
+assert MessageSet
+
+from starstruct.predicate import Field
+assert Field
+
+from starstruct.transcoder import transcoder
+assert transcoder
+
+__all__ = ['Message', 'Mode', 'StarTuple', 'BitField', 'PackedBitField', 'MessageSet', 'Field', 'transcoder']
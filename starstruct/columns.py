@@ -0,0 +1,202 @@
+"""
+Unpack a buffer of consecutive messages into a column for each field.
+
+.. code-block:: python
+
+    columns = Frame.unpack_columns(capture)
+    mean = sum(columns['temperature']) / len(columns['temperature'])
+
+Numeric, enum, length and fixed point fields are unpacked into array.array
+columns: enum fields hold the raw value of the enum member and fixed point
+fields hold floats.  The other fields (such as strings, varints and
+sub-messages) are unpacked into lists.  No tuple is created for each message,
+except to unpack callable fields, which are unpacked into lists by their
+element so checksums are verified and unpack functions are called.
+
+For fixed size messages each array column is unpacked from the whole buffer
+with a single struct.iter_unpack() call.  If NumPy is installed the array
+columns can be returned as NumPy arrays, which share the memory of the
+arrays.
+"""
+
+import struct
+import types
+from array import array
+
+from starstruct.elementbase import ElementBase
+from starstruct.elementcallable import ElementCallable
+from starstruct.elementenum import ElementEnum
+from starstruct.elementfixedpoint import ElementFixedPoint
+from starstruct.elementlength import ElementLength
+from starstruct.elementnum import ElementNum
+from starstruct.elementvarint import ElementVarint
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover (optional dependency)
+    numpy = None
+
+
+# The array type codes for the struct format characters, the struct sizes
+# are the standard sizes which may be smaller than the native sizes
+TYPECODES = {
+    'b': 'b', 'B': 'B', '?': 'B',
+    'h': 'h', 'H': 'H',
+    'i': 'i', 'I': 'I',
+    'l': 'q', 'L': 'Q',
+    'q': 'q', 'Q': 'Q',
+    'n': 'q', 'N': 'Q',
+    'e': 'f', 'f': 'f', 'd': 'd',
+}
+
+
+def _array_column(elem):
+    """
+    Return the array type code and struct format character of an element
+    that is unpacked into an array, or None.
+    """
+    if not isinstance(elem, (ElementBase, ElementNum, ElementEnum, ElementLength,
+                             ElementFixedPoint)) \
+            or isinstance(elem, ElementVarint):
+        return None
+
+    # pylint: disable=protected-access
+    fmt = elem._struct.format.lstrip('@=<>!')
+    if fmt not in TYPECODES:
+        # Only single value formats
+        return None
+    elif isinstance(elem, ElementFixedPoint):
+        return ('d', fmt)
+    return (TYPECODES[fmt], fmt)
+
+
+def _callable_refs(elem):
+    """Return the names of the fields a callable element is unpacked from."""
+    # pylint: disable=protected-access
+    names = set()
+    for arg in elem._unpack_args:
+        if isinstance(arg, bytes):
+            arg = arg.decode('utf-8')
+        if isinstance(arg, str):
+            names.add(arg)
+    return names
+
+
+def _unpack_callable(message, elem, ctx, buf, offset):
+    """
+    Unpack a callable element, which needs a message tuple of the fields
+    unpacked so far.
+    """
+    # pylint: disable=protected-access
+    msg = message._tuple._make([getattr(ctx, name, None) for name in message._tuple._fields])
+    return elem.unpack_from(msg, buf, offset)
+
+
+# pylint: disable=protected-access,too-many-locals
+def unpack_columns(message, buf, numpy_arrays=False):
+    """
+    Unpack a buffer of consecutive messages into a dictionary of field names
+    and columns of values.
+
+    :param message: The message in the buffer
+    :param buf: The buffer of messages
+    :param numpy_arrays: Return NumPy arrays rather than array.array columns
+    """
+    elements = [elem for elem in message._elements.values() if elem.name]
+    kinds = {elem.name: _array_column(elem) for elem in elements}
+    columns = {elem.name: array(kinds[elem.name][0]) if kinds[elem.name] else []
+               for elem in elements}
+
+    # The values of these fields are needed to unpack other fields
+    refs = {elem.ref for elem in elements
+            if not kinds[elem.name] and isinstance(getattr(elem, 'ref', None), str)}
+    for elem in elements:
+        if isinstance(elem, ElementCallable):
+            refs |= _callable_refs(elem)
+
+    size = message.static_size
+    if size is not None:
+        _unpack_fixed(message, buf, size, kinds, columns, refs)
+    else:
+        _unpack_variable(message, buf, kinds, columns, refs)
+
+    if numpy_arrays:
+        if numpy is None:
+            raise ImportError('NumPy is required for numpy_arrays')
+        for (name, column) in columns.items():
+            if isinstance(column, array):
+                columns[name] = numpy.frombuffer(column, dtype=column.typecode) \
+                    if column else numpy.array([], dtype=column.typecode)
+    return columns
+
+
+def _unpack_fixed(message, buf, size, kinds, columns, refs):
+    if len(buf) % size:
+        raise ValueError('buffer size {} is not a multiple of the {} message size {}'.format(
+            len(buf), message._name, size))
+
+    lists = []
+    for (elem, pos) in message._layout:
+        if not elem.name:
+            continue
+        elif kinds[elem.name]:
+            # Unpack every value of the field with a struct that skips over
+            # the rest of the message
+            fmt = '{}{}x{}{}x'.format(message.mode.value, pos, kinds[elem.name][1],
+                                      size - pos - struct.calcsize(message.mode.value + kinds[elem.name][1]))
+            values = (val for (val,) in struct.iter_unpack(fmt, buf))
+            if isinstance(elem, ElementFixedPoint):
+                scale = float(elem._scale)
+                values = (val / scale for val in values)
+            columns[elem.name].extend(values)
+        else:
+            lists.append((elem, pos))
+
+    if lists:
+        ctx = types.SimpleNamespace()
+        ref_layout = [(elem, pos) for (elem, pos) in message._layout
+                      if elem.name in refs and not isinstance(elem, ElementCallable)]
+        for offset in range(0, len(buf), size):
+            for (elem, pos) in ref_layout:
+                setattr(ctx, elem.name, elem.unpack_from(ctx, buf, offset + pos)[0])
+            for (elem, pos) in lists:
+                if isinstance(elem, ElementCallable):
+                    val = _unpack_callable(message, elem, ctx, buf, offset + pos)[0]
+                else:
+                    val = elem.unpack_from(ctx, buf, offset + pos)[0]
+                columns[elem.name].append(val)
+
+
+def _unpack_variable(message, buf, kinds, columns, refs):
+    # For each element either the struct and column for array columns, or
+    # the element and column for list columns
+    plan = []
+    for elem in message._elements.values():
+        kind = kinds.get(elem.name)
+        if kind:
+            scale = float(elem._scale) if isinstance(elem, ElementFixedPoint) else None
+            plan.append((elem, elem._struct, scale, columns[elem.name]))
+        else:
+            plan.append((elem, None, None, columns.get(elem.name)))
+
+    offset = 0
+    end = len(buf)
+    while offset < end:
+        ctx = types.SimpleNamespace()
+        for (elem, raw, scale, column) in plan:
+            if raw is not None:
+                val = raw.unpack_from(buf, offset)[0]
+                column.append(val if scale is None else val / scale)
+                if elem.name in refs:
+                    # The unpacked value is needed by another element
+                    setattr(ctx, elem.name, elem.unpack_from(ctx, buf, offset)[0])
+                offset += elem.static_size
+            elif isinstance(elem, ElementCallable):
+                (val, offset) = _unpack_callable(message, elem, ctx, buf, offset)
+                column.append(val)
+            else:
+                (val, offset) = elem.unpack_from(ctx, buf, offset)
+                if column is not None:
+                    column.append(val)
+                if elem.name in refs:
+                    setattr(ctx, elem.name, val)
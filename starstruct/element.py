@@ -1,5 +1,7 @@
 """StarStruct element class."""
 
+import struct
+
 from typing import Optional, Tuple
 
 from starstruct.modes import Mode
@@ -16,12 +18,18 @@ class Element(object):
     A class factory that determines the type of the field passed in, and
     instantiates the correct class type.
     """
-    elementtypes = []
+    elementtypes = ()
+
+    # Trusted elements don't check the values they unpack or make, see
+    # trust()
+    trusted = False
 
     @classmethod
     def register(cls, element):
         """Function used to register new element subclasses."""
-        cls.elementtypes.append(element)
+        # Replace the tuple rather than changing it, so the factory never
+        # sees a partially updated list of element types
+        cls.elementtypes = cls.elementtypes + (element,)
 
     @classmethod
     def factory(cls, field: tuple, mode: Optional[Mode]=Mode.Native, alignment: Optional[int]=1):
@@ -136,6 +144,33 @@ class Element(object):
         """
         raise NotImplementedError
 
+    def trust(self) -> None:
+        """
+        Stop checking the values this element unpacks and makes, because
+        they have already been validated.
+
+        Elements that check values (such as enums, callables and strings)
+        skip those checks once they are trusted, elements with sub-messages
+        use trusted variants of them.
+        """
+        self.trusted = True
+
+    @property
+    def static_size(self) -> Optional[int]:
+        """
+        The number of bytes this element occupies when packed, including any
+        alignment padding, or None if the size depends on the packed values.
+        """
+        return None
+
+    @property
+    def constant_bytes(self) -> Optional[bytes]:
+        """
+        The packed bytes of this element if they never depend on the packed
+        values (such as constants and padding), otherwise None.
+        """
+        return None
+
     def pack(self, msg: dict) -> bytes:
         """
         Require element objects to implement this function.
@@ -145,6 +180,23 @@ class Element(object):
         """
         raise NotImplementedError
 
+    def pack_into(self, msg: dict, buf: bytearray, offset: int=0) -> int:
+        """
+        Pack the element into a writable buffer starting at offset.
+
+        Elements that can write directly into the buffer should override
+        this, by default the packed bytes are copied into the buffer.  Any
+        alignment padding is expected to already be zeroed in the buffer.
+
+        :param msg: The values to pack into bytes
+        :param buf: The buffer to pack the element into
+        :param offset: The position of the element in the buffer
+        :returns: The offset following the element
+        """
+        data = self.pack(msg)
+        buf[offset:offset + len(data)] = data
+        return offset + len(data)
+
     def unpack(self, msg: dict, buf: bytes) -> Tuple[dict, bytes]:
         """
         Require element objects to implement this function.
@@ -155,6 +207,70 @@ class Element(object):
         """
         raise NotImplementedError
 
+    def unpack_from(self, msg: dict, buf: bytes, offset: int=0) -> Tuple[object, int]:
+        """
+        Unpack the element from the buffer starting at offset.
+
+        Elements that can work with offsets directly should override this,
+        by default the element is unpacked from a memoryview of the remaining
+        bytes so the buffer does not have to be copied.
+
+        :param msg: The values unpacked thus far from the bytes
+        :param buf: The buffer to unpack from
+        :param offset: The position of the element in the buffer
+        :returns: The unpacked value and the offset following the element
+        """
+        view = memoryview(buf).cast('B')[offset:]
+        (val, unused) = self.unpack(msg, view)
+        return (val, offset + len(view) - len(unused))
+
+    def skip(self, msg: dict, buf: bytes, offset: int=0) -> int:
+        """
+        Find the end of the element in the buffer without creating its value.
+
+        Elements with a static size are skipped without reading the buffer,
+        elements with a variable size should override this if they can find
+        their size without unpacking, by default the element is unpacked.
+
+        :param msg: The values that have been unpacked, only the values that
+            this element references are required
+        :param buf: The buffer to skip the element in
+        :param offset: The position of the element in the buffer
+        :returns: The offset following the element
+        """
+        size = self.static_size
+        if size is not None:
+            return offset + size
+        return self.unpack_from(msg, buf, offset)[1]
+
+    def frame_end(self, msg: dict, buf: bytes, offset: int=0) -> int:
+        """
+        Find the end of the element like skip(), in a buffer that may not
+        hold all of the element yet.
+
+        The size of the element only has to be known, not the whole element,
+        so the offset returned may be past the end of the buffer.  If the
+        buffer ends before the size of the element is known, the negative
+        number of additional bytes needed is returned.  By default the
+        element is skipped, and if that fails at least one more byte is
+        needed.
+
+        :param msg: The values that have been unpacked, only the values that
+            this element references are required
+        :param buf: The buffer received so far
+        :param offset: The position of the element in the buffer
+        :returns: The offset following the element, or the negative number
+            of additional bytes needed
+        """
+        size = self.static_size
+        if size is not None:
+            return offset + size
+
+        try:
+            return self.skip(msg, buf, offset)
+        except (struct.error, IndexError, ValueError):
+            return -1
+
     def make(self, msg: dict):
         """
         Require element objects to implement this function.
@@ -0,0 +1,179 @@
+"""
+The bit packed StarStruct element class.
+
+Packs integer subfields of any width into a single unsigned integer word:
+
+.. code-block:: python
+
+    Header = Message('Header', [
+        ('hdr', 'H', [
+            ('version', 3),
+            ('length', 12),
+            ('flag', 1),
+        ]),
+        ('offset', 'B', [
+            ('x', 4, True),     # signed 4 bit subfield
+            ('y', 4, True),
+        ]),
+    ])
+
+    packed = Header.pack(hdr={'version': 1, 'length': 100, 'flag': 1},
+                         offset={'x': -2, 'y': 3})
+    Header.unpack(packed).hdr.length == 100
+
+The first subfield is packed into the most significant bits of the word, any
+bits left over at the end of the word are zero.  Subfields are unsigned
+unless the optional third item of the subfield is True.  The value of the
+element is unpacked into a namedtuple of the subfields, and can be packed
+from a namedtuple, sequence or dictionary (missing subfields are zero).
+"""
+
+import collections
+import re
+import struct
+
+from starstruct.element import register, Element
+from starstruct.modes import Mode
+
+
+@register
+class ElementBitPacked(Element):
+    """
+    The bit packed StarStruct element class.
+    """
+
+    def __init__(self, field, mode=Mode.Native, alignment=1):
+        """Initialize a StarStruct element object."""
+
+        # All of the type checks have already been performed by the class
+        # factory
+        self.name = field[0]
+        self.ref = field[2]
+
+        self._mode = mode
+        self._alignment = alignment
+
+        self.format = mode.value + field[1]
+        self._struct = struct.Struct(self.format)
+
+        # Precompute the shift and mask of each subfield, and the sign bit of
+        # signed subfields
+        bits = self._struct.size * 8
+        self._subfields = []
+        for subfield in self.ref:
+            width = subfield[1]
+            bits -= width
+            if bits < 0:
+                err = 'bit packed field {} subfields do not fit in format {}'
+                raise ValueError(err.format(self.name, field[1]))
+
+            signed = len(subfield) == 3 and subfield[2]
+            sign = 1 << (width - 1) if signed else 0
+            self._subfields.append((bits, (1 << width) - 1, sign))
+
+        self._tuple = collections.namedtuple(self.name, [subfield[0] for subfield in self.ref])
+
+    @property
+    def static_size(self):
+        """The number of bytes the element occupies, including alignment padding."""
+        return self._struct.size + (-self._struct.size % self._alignment)
+
+    @staticmethod
+    def valid(field):
+        """
+        Validation function to determine if a field tuple represents a valid
+        bit packed element type.
+
+        The format must be a single unsigned integer, and the subfields must
+        be a list of (name, width) or (name, width, signed) tuples.
+        """
+        return len(field) == 3 \
+            and isinstance(field[1], str) \
+            and re.fullmatch(r'[BHILQ]', field[1]) is not None \
+            and isinstance(field[2], list) \
+            and len(field[2]) > 0 \
+            and all(isinstance(sub, tuple) and len(sub) in (2, 3) and
+                    isinstance(sub[0], str) and isinstance(sub[1], int) and sub[1] > 0
+                    for sub in field[2])
+
+    def validate(self, msg):
+        """
+        Ensure that the supplied message contains the required information for
+        this element object to operate.
+
+        The bit packed element requires no further validation.
+        """
+        pass
+
+    def update(self, mode=None, alignment=None):
+        """change the mode of the struct format"""
+        if alignment:
+            self._alignment = alignment
+
+        if mode:
+            self._mode = mode
+            self.format = mode.value + self.format[1:]
+            # recreate the struct with the new format
+            self._struct = struct.Struct(self.format)
+
+    def _word(self, val):
+        """Combine the subfield values into a single integer."""
+        if isinstance(val, dict):
+            val = [val.get(name, 0) for name in self._tuple._fields]
+        elif len(val) != len(self._subfields):
+            err = 'bit packed field {} expected {} values, got {}'
+            raise ValueError(err.format(self.name, len(self._subfields), val))
+
+        word = 0
+        for (item, (shift, mask, sign)) in zip(val, self._subfields):
+            if sign:
+                if not -sign <= item < sign:
+                    err = 'value {} of bit packed field {} out of range'
+                    raise ValueError(err.format(item, self.name))
+                item &= mask
+            elif not 0 <= item <= mask:
+                err = 'value {} of bit packed field {} out of range'
+                raise ValueError(err.format(item, self.name))
+            word |= item << shift
+        return word
+
+    def pack(self, msg):
+        """Pack the provided values into the supplied buffer."""
+        data = self._struct.pack(self._word(msg[self.name]))
+
+        # If the data does not meet the alignment, add some padding
+        missing_bytes = len(data) % self._alignment
+        if missing_bytes:
+            data += b'\x00' * (self._alignment - missing_bytes)
+        return data
+
+    def pack_into(self, msg, buf, offset=0):
+        """Pack the provided values directly into the buffer."""
+        self._struct.pack_into(buf, offset, self._word(msg[self.name]))
+        return offset + self.static_size
+
+    def unpack(self, msg, buf):
+        """Unpack data from the supplied buffer using the initialized format."""
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        word = self._struct.unpack_from(buf, offset)[0]
+
+        values = []
+        for (shift, mask, sign) in self._subfields:
+            item = (word >> shift) & mask
+            if item & sign:
+                item -= mask + 1
+            values.append(item)
+
+        # Remember to skip any alignment-based padding
+        return (self._tuple._make(values), offset + self.static_size)
+
+    def make(self, msg):
+        """Return the subfield values as a namedtuple"""
+        val = msg[self.name]
+        if isinstance(val, dict):
+            return self._tuple._make(val.get(name, 0) for name in self._tuple._fields)
+        return self._tuple._make(val)
@@ -83,7 +83,6 @@ Following creating this message, you have two options:
 
 """
 
-import copy
 import struct
 
 from typing import Optional
@@ -141,8 +140,9 @@ class ElementCallable(Element):
         self.update(mode, alignment)
 
     @property
-    def _struct(self):
-        return struct.Struct(self._mode.value + self.format)
+    def static_size(self):
+        """The number of bytes the element occupies."""
+        return self._struct.size
 
     @staticmethod
     def valid(field: tuple) -> bool:
@@ -193,10 +193,14 @@ class ElementCallable(Element):
         if alignment:
             self._alignment = alignment
 
+        self._struct = struct.Struct(self._mode.value + self.format)
+
     def pack(self, msg):
         """Pack the provided values into the supplied buffer."""
-        pack_values = self.call_func(msg, self._pack_func, self._pack_args)
+        return self.pack_result(self.call_func(msg, self._pack_func, self._pack_args))
 
+    def pack_result(self, pack_values):
+        """Pack the value returned by the pack function."""
         # Test if the object is iterable
         # If it isn't, then turn it into a list
         try:
@@ -210,20 +214,21 @@ class ElementCallable(Element):
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
-        ret = self._struct.unpack_from(buf)
+        (ret, offset) = self.unpack_from(msg, buf)
+        return (ret, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        ret = self._struct.unpack_from(buf, offset)
         if isinstance(ret, (list, tuple)) and len(ret) == 1:
             # We only change it not to a list if we expected one value.
             # Otherwise, we keep it as a list, because that's what we would
             # expect (like for a 16I type of struct
             ret = ret[0]
 
-        # Only check for errors if they haven't told us not to
-        if self._error_on_bad_result:
-            # Pretend we're getting a dictionary to make our item,
-            # but it has no reference to `self`. This is so we check
-            # for errors correctly.
-            temp_dict = copy.deepcopy(msg._asdict())
-            temp_dict.pop(self.name)
+        # Only check for errors if they haven't told us not to, and the
+        # message isn't trusted
+        if self._error_on_bad_result and not self.trusted:
             expected_value = self.call_func(msg, self._unpack_func, self._unpack_args)
 
             # Check for an error
@@ -238,14 +243,14 @@ class ElementCallable(Element):
 
         ret = self.call_func(msg, self._unpack_func, self._unpack_args, original=ret)
 
-        return (ret, buf[self._struct.size:])
+        return (ret, offset + self._struct.size)
 
     def make(self, msg):
         """Return the expected "made" value"""
-        # If we aren't going to error on a bad result
-        # and our name is in the message, just send the value
+        # If we aren't going to error on a bad result (or the message is
+        # trusted) and our name is in the message, just send the value
         # No need to do extra work.
-        if not self._error_on_bad_result \
+        if (not self._error_on_bad_result or self.trusted) \
                 and self.name in msg \
                 and msg[self.name] is not None:
             return msg[self.name]
@@ -0,0 +1,242 @@
+"""
+The compressed StarStruct element class.
+
+Packs a list of messages and compresses them with one of the standard
+library compression modules:
+
+    .. code-block:: python
+
+        LogEntry = Message('LogEntry', [...])
+        LogBatch = Message('LogBatch', [
+            ('source', 'H'),
+            ('entries', LogEntry, {
+                'compress': {
+                    'codec': 'zlib',
+                    'level': 6,
+                    'threshold': 128,
+                },
+            }),
+        ])
+
+    `codec` is one of `'zlib'`, `'lzma'` or `'bz2'`
+    `level` is the compression level (or lzma preset), by default the
+    default level of the compression module is used
+    `threshold` is the size in bytes below which the packed messages are
+    stored without compressing them, by default 0
+
+    The options can be replaced by the codec name:
+    ``{'compress': 'zlib'}``.
+
+The packed element is a flag byte (1 if the data is compressed, 0 if not),
+the length of the data as an unsigned varint, and the data.  The data is
+also stored without compressing it if compressing it doesn't make it
+smaller.  Like escaped elements the element is always unpacked into a list.
+"""
+# pylint: disable=line-too-long
+
+import bz2
+import lzma
+import zlib
+
+from typing import Optional
+
+import starstruct
+from starstruct.element import register, Element
+from starstruct.elementvarint import encode, decode
+from starstruct.modes import Mode
+
+
+# The compress and decompress functions of each codec, the compress
+# functions take the data and the level (None for the default level)
+CODECS = {
+    'zlib': (lambda data, level: zlib.compress(data, -1 if level is None else level),
+             zlib.decompress),
+    'lzma': (lambda data, level: lzma.compress(data, preset=level),
+             lzma.decompress),
+    'bz2': (lambda data, level: bz2.compress(data, 9 if level is None else level),
+            bz2.decompress),
+}
+
+RAW = 0
+COMPRESSED = 1
+
+
+class Compressor(object):
+    """
+    Compress and decompress the packed data of a compressed element.
+
+    :param codec: The name of the compression module
+    :param level: The compression level, or None for the default level
+    :param threshold: Data smaller than this many bytes is not compressed
+    """
+    def __init__(self, codec: str='zlib', level: Optional[int]=None, threshold: int=0):
+        if codec not in CODECS:
+            raise ValueError('unknown compression codec {}, expected one of {}'.format(
+                codec, sorted(CODECS)))
+
+        self.codec = codec
+        self.level = level
+        self.threshold = threshold
+        (self._compress, self._decompress) = CODECS[codec]
+
+    def __repr__(self):
+        return 'Compressor({!r}, {}, {})'.format(self.codec, self.level, self.threshold)
+
+    def compress(self, data: bytes) -> tuple:
+        """Return the flag and the data to store for the packed data."""
+        if len(data) >= self.threshold:
+            compressed = self._compress(data, self.level)
+            if len(compressed) < len(data):
+                return (COMPRESSED, compressed)
+        return (RAW, data)
+
+    def decompress(self, data) -> bytes:
+        """Decompress the stored data."""
+        return self._decompress(data)
+
+
+@register
+class ElementCompressed(Element):
+    """
+    Initialize a StarStruct element object.
+
+    :param field: The fields passed into the constructor of the element
+    :param mode: The mode in which to pack the bytes
+    :param alignment: Number of bytes to align to
+    """
+    def __init__(self, field: list, mode: Optional[Mode]=Mode.Native, alignment: Optional[int]=1):
+        # All of the type checks have already been performed by the class
+        # factory
+        self.name = field[0]
+
+        # Compressed elements don't use the normal struct format, the format
+        # is a StarStruct.Message object, but use a variant of the message in
+        # the current mode.
+        self._format = field[1]
+        self.format = field[1]
+
+        options = field[2]['compress']
+        if isinstance(options, str):
+            options = {'codec': options}
+        self.compressor = Compressor(**options)
+
+        self._mode = mode
+        self._alignment = alignment
+        self.update(mode, alignment)
+
+    @staticmethod
+    def valid(field: tuple) -> bool:
+        """
+        See :py:func:`starstruct.element.Element.valid`
+
+        :param field: The items to determine the structure of the element
+        """
+        if len(field) == 3:
+            return isinstance(field[1], starstruct.message.Message) \
+                and isinstance(field[2], dict) \
+                and 'compress' in field[2].keys()
+        else:
+            return False
+
+    def validate(self, msg):
+        """
+        Ensure that the supplied message contains the required information for
+        this element object to operate.
+
+        The compressed element requires no further validation.
+        """
+        pass
+
+    def update(self, mode=None, alignment=None):
+        """change the mode of the struct format"""
+        if mode is not None:
+            self._mode = mode
+
+        if alignment is not None:
+            self._alignment = alignment
+
+        # Use a variant of the message in the new mode rather than changing
+        # the message, which may be used by other messages
+        self.format = self._format.with_mode(self._mode, self._alignment, self.trusted)
+
+    def trust(self):
+        """Use a trusted variant of the message."""
+        self.trusted = True
+        self.update()
+
+    def pack(self, msg):
+        """Pack the provided values into the supplied buffer."""
+        iterator = msg[self.name]
+
+        if not isinstance(iterator, list):
+            iterator = [iterator]
+
+        pack = self.format.pack
+        (flag, data) = self.compressor.compress(b''.join(pack(item) for item in iterator))
+
+        # There is no need to make sure that the packed data is properly
+        # aligned, because that should already be done by the individual
+        # messages that have been packed.
+        return bytes((flag,)) + encode(len(data)) + data
+
+    def unpack(self, msg, buf):
+        """Unpack data from the supplied buffer using the initialized format."""
+        (ret, offset) = self.unpack_from(msg, buf)
+        return (ret, buf[offset:])
+
+    def _header(self, buf, offset):
+        """Return the flag, and the start and end of the stored data."""
+        flag = buf[offset]
+        if flag not in (RAW, COMPRESSED):
+            raise ValueError('invalid compression flag {} for {}'.format(flag, self.name))
+
+        (length, start) = decode(buf, offset + 1)
+        end = start + length
+        if end > len(buf):
+            raise ValueError('{} needs {} bytes, only {} available'.format(
+                self.name, length, len(buf) - start))
+        return (flag, start, end)
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        (flag, start, end) = self._header(buf, offset)
+
+        if flag == COMPRESSED:
+            # Decompress from a view of the buffer, and unpack the items
+            # directly from the decompressed data
+            data = self.compressor.decompress(memoryview(buf)[start:end])
+            (pos, stop) = (0, len(data))
+        else:
+            # Raw items are unpacked in place
+            (data, pos, stop) = (buf, start, end)
+
+        ret = []
+        unpack_from = self.format.unpack_from
+        while pos < stop:
+            (val, pos) = unpack_from(data, pos)
+            ret.append(val)
+
+        if pos != stop:
+            raise ValueError('{} items overrun the stored data by {} bytes'.format(
+                self.name, pos - stop))
+        return (ret, end)
+
+    def skip(self, msg, buf, offset=0):
+        """Find the end of the element without decompressing it."""
+        return self._header(buf, offset)[2]
+
+    def frame_end(self, msg, buf, offset=0):
+        """Find the end of the element from its header."""
+        try:
+            (length, start) = decode(buf, offset + 1)
+        except ValueError:
+            # The header is at least two bytes long
+            return -max(offset + 2 - len(buf), 1)
+        return start + length
+
+    def make(self, msg):
+        """Return the expected "made" value"""
+        items = msg[self.name]
+        if not isinstance(items, list):
+            items = [items]
+        return [self.format.make(val) for val in items]
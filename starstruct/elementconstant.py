@@ -33,13 +33,19 @@ class ElementConstant(Element):
         self._mode = mode
         self._alignment = alignment
 
+        # The packed bytes never change, so only create them when the mode
+        # changes
+        self.update(mode, alignment)
+
     @property
-    def _struct(self):
-        return struct.Struct(self._mode.value + self.format)
+    def static_size(self):
+        """The number of bytes the element occupies."""
+        return self._struct.size
 
     @property
-    def _packed(self):
-        return self._struct.pack(*self.values)
+    def constant_bytes(self):
+        """The packed constant values."""
+        return self._packed
 
     @staticmethod
     def valid(field: list) -> bool:
@@ -49,8 +55,8 @@ class ElementConstant(Element):
         return len(field) == 3 \
             and isinstance(field[0], str) \
             and isinstance(field[1], str) \
-            and struct.calcsize(field[1]) \
-            and isinstance(field[2], tuple)
+            and isinstance(field[2], tuple) \
+            and struct.calcsize(field[1])
 
     def validate(self, msg):
         """
@@ -69,6 +75,9 @@ class ElementConstant(Element):
         if alignment:
             self._alignment = alignment
 
+        self._struct = struct.Struct(self._mode.value + self.format)
+        self._packed = self._struct.pack(*self.values)
+
     def pack(self, msg: dict) -> bytes:
         """
         Pack the provided values into the supplied buffer.
@@ -79,7 +88,12 @@ class ElementConstant(Element):
 
     def unpack(self, msg: dict, buf: bytes) -> Tuple[bytes, bytes]:
         """Unpack data from the supplied buffer using the initialized format."""
-        return (self._struct.unpack_from(buf), buf[self._struct.size:])
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg: dict, buf: bytes, offset: int=0) -> Tuple[bytes, int]:
+        """Unpack data from the supplied buffer starting at offset."""
+        return (self._struct.unpack_from(buf, offset), offset + self._struct.size)
 
     def make(self, msg: dict):
         """
@@ -23,11 +23,23 @@ class ElementDiscriminated(Element):
         # is the supplied dictionary where the key is a value of the referenced
         # enum element, and the value for each entry is a StarStruct.Message
         # object.
+        self._format = field[1]
         self.format = field[1]
 
-        # but change the mode to match the current mode.
+        # but use variants of the messages in the current mode.
         self.update(mode, alignment)
 
+    @property
+    def static_size(self):
+        """
+        If all of the possible messages have the same fixed size, this
+        element has a static size.
+        """
+        sizes = {0 if fmt is None else fmt.static_size for fmt in self.format.values()}
+        if len(sizes) == 1:
+            return sizes.pop()
+        return None
+
     @staticmethod
     def valid(field):
         """
@@ -75,25 +87,39 @@ class ElementDiscriminated(Element):
         self._mode = mode
         self._alignment = alignment
 
-        for key in self.format.keys():
-            if self.format[key] is not None:
-                self.format[key].update(mode, alignment)
+        # Don't change the messages, they may be used by other messages
+        self.format = {key: None if fmt is None else fmt.with_mode(mode, alignment, self.trusted)
+                       for (key, fmt) in self._format.items()}
+
+    def trust(self):
+        """Use trusted variants of the messages."""
+        self.trusted = True
+        self.update(self._mode, self._alignment)
+
+    def _select(self, key):
+        """
+        Return the format for a value of the referenced element.  Values of
+        trusted enums aren't validated, so this may be a value that has no
+        format.
+        """
+        try:
+            return self.format[key]
+        except KeyError:
+            msg = 'invalid value {} for element {}:{}'.format(
+                key, self.name, self.format.keys())
+            raise ValueError(msg) from None
 
     def pack(self, msg):
         """Pack the provided values into the supplied buffer."""
         # When packing use the value of the referenced element to determine
         # which field format to use to pack this element.  Be sure to check if
         # the referenced format is None or a Message object.
-        if msg[self.ref] not in self.format:
-            msg = 'invalid value {} for element {}:{}'.format(
-                msg[self.ref], self.name, self.format.keys())
-            raise ValueError(msg)
-
-        if self.format[msg[self.ref]] is not None:
+        fmt = self._select(msg[self.ref])
+        if fmt is not None:
             if msg[self.name] is not None:
-                data = self.format[msg[self.ref]].pack(dict(msg[self.name]))
+                data = fmt.pack(msg[self.name])
             else:
-                data = self.format[msg[self.ref]].pack({})
+                data = fmt.pack({})
         else:
             data = b''
 
@@ -104,6 +130,11 @@ class ElementDiscriminated(Element):
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
+        (ret, offset) = self.unpack_from(msg, buf)
+        return (ret, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
         # When unpacking a discriminated element, reference the already unpacked
         # enum field to determine how many elements need unpacked.  If the
         # specific value is None rather than a Message object, return no new
@@ -114,10 +145,38 @@ class ElementDiscriminated(Element):
         # by the message that is unpacked.
         #
         # Use the getattr() function since the referenced value is an enum
-        if self.format[getattr(msg, self.ref)] is not None:
-            return self.format[getattr(msg, self.ref)].unpack_partial(buf)
+        fmt = self._select(getattr(msg, self.ref))
+        if fmt is not None:
+            return fmt.unpack_from(buf, offset)
+        else:
+            return (None, offset)
+
+    def skip(self, msg, buf, offset=0):
+        """Find the end of the message selected by the referenced enum."""
+        size = self.static_size
+        if size is not None:
+            return offset + size
+
+        fmt = self._select(getattr(msg, self.ref))
+        if fmt is not None:
+            return fmt.skip(buf, offset)
         else:
-            return (None, buf)
+            return offset
+
+    def frame_end(self, msg, buf, offset=0):
+        """Find the end of the message selected by the referenced enum."""
+        size = self.static_size
+        if size is not None:
+            return offset + size
+
+        fmt = self._select(getattr(msg, self.ref))
+        if fmt is None:
+            return offset
+
+        length = fmt.frame_length(buf, offset)
+        if length < 0:
+            return length
+        return offset + length
 
     def make(self, msg):
         """Return the expected "made" value"""
@@ -127,7 +186,8 @@ class ElementDiscriminated(Element):
             # Assume it's a dictionary, not a tuple
             key = msg[self.ref]
 
-        if self.format[key] is not None:
-            return self.format[key].make(msg[self.name])
+        fmt = self._select(key)
+        if fmt is not None:
+            return fmt.make(msg[self.name])
         else:
             return None
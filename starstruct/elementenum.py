@@ -35,6 +35,11 @@ class ElementEnum(Element):
         self.format = mode.value + field[1]
         self._struct = struct.Struct(self.format)
 
+    @property
+    def static_size(self):
+        """The number of bytes the element occupies, including alignment padding."""
+        return self._struct.size + (-self._struct.size % self._alignment)
+
     @staticmethod
     def valid(field):
         """
@@ -76,32 +81,44 @@ class ElementEnum(Element):
         # is a valid value for the referenced enum class.
         item = msg[self.name]
         if isinstance(item, self.ref):
-            enum_item = item
+            value = item.value
         elif isinstance(item, str):
             try:
-                enum_item = getattr(self.ref, msg[self.name])
+                value = getattr(self.ref, msg[self.name]).value
             except AttributeError:
                 enum_name = re.match(r"<enum '(\S+)'>", str(self.ref)).group(1)
                 msg = '{} is not a valid {}'.format(msg[self.name], enum_name)
                 raise ValueError(msg)
+        elif self.trusted:
+            # Trusted raw values are packed as they are, even if they are not
+            # values of the enum
+            value = item
         else:
-            enum_item = self.ref(item)
-        data = self._struct.pack(enum_item.value)
+            value = self.ref(item).value
+        data = self._struct.pack(value)
 
         # If the data does not meet the alignment, add some padding
         missing_bytes = len(data) % self._alignment
         if missing_bytes:
-            data += b'\x00' * missing_bytes
+            data += b'\x00' * (self._alignment - missing_bytes)
         return data
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
-        ret = self._struct.unpack_from(buf, 0)
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        ret = self._struct.unpack_from(buf, offset)
+
+        # Remember to skip any alignment-based padding
+        unused = offset + self.static_size
 
-        # Remember to remove any alignment-based padding
-        extra_bytes = self._alignment - 1 - (struct.calcsize(self.format) %
-                                             self._alignment)
-        unused = buf[struct.calcsize(self.format) + extra_bytes:]
+        if self.trusted:
+            # Look the member up without validating the value, unknown
+            # values are returned as they are
+            return (self.ref._value2member_map_.get(ret[0], ret[0]), unused)  # pylint: disable=protected-access
 
         # Convert the returned value to the referenced Enum type
         try:
@@ -127,6 +144,8 @@ class ElementEnum(Element):
                 enum_name = re.match(r"<enum '(\S+)'>", str(self.ref)).group(1)
                 msg = '{} is not a valid {}'.format(msg[self.name], enum_name)
                 raise ValueError(msg)
+        elif self.trusted:
+            enum_item = self.ref._value2member_map_.get(item, item)  # pylint: disable=protected-access
         else:
             enum_item = self.ref(item)
         return enum_item
@@ -22,6 +22,26 @@ Can be used in multiple ways ways:
     `separator` is a separating sequence
     `end` is the ending escape sequence
 
+2: Byte-stuffed frames
+
+    .. code-block:: python
+
+        TestStruct = Message('TestStruct', [
+            ('escaped_data', ExampleMessage, {
+                'escape': {
+                    'separator': b'\x7e',
+                    'end': b'\x7e\x7e',
+                    'stuffing': 'hdlc',
+                },
+            }),
+        ])
+
+    `stuffing` escapes every byte in the packed items that could start one of
+    the delimiting sequences, so a payload that happens to contain the
+    separator no longer corrupts the frame.  It can be one of `'slip'`,
+    `'hdlc'`, `'cobs'` or a :class:`ByteStuffing`/:class:`COBSStuffing`
+    instance.
+
 """
 # pylint: disable=line-too-long
 
@@ -32,34 +52,178 @@ from starstruct.element import register, Element
 from starstruct.modes import Mode
 
 
+class ByteStuffing(object):
+    """
+    Byte-stuffing that replaces every reserved byte in a payload with an
+    escape byte followed by a substitute byte (SLIP and HDLC style).
+
+    :param escape: The escape byte
+    :param codes: A dictionary mapping each reserved byte to its substitute,
+        it must include an entry for the escape byte itself
+    :param xor: If provided, substitutes for additional reserved bytes are
+        generated by xor-ing them with this value (as HDLC does)
+    """
+    def __init__(self, escape: int, codes: dict, xor: Optional[int]=None):
+        self.escape = escape
+        self.codes = dict(codes)
+        self.xor = xor
+
+        if escape not in self.codes:
+            raise ValueError('escape byte 0x{:02x} has no substitute'.format(escape))
+
+        # Unstuffing with bytes.replace() is only unambiguous if the
+        # substitutes are unique and can never be mistaken for reserved bytes.
+        substitutes = set(self.codes.values())
+        if len(substitutes) != len(self.codes) or substitutes & set(self.codes):
+            raise ValueError('ambiguous stuffing codes: {}'.format(self.codes))
+
+        # The escape byte has to be replaced first when stuffing (and last
+        # when unstuffing) so the other substitutions are not escaped twice.
+        self._escape = bytes([escape])
+        self._pairs = [(self._escape, self._escape + bytes([self.codes[escape]]))]
+        self._pairs.extend((bytes([byte]), self._escape + bytes([code]))
+                           for byte, code in self.codes.items() if byte != escape)
+        self._reversed = list(reversed(self._pairs))
+
+    def __repr__(self):
+        return 'ByteStuffing(0x{:02x}, {})'.format(self.escape, self.codes)
+
+    def reserve(self, reserved):
+        """
+        Return a stuffing that also escapes all of the `reserved` bytes.
+        """
+        codes = dict(self.codes)
+        for byte in reserved:
+            if byte in codes:
+                continue
+            elif self.xor is None:
+                raise ValueError('{} cannot escape byte 0x{:02x}'.format(self, byte))
+            codes[byte] = byte ^ self.xor
+
+        if codes == self.codes:
+            return self
+        return ByteStuffing(self.escape, codes, self.xor)
+
+    def stuff(self, data: bytes) -> bytes:
+        """Escape all reserved bytes in the data."""
+        for raw, escaped in self._pairs:
+            data = data.replace(raw, escaped)
+        return data
+
+    def unstuff(self, data: bytes) -> bytes:
+        """Replace all escape sequences in the data with the original bytes."""
+        escapes = data.count(self._escape)
+        if not escapes:
+            return data
+
+        expected = len(data) - escapes
+        for raw, escaped in self._reversed:
+            data = data.replace(escaped, raw)
+
+        # Every escape byte should have been consumed by exactly one valid
+        # escape sequence
+        if len(data) != expected:
+            raise ValueError('invalid escape sequence in: {}'.format(data))
+        return data
+
+
+class COBSStuffing(object):
+    """
+    Consistent Overhead Byte Stuffing, which removes all zero bytes from a
+    payload.  Delimiting sequences must start with a zero byte.
+    """
+    def __repr__(self):
+        return 'COBSStuffing()'
+
+    def reserve(self, reserved):
+        """
+        COBS only removes zero bytes, so only zero bytes can be reserved.
+        """
+        if any(reserved):
+            raise ValueError('{} delimiters must start with a zero byte'.format(self))
+        return self
+
+    @staticmethod
+    def stuff(data: bytes) -> bytes:
+        """Encode the data so it does not contain any zero bytes."""
+        out = []
+        for block in data.split(b'\x00'):
+            # Blocks of 254 non-zero bytes are not followed by an implied zero
+            while len(block) >= 254:
+                out.append(b'\xff' + block[:254])
+                block = block[254:]
+            out.append(bytes([len(block) + 1]) + block)
+        return b''.join(out)
+
+    @staticmethod
+    def unstuff(data: bytes) -> bytes:
+        """Decode COBS encoded data."""
+        out = []
+        pos = 0
+        size = len(data)
+        while pos < size:
+            code = data[pos]
+            if code == 0 or pos + code > size:
+                raise ValueError('invalid COBS block at {} in: {}'.format(pos, data))
+
+            out.append(data[pos + 1:pos + code])
+            pos += code
+            if code != 0xff and pos < size:
+                out.append(b'\x00')
+        return b''.join(out)
+
+
+SLIP = ByteStuffing(0xdb, {0xc0: 0xdc, 0xdb: 0xdd})
+HDLC = ByteStuffing(0x7d, {0x7e: 0x5e, 0x7d: 0x5d}, xor=0x20)
+COBS = COBSStuffing()
+
+STUFFING = {
+    'slip': SLIP,
+    'hdlc': HDLC,
+    'cobs': COBS,
+}
+
+
 class Escapor:
-    def __init__(self, start=None, separator=None, end=None, opts=None):
+    # pylint: disable=too-many-arguments
+    def __init__(self, start=None, separator=None, end=None, opts=None, stuffing=None):
         self._start = start
         self._separator = separator
         self._end = end
 
         self._opts = opts
 
-    @property
-    def start(self):
-        if self._start is not None:
-            return self._start
-        else:
-            return b''
+        self.start = start if start is not None else b''
+        self.separator = separator if separator is not None else b''
+        self.end = end if end is not None else b''
 
-    @property
-    def separator(self):
-        if self._separator is not None:
-            return self._separator
-        else:
-            return b''
+        if isinstance(stuffing, str):
+            try:
+                stuffing = STUFFING[stuffing]
+            except KeyError:
+                raise ValueError('unknown stuffing: {}'.format(stuffing))
 
-    @property
-    def end(self):
-        if self._end is not None:
-            return self._end
-        else:
-            return b''
+        if stuffing is not None:
+            if not self.separator and not self.end:
+                raise ValueError('stuffed items must be delimited by a separator or end sequence')
+
+            # A delimiter can only be found inside of a stuffed payload if the
+            # payload contains the delimiter's first byte, so reserve those.
+            delimiters = (self.start, self.separator, self.end)
+            stuffing = stuffing.reserve({d[0] for d in delimiters if d})
+        self.stuffing = stuffing
+
+    def stuff(self, data: bytes) -> bytes:
+        """Apply the configured byte-stuffing to a packed item."""
+        if self.stuffing is None:
+            return data
+        return self.stuffing.stuff(data)
+
+    def unstuff(self, data: bytes) -> bytes:
+        """Remove the configured byte-stuffing from a packed item."""
+        if self.stuffing is None:
+            return data
+        return self.stuffing.unstuff(data)
 
 
 @register
@@ -77,8 +241,9 @@ class ElementEscaped(Element):
         self.name = field[0]
 
         # Escaped elements don't use the normal struct format, the format is
-        # a StarStruct.Message object, but change the mode to match the
+        # a StarStruct.Message object, but use a variant of the message in the
         # current mode.
+        self._format = field[1]
         self.format = field[1]
 
         self.escapor = Escapor(**field[2]['escape'])
@@ -113,13 +278,20 @@ class ElementEscaped(Element):
 
     def update(self, mode=None, alignment=None):
         """change the mode of the struct format"""
-        if self._mode is not None:
+        if mode is not None:
             self._mode = mode
 
-        if self._alignment is not None:
+        if alignment is not None:
             self._alignment = alignment
 
-        self.format.update(self._mode, self._alignment)
+        # Use a variant of the message in the new mode rather than changing
+        # the message, which may be used by other messages
+        self.format = self._format.with_mode(self._mode, self._alignment, self.trusted)
+
+    def trust(self):
+        """Use a trusted variant of the message."""
+        self.trusted = True
+        self.update()
 
     def pack(self, msg):
         """Pack the provided values into the supplied buffer."""
@@ -131,53 +303,162 @@ class ElementEscaped(Element):
         if not isinstance(iterator, list):
             iterator = [iterator]
 
-        ret = self.escapor.start
+        # Collect all of the pieces of the frame so the output is only
+        # allocated and copied once
+        separator = self.escapor.separator
+        stuff = self.escapor.stuff
+        pack = self.format.pack
 
+        ret = [self.escapor.start]
         for item in iterator:
-            ret += self.format.pack(item)
-
-            ret += self.escapor.separator
-
-        ret += self.escapor.end
+            ret.append(stuff(pack(item)))
+            ret.append(separator)
+        ret.append(self.escapor.end)
 
         # There is no need to make sure that the packed data is properly
         # aligned, because that should already be done by the individual
         # messages that have been packed.
-        return ret
+        return b''.join(ret)
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
-        # When unpacking a variable element, reference the already unpacked
-        # length field to determine how many elements need unpacked.
-        ret = []
+        (ret, offset) = self.unpack_from(msg, buf)
+        return (ret, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        # bytes.startswith() and bytes.find() are used to locate the
+        # delimiting sequences, so make sure the buffer supports them
+        if not isinstance(buf, (bytes, bytearray)):
+            if hasattr(buf, 'find'):
+                # Only copy this frame out of large buffers such as mmap
+                end = self.skip(msg, buf, offset)
+                return (self.unpack_from(msg, bytes(buf[offset:end]))[0], end)
+            buf = bytes(buf)
 
         # Check the starting value
-        if buf[:len(self.escapor.start)] == self.escapor.start:
-            buf = buf[len(self.escapor.start):]
-        else:
+        if not buf.startswith(self.escapor.start, offset):
             raise ValueError('Buf did not start with expected start sequence: {0}'.format(
                 self.escapor.start.decode()))
 
-        unused = buf
+        offset += len(self.escapor.start)
+        if self.escapor.stuffing is None:
+            return self._unpack_items(buf, offset)
+        else:
+            return self._unpack_stuffed(buf, offset)
+
+    def skip(self, msg, buf, offset=0):
+        """Find the end of the frame without unpacking the items."""
+        # Slicing is used rather than startswith() so that mmap objects can
+        # be skimmed without copying them
+        if not hasattr(buf, 'find'):
+            buf = bytes(buf)
+
+        start = self.escapor.start
+        separator = self.escapor.separator
+        end = self.escapor.end
+
+        if buf[offset:offset + len(start)] != start:
+            raise ValueError('Buf did not start with expected start sequence: {0}'.format(
+                start.decode()))
+        pos = offset + len(start)
+
+        if self.escapor.stuffing is None:
+            # The items have to be skipped to find the delimiting sequences
+            while True:
+                pos = self.format.skip(buf, pos)
+                if buf[pos:pos + len(separator)] != separator:
+                    raise ValueError('Buf did not separate with expected separate sequence: {0}'.format(
+                        separator.decode()))
+                pos += len(separator)
+
+                if buf[pos:pos + len(end)] == end:
+                    return pos + len(end)
+
+        if not separator:
+            stop = buf.find(end, pos)
+            if stop < 0:
+                raise ValueError('Buf did not end with expected end sequence: {0}'.format(
+                    end.decode()))
+            return stop + len(end)
+
+        while not (end and buf[pos:pos + len(end)] == end):
+            stop = buf.find(separator, pos)
+            if stop < 0:
+                raise ValueError('Buf did not separate with expected separate sequence: {0}'.format(
+                    separator.decode()))
+            pos = stop + len(separator)
+
+            if not end:
+                break
+
+        return pos + len(end)
+
+    def _unpack_items(self, buf, pos):
+        """
+        Unpack the items of an unstuffed frame.  The separator and end
+        sequences may also appear inside of the packed items, so the item
+        format determines where each item ends.
+        """
+        ret = []
+        separator = self.escapor.separator
+        end = self.escapor.end
 
         while True:
-            (val, unused) = self.format.unpack_partial(unused)
+            (val, pos) = self.format.unpack_from(buf, pos)
             ret.append(val)
 
-            if unused[:len(self.escapor.separator)] == self.escapor.separator:
-                unused = unused[len(self.escapor.separator):]
+            if buf.startswith(separator, pos):
+                pos += len(separator)
             else:
                 raise ValueError('Buf did not separate with expected separate sequence: {0}'.format(
-                    self.escapor.separator.decode()))
+                    separator.decode()))
+
+            if buf.startswith(end, pos):
+                pos += len(end)
+                break
+
+        return (ret, pos)
+
+    def _unpack_stuffed(self, buf, pos):
+        """
+        Unpack the items of a byte-stuffed frame.  The delimiting sequences
+        can't appear inside of the stuffed items so they are located directly.
+        """
+        ret = []
+        separator = self.escapor.separator
+        end = self.escapor.end
+        unstuff = self.escapor.unstuff
+        unpack = self.format.unpack
+
+        if not separator:
+            # Without a separator the items are only delimited by the end of
+            # the frame, unpack them one after another
+            stop = buf.find(end, pos)
+            if stop < 0:
+                raise ValueError('Buf did not end with expected end sequence: {0}'.format(
+                    end.decode()))
+
+            data = unstuff(buf[pos:stop])
+            pos = 0
+            while pos < len(data):
+                (val, pos) = self.format.unpack_from(data, pos)
+                ret.append(val)
+            return (ret, stop + len(end))
+
+        while not (end and buf.startswith(end, pos)):
+            stop = buf.find(separator, pos)
+            if stop < 0:
+                raise ValueError('Buf did not separate with expected separate sequence: {0}'.format(
+                    separator.decode()))
+
+            ret.append(unpack(unstuff(buf[pos:stop])))
+            pos = stop + len(separator)
 
-            if unused[:len(self.escapor.end)] == self.escapor.end:
-                unused = unused[len(self.escapor.end):]
+            if not end:
                 break
 
-        # There is no need to make sure that the unpacked data consumes a
-        # properly aligned number of bytes because that should already be done
-        # by the individual messages that have been unpacked.
-        return (ret, unused)
+        return (ret, pos + len(end))
 
     def make(self, msg):
         """Return the expected "made" value"""
@@ -111,12 +111,21 @@ class ElementFixedPoint(Element):
         else:
             self.ref['decimal_prec'] = None
 
+        # The context used to convert unpacked values to decimals
+        self._context = decimal.Context(prec=self.ref['decimal_prec'] or 26)
+        self._scale = Decimal(2 ** self.ref['precision'])
+
         self._mode = mode
         self._alignment = alignment
 
         self.format = mode.value + field[2]
         self._struct = struct.Struct(self.format)
 
+    @property
+    def static_size(self):
+        """The number of bytes the element occupies, including alignment padding."""
+        return self._struct.size + (-self._struct.size % self._alignment)
+
     @staticmethod
     def valid(field):
         """
@@ -173,25 +182,25 @@ class ElementFixedPoint(Element):
         # If the data does not meet the alignment, add some padding
         missing_bytes = len(data) % self._alignment
         if missing_bytes:
-            data += b'\x00' * missing_bytes
+            data += b'\x00' * (self._alignment - missing_bytes)
         return data
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
-        # ret = self._struct.unpack_from(buf, 0)
-        ret = self._struct.unpack_from(buf, 0)[0]
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
 
-        # Remember to remove any alignment-based padding
-        extra_bytes = self._alignment - 1 - (struct.calcsize(self.format) %
-                                             self._alignment)
-        unused = buf[struct.calcsize(self.format) + extra_bytes:]
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        # ret = self._struct.unpack_from(buf, offset)
+        ret = self._struct.unpack_from(buf, offset)[0]
 
-        if self.ref['decimal_prec']:
-            decimal.getcontext().prec = self.ref['decimal_prec']
-        else:
-            decimal.getcontext().prec = 26
+        # Remember to skip any alignment-based padding
+        unused = offset + self.static_size
 
-        ret_decimal = Decimal(ret) / Decimal(2 ** self.ref['precision'])
+        # Use the element's own context rather than changing the precision
+        # of the (shared) current context
+        ret_decimal = self._context.divide(Decimal(ret), self._scale)
         return (ret_decimal, unused)
 
     def make(self, msg):
@@ -40,6 +40,11 @@ class ElementLength(Element):
         self.format = mode.value + field[1]
         self._struct = struct.Struct(self.format)
 
+    @property
+    def static_size(self):
+        """The number of bytes the element occupies, including alignment padding."""
+        return self._struct.size + (-self._struct.size % self._alignment)
+
     @staticmethod
     def valid(field):
         """
@@ -97,17 +102,28 @@ class ElementLength(Element):
         # If the data does not meet the alignment, add some padding
         missing_bytes = len(data) % self._alignment
         if missing_bytes:
-            data += b'\x00' * missing_bytes
+            data += b'\x00' * (self._alignment - missing_bytes)
         return data
 
+    def pack_into(self, msg, buf, offset=0):
+        """Pack the provided values directly into the buffer."""
+        if self.object_length:
+            self._struct.pack_into(buf, offset, len(msg[self.ref]))
+        else:
+            self._struct.pack_into(buf, offset, msg[self.name])
+        return offset + self.static_size
+
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
-        ret = self._struct.unpack_from(buf, 0)
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        ret = self._struct.unpack_from(buf, offset)
 
-        # Remember to remove any alignment-based padding
-        extra_bytes = self._alignment - 1 - (struct.calcsize(self.format) %
-                                             self._alignment)
-        unused = buf[struct.calcsize(self.format) + extra_bytes:]
+        # Remember to skip any alignment-based padding
+        unused = offset + self.static_size
         return (ret[0], unused)
 
     def make(self, msg):
@@ -36,6 +36,16 @@ class ElementNone(Element):
 
         self.update(mode=mode, alignment=alignment)
 
+    @property
+    def static_size(self):
+        """None elements are never packed."""
+        return 0
+
+    @property
+    def constant_bytes(self):
+        """None elements are never packed."""
+        return b''
+
     @staticmethod
     def valid(field: tuple) -> bool:
         return len(field) == 2 \
@@ -59,5 +69,8 @@ class ElementNone(Element):
     def unpack(self, msg, buf):
         return (None, buf)
 
+    def unpack_from(self, msg, buf, offset=0):
+        return (None, offset)
+
     def make(self, msg):
         return msg[self.name]
@@ -44,6 +44,11 @@ class ElementPad(Element):
         self.format = mode.value + field[1]
         self._struct = struct.Struct(self.format)
 
+    @property
+    def static_size(self):
+        """The number of bytes the element occupies, including alignment padding."""
+        return self._struct.size + (-self._struct.size % self._alignment)
+
     @staticmethod
     def valid(field):
         """
@@ -77,22 +82,25 @@ class ElementPad(Element):
             # recreate the struct with the new format
             self._struct = struct.Struct(self.format)
 
+    @property
+    def constant_bytes(self):
+        """Padding is always packed as zeros."""
+        return b'\x00' * self.static_size
+
     def pack(self, msg):
         """Pack the provided values into the supplied buffer."""
-        data = self._struct.pack()
-
-        # If the data does not meet the alignment, add some padding
-        missing_bytes = len(data) % self._alignment
-        if missing_bytes:
-            data += b'\x00' * missing_bytes
-        return data
+        # Padding (including alignment padding) is always zero
+        return self.constant_bytes
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
-        # Remember to remove any alignment-based padding
-        extra_bytes = self._alignment - 1 - (struct.calcsize(self.format) %
-                                             self._alignment)
-        unused = buf[struct.calcsize(self.format) + extra_bytes:]
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        # Remember to skip any alignment-based padding
+        unused = offset + self.static_size
         return (None, unused)
 
     def make(self, msg):
@@ -0,0 +1,260 @@
+"""
+The presence StarStruct element class.
+
+A presence element is a bitmap of which optional fields are included in the
+packed message, fields that aren't set take no space:
+
+.. code-block:: python
+
+    ConfigUpdate = Message('ConfigUpdate', [
+        ('present', 'H', ['rate', 'gain', 'offset']),
+        ('rate', 'I'),
+        ('gain', 'f'),
+        ('offset', 'h'),
+    ])
+
+    packed = ConfigUpdate.pack(gain=1.5)       # 2 + 4 bytes
+    ConfigUpdate.unpack(packed).rate is None
+
+Bit 0 of the bitmap is the first optional field.  A field is left out if its
+value is None (or not provided), when unpacking a field that was left out
+has the value None, or the default provided with a dictionary of field
+names and default values:
+
+.. code-block:: python
+
+    ('present', 'H', {'rate': 100, 'gain': 1.0, 'offset': 0}),
+
+If the values being packed include the bitmap (such as an unpacked tuple),
+fields that were left out and still have their default value are left out
+again, so unpacked messages are packed into the same bytes.
+
+The optional fields must have a fixed size and follow the presence element.
+Like a length element the value of the presence element is computed when
+packing.
+"""
+
+import re
+import struct
+
+from starstruct.element import register, Element
+from starstruct.elementcallable import ElementCallable
+from starstruct.modes import Mode
+
+
+@register
+class ElementPresence(Element):
+    """
+    The presence StarStruct element class.
+    """
+
+    def __init__(self, field, mode=Mode.Native, alignment=1):
+        """Initialize a StarStruct element object."""
+
+        # All of the type checks have already been performed by the class
+        # factory
+        self.name = field[0]
+        if isinstance(field[2], dict):
+            self.ref = dict(field[2])
+        else:
+            self.ref = dict.fromkeys(field[2])
+
+        self._mode = mode
+        self._alignment = alignment
+
+        self.format = mode.value + field[1]
+        self._struct = struct.Struct(self.format)
+
+        if len(self.ref) > self._struct.size * 8:
+            err = 'presence field {} has {} fields but only {} bits'
+            raise ValueError(err.format(self.name, len(self.ref), self._struct.size * 8))
+        self._masks = [(name, 1 << bit) for (bit, name) in enumerate(self.ref)]
+
+    @property
+    def static_size(self):
+        """The number of bytes the element occupies, including alignment padding."""
+        return self._struct.size + (-self._struct.size % self._alignment)
+
+    @staticmethod
+    def valid(field):
+        """
+        Validation function to determine if a field tuple represents a valid
+        presence element type.
+
+        The format must be an unsigned integer, and the fields either a list
+        of field names or a dictionary of field names and default values.
+        Dictionaries of functions are callable elements.
+        """
+        return len(field) == 3 \
+            and isinstance(field[1], str) \
+            and re.fullmatch(r'[BHILQ]', field[1]) is not None \
+            and isinstance(field[2], (list, dict)) \
+            and len(field[2]) > 0 \
+            and all(isinstance(name, str) for name in field[2]) \
+            and not ElementCallable.valid(field)
+
+    def validate(self, msg):
+        """
+        Ensure that the supplied message contains the required information for
+        this element object to operate.
+
+        Each optional field must be a fixed size element that follows this
+        element, the optional fields are replaced with elements that are only
+        packed when they are present.
+        """
+        names = list(msg.keys())
+        for (name, mask) in self._masks:
+            if name not in msg:
+                err = 'presence field {} reference {} invalid'
+                raise TypeError(err.format(self.name, name))
+            elif isinstance(msg[name], ElementOptional):
+                continue
+            elif names.index(name) < names.index(self.name):
+                err = 'optional field {} must follow presence field {}'
+                raise TypeError(err.format(name, self.name))
+            elif msg[name].static_size is None:
+                err = 'optional field {} of presence field {} does not have a fixed size'
+                raise TypeError(err.format(name, self.name))
+
+            msg[name] = ElementOptional(msg[name], self.name, mask, self.ref[name])
+
+    def update(self, mode=None, alignment=None):
+        """change the mode of the struct format"""
+        if alignment:
+            self._alignment = alignment
+
+        if mode:
+            self._mode = mode
+            self.format = mode.value + self.format[1:]
+            # recreate the struct with the new format
+            self._struct = struct.Struct(self.format)
+
+    def pack(self, msg):
+        """Pack the bitmap of the fields that are present."""
+        data = self._struct.pack(self.make(msg))
+
+        # If the data does not meet the alignment, add some padding
+        missing_bytes = len(data) % self._alignment
+        if missing_bytes:
+            data += b'\x00' * (self._alignment - missing_bytes)
+        return data
+
+    def pack_into(self, msg, buf, offset=0):
+        """Pack the bitmap directly into the buffer."""
+        self._struct.pack_into(buf, offset, self.make(msg))
+        return offset + self.static_size
+
+    def unpack(self, msg, buf):
+        """Unpack data from the supplied buffer using the initialized format."""
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        ret = self._struct.unpack_from(buf, offset)
+
+        # Remember to skip any alignment-based padding
+        return (ret[0], offset + self.static_size)
+
+    def make(self, msg):
+        """Return the bitmap of the fields that are present"""
+        bitmap = 0
+        for (name, mask) in self._masks:
+            if self._elements[name].present(msg):
+                bitmap |= mask
+        return bitmap
+
+
+class ElementOptional(Element):
+    """
+    An optional field of a presence element.  This is not a field type, the
+    presence element replaces the elements of its optional fields with these.
+
+    :param element: The element of the field
+    :param presence: The name of the presence element
+    :param mask: The bit of the field in the presence bitmap
+    :param default: The value of the field when it is not present
+    """
+
+    def __init__(self, element, presence, mask, default=None):
+        # pylint: disable=super-init-not-called
+        self.element = element
+        self.name = element.name
+        self.format = element.format
+        self.ref = presence
+        self.mask = mask
+        self.default = default
+
+        # Precompute the size of the field when it is present
+        self._size = element.static_size
+
+    @staticmethod
+    def valid(field):
+        """Optional elements are only created by presence elements."""
+        return False
+
+    def validate(self, msg):
+        """Validate the wrapped element."""
+        self.element.validate(msg)
+
+    def update(self, mode=None, alignment=None):
+        """change the mode of the wrapped element"""
+        self.element.update(mode, alignment)
+        self._size = self.element.static_size
+
+    def trust(self):
+        """Trust the wrapped element."""
+        self.trusted = True
+        self.element.trust()
+
+    def present(self, msg):
+        """
+        Return True if the field is packed: its value isn't None, and if the
+        values include the bitmap, the field was present or its value isn't
+        the default.
+        """
+        value = msg.get(self.name)
+        if value is None:
+            return False
+
+        bitmap = msg.get(self.ref)
+        if bitmap is not None and not bitmap & self.mask:
+            return value != self.default
+        return True
+
+    def pack(self, msg):
+        """Pack the field if it is present."""
+        if not self.present(msg):
+            return b''
+        return self.element.pack(msg)
+
+    def pack_into(self, msg, buf, offset=0):
+        """Pack the field directly into the buffer if it is present."""
+        if not self.present(msg):
+            return offset
+        data = self.element.pack(msg)
+        buf[offset:offset + len(data)] = data
+        return offset + len(data)
+
+    def unpack(self, msg, buf):
+        """Unpack data from the supplied buffer using the initialized format."""
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack the field if it is present, otherwise return the default."""
+        if getattr(msg, self.ref) & self.mask:
+            return self.element.unpack_from(msg, buf, offset)
+        return (self.default, offset)
+
+    def skip(self, msg, buf, offset=0):
+        """Skip the field if it is present."""
+        if getattr(msg, self.ref) & self.mask:
+            return offset + self._size
+        return offset
+
+    def make(self, msg):
+        """Return the value of the field, or the default if it is not present"""
+        if not self.present(msg):
+            return self.default
+        return self.element.make(msg)
@@ -41,6 +41,11 @@ class ElementString(Element):
         self.format = mode.value + field[1]
         self._struct = struct.Struct(self.format)
 
+    @property
+    def static_size(self):
+        """The number of bytes the element occupies, including alignment padding."""
+        return self._struct.size + (-self._struct.size % self._alignment)
+
     @staticmethod
     def valid(field):
         """
@@ -76,10 +81,12 @@ class ElementString(Element):
         # Ensure that the input is of the proper form to be packed
         val = msg[self.name]
         size = struct.calcsize(self.format)
-        assert len(val) <= size
+        if not self.trusted:
+            assert len(val) <= size
         if self.format[-1] in ('s', 'p'):
             if not isinstance(val, bytes):
-                assert isinstance(val, str)
+                if not self.trusted:
+                    assert isinstance(val, str)
                 val = val.encode()
                 if self.format[-1] == 'p' and len(val) < size:
                     # 'p' (pascal strings) must be the exact size of the format
@@ -92,9 +99,10 @@ class ElementString(Element):
                     val = [bytes([c]) for c in val]
                 else:
                     # last option, it could be a string, or a list of strings
-                    assert (isinstance(val, list) and
-                            all(isinstance(c, str) for c in val)) or \
-                        isinstance(val, str)
+                    if not self.trusted:
+                        assert (isinstance(val, list) and
+                                all(isinstance(c, str) for c in val)) or \
+                            isinstance(val, str)
                     val = [c.encode() for c in val]
             if len(val) < size:
                 val.extend([b'\x00'] * (size - len(val)))
@@ -108,12 +116,15 @@ class ElementString(Element):
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
-        ret = self._struct.unpack_from(buf, 0)
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
+        ret = self._struct.unpack_from(buf, offset)
 
-        # Remember to remove any alignment-based padding
-        extra_bytes = self._alignment - 1 - (struct.calcsize(self.format) %
-                                             self._alignment)
-        unused = buf[struct.calcsize(self.format) + extra_bytes:]
+        # Remember to skip any alignment-based padding
+        unused = offset + self.static_size
 
         if self.format[-1] in 's':
             # for 's' formats, convert to a string and strip padding
@@ -132,7 +143,8 @@ class ElementString(Element):
         """Return a string of the expected format"""
         val = msg[self.name]
         size = struct.calcsize(self.format)
-        assert len(val) <= size
+        if not self.trusted:
+            assert len(val) <= size
 
         # If the supplied value is a list of chars, or a list of bytes, turn
         # it into a string for ease of processing.
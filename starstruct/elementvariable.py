@@ -89,8 +89,9 @@ class ElementVariable(Element):
             self.ref = 1
 
         # Variable elements don't use the normal struct format, the format is
-        # a StarStruct.Message object, but change the mode to match the
+        # a StarStruct.Message object, but use a variant of the message in the
         # current mode.
+        self._format = field[1]
         self.format = field[1]
 
         # Set the packing style for the struct
@@ -117,6 +118,16 @@ class ElementVariable(Element):
         self._alignment = alignment
         self.update(mode, alignment)
 
+    @property
+    def static_size(self):
+        """
+        A fixed number of repetitions of a fixed size message has a static
+        size.
+        """
+        if self.variable_repeat or self.format.static_size is None:
+            return None
+        return self.format.static_size * self.ref
+
     @staticmethod
     def valid(field: tuple) -> bool:
         """
@@ -160,13 +171,20 @@ class ElementVariable(Element):
 
     def update(self, mode=None, alignment=None):
         """change the mode of the struct format"""
-        if self._mode is not None:
+        if mode is not None:
             self._mode = mode
 
-        if self._alignment is not None:
+        if alignment is not None:
             self._alignment = alignment
 
-        self.format.update(self._mode, self._alignment)
+        # Use a variant of the message in the new mode rather than changing
+        # the message, which may be used by other messages
+        self.format = self._format.with_mode(self._mode, self._alignment, self.trusted)
+
+    def trust(self):
+        """Use a trusted variant of the message."""
+        self.trusted = True
+        self.update()
 
     def pack(self, msg):
         """Pack the provided values into the supplied buffer."""
@@ -178,19 +196,18 @@ class ElementVariable(Element):
         if not isinstance(iterator, list):
             iterator = [iterator]
 
-        iterator = [item if not hasattr(item, '_asdict') else item._asdict()
-                    for item in iterator]
-
+        # Messages can pack dictionaries and tuples directly, so the items
+        # don't need to be converted
         if self.variable_repeat:
             if self.object_length:
-                ret = [self.format.pack(dict(elem)) if elem else self.format.pack({})
+                ret = [self.format.pack(elem) if elem else self.format.pack({})
                        for elem in iterator]
             else:
                 ret = []
                 length = 0
 
                 for elem in iterator:
-                    temp_elem = self.format.pack(dict(elem))
+                    temp_elem = self.format.pack(elem)
 
                     if length + len(temp_elem) <= msg[self.ref]:
                         ret.append(temp_elem)
@@ -209,10 +226,14 @@ class ElementVariable(Element):
 
     def unpack(self, msg, buf):
         """Unpack data from the supplied buffer using the initialized format."""
+        (ret, offset) = self.unpack_from(msg, buf)
+        return (ret, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """Unpack data from the supplied buffer starting at offset."""
         # When unpacking a variable element, reference the already unpacked
         # length field to determine how many elements need unpacked.
         ret = []
-        unused = buf
 
         if self.object_length:
             if self.variable_repeat:
@@ -221,19 +242,60 @@ class ElementVariable(Element):
                 msg_range = self.ref
 
             for _ in range(msg_range):
-                (val, unused) = self.format.unpack_partial(unused)
+                (val, offset) = self.format.unpack_from(buf, offset)
                 ret.append(val)
         else:
-            length = 0
-            while length < getattr(msg, self.ref):
-                (val, unused) = self.format.unpack_partial(unused)
-                length += len(val)
+            end = offset + getattr(msg, self.ref)
+            while offset < end:
+                (val, offset) = self.format.unpack_from(buf, offset)
                 ret.append(val)
 
         # There is no need to make sure that the unpacked data consumes a
         # properly aligned number of bytes because that should already be done
         # by the individual messages that have been unpacked.
-        return (ret, unused)
+        return (ret, offset)
+
+    def skip(self, msg, buf, offset=0):
+        """Find the end of the element from the referenced length."""
+        if not self.object_length:
+            return offset + getattr(msg, self.ref)
+
+        if self.variable_repeat:
+            count = getattr(msg, self.ref)
+        else:
+            count = self.ref
+
+        size = self.format.static_size
+        if size is not None:
+            return offset + count * size
+
+        for _ in range(count):
+            offset = self.format.skip(buf, offset)
+        return offset
+
+    def frame_end(self, msg, buf, offset=0):
+        """
+        Find the end of the element from the referenced length, the size of
+        fixed size messages is calculated rather than reading them.
+        """
+        if not self.object_length:
+            return offset + getattr(msg, self.ref)
+
+        if self.variable_repeat:
+            count = getattr(msg, self.ref)
+        else:
+            count = self.ref
+
+        size = self.format.static_size
+        if size is not None:
+            return offset + count * size
+
+        for _ in range(count):
+            length = self.format.frame_length(buf, offset)
+            if length < 0:
+                return length
+            offset += length
+        return offset
 
     def make(self, msg):
         """Return the expected "made" value"""
@@ -0,0 +1,186 @@
+"""
+The variable length integer StarStruct element class.
+
+Integers are packed as LEB128 varints, 7 bits per byte with the high bit of
+each byte set if more bytes follow, so small values only take one byte:
+
+.. code-block:: python
+
+    Counters = Message('Counters', [
+        ('packets', 'V'),           # unsigned
+        ('drift', 'v'),             # signed (zigzag encoded)
+        ('count', 'V', 'samples'),  # the length of a variable element
+        ('samples', Sample, 'count'),
+    ])
+
+Signed values are zigzag encoded (0, -1, 1, -2, ... are packed as 0, 1, 2,
+3, ...) so small negative values are also short.  Values are limited to 64
+bits, so a varint is at most 10 bytes long.
+"""
+
+from starstruct.element import register
+from starstruct.elementlength import ElementLength
+from starstruct.modes import Mode
+
+
+# The largest number of bytes a 64 bit value is packed into
+MAX_BYTES = 10
+
+
+def encode(value):
+    """Pack an unsigned integer into a varint."""
+    if value < 0x80:
+        return bytes((value,))
+
+    data = bytearray()
+    while value >= 0x80:
+        data.append((value & 0x7f) | 0x80)
+        value >>= 7
+    data.append(value)
+    return bytes(data)
+
+
+def decode(buf, offset=0):
+    """
+    Unpack an unsigned varint from a buffer starting at offset, returns the
+    value and the offset following the varint.
+    """
+    try:
+        # Most values are only one or two bytes long
+        first = buf[offset]
+        if first < 0x80:
+            return (first, offset + 1)
+        second = buf[offset + 1]
+        if second < 0x80:
+            return ((first & 0x7f) | (second << 7), offset + 2)
+
+        value = (first & 0x7f) | ((second & 0x7f) << 7)
+        for index in range(2, MAX_BYTES):
+            byte = buf[offset + index]
+            value |= (byte & 0x7f) << (7 * index)
+            if byte < 0x80:
+                return (value, offset + index + 1)
+    except IndexError:
+        raise ValueError('truncated varint at offset {}'.format(offset)) from None
+    raise ValueError('varint at offset {} is longer than {} bytes'.format(offset, MAX_BYTES))
+
+
+@register
+class ElementVarint(ElementLength):
+    """
+    The variable length integer StarStruct element class.
+
+    A varint that references a variable element is the length of that
+    element, like a length element.
+    """
+
+    def __init__(self, field, mode=Mode.Native, alignment=1):
+        """Initialize a StarStruct element object."""
+
+        # All of the type checks have already been performed by the class
+        # factory
+        if isinstance(field[0], str):
+            self.name = field[0]
+            self.object_length = True
+        elif isinstance(field[0], bytes):
+            self.name = field[0].decode('utf-8')
+            self.object_length = False
+
+        self.ref = field[2] if len(field) == 3 else None
+
+        # Varints are packed a byte at a time so the mode doesn't change them
+        self._mode = mode
+        self._alignment = alignment
+        self.format = field[1]
+        self._signed = field[1] == 'v'
+        if self._signed:
+            self._min = -(1 << 63)
+            self._max = (1 << 63) - 1
+        else:
+            self._min = 0
+            self._max = (1 << 64) - 1
+
+    @property
+    def static_size(self):
+        """Varints are packed into a variable number of bytes."""
+        return None
+
+    @staticmethod
+    def valid(field):
+        """
+        Validation function to determine if a field tuple represents a valid
+        varint element type.
+
+        The format must be 'V' (unsigned) or 'v' (signed), only unsigned
+        varints can reference a variable element.
+        """
+        if len(field) == 2:
+            return field[1] in ('V', 'v')
+        return len(field) == 3 \
+            and field[1] == 'V' \
+            and isinstance(field[2], str) and len(field[2]) > 0
+
+    def validate(self, msg):
+        """
+        Ensure that the supplied message contains the required information for
+        this element object to operate.
+
+        A varint that references another element must reference a valid
+        Variable element.
+        """
+        if self.ref is not None:
+            super().validate(msg)
+
+    def update(self, mode=None, alignment=None):
+        """Varints don't depend on the mode, only the alignment is changed"""
+        if alignment:
+            self._alignment = alignment
+
+        if mode:
+            self._mode = mode
+
+    def pack(self, msg):
+        """Pack the provided value into a varint."""
+        value = self.make(msg)
+        if not self._min <= value <= self._max:
+            err = 'value {} of varint field {} out of range'
+            raise ValueError(err.format(value, self.name))
+
+        if self._signed:
+            value = value << 1 if value >= 0 else (-value << 1) - 1
+        data = encode(value)
+
+        # If the data does not meet the alignment, add some padding
+        missing_bytes = len(data) % self._alignment
+        if missing_bytes:
+            data += b'\x00' * (self._alignment - missing_bytes)
+        return data
+
+    def pack_into(self, msg, buf, offset=0):
+        """Pack the provided value directly into the buffer."""
+        data = self.pack(msg)
+        buf[offset:offset + len(data)] = data
+        return offset + len(data)
+
+    def unpack(self, msg, buf):
+        """Unpack a varint from the supplied buffer."""
+        (val, offset) = self.unpack_from(msg, buf)
+        return (val, buf[offset:])
+
+    def unpack_from(self, msg, buf, offset=0):
+        """
+        Unpack a varint from the supplied buffer starting at offset, returns
+        the value and the offset following the bytes the varint consumed.
+        """
+        (value, end) = decode(buf, offset)
+        if self._signed:
+            value = (value >> 1) ^ -(value & 1)
+
+        # Remember to skip any alignment-based padding
+        return (value, end + (offset - end) % self._alignment)
+
+    def make(self, msg):
+        """Return the value, or the length of the referenced element"""
+        if self.ref is not None and self.object_length:
+            return len(msg[self.ref])
+        return msg[self.name]
@@ -0,0 +1,158 @@
+"""
+Offset index for files of variable size messages.
+
+.. code-block:: python
+
+    frames = RecordIndex('capture.bin', Frame)
+    print(len(frames))
+    last = frames[-1]
+    some = frames[1000:1010]
+
+The first time a file is opened it is skimmed to find the offset of each
+message, only the length and discriminator fields (and the delimiters of
+escaped elements) are read.  The offsets are saved in a sidecar index file
+next to the data file ('capture.bin.idx'), which is used instead of skimming
+the file again as long as the data file has not changed.  The index file uses
+the native byte order, it is a cache and is not meant to be copied between
+machines.
+
+The offsets can also be used to split the file for parallel decoding, see
+starstruct.parallel.unpack_file().
+"""
+
+import hashlib
+import mmap
+import os
+from array import array
+
+from starstruct.parallel import record_offsets
+
+
+# The index file starts with a header of unsigned 64 bit values: the magic
+# number, the size and modification time of the data file, and a hash of the
+# message key.
+MAGIC = int.from_bytes(b'SSIDX\x00\x00\x01', 'big')
+HEADER_SIZE = 4
+
+
+def _message_hash(message):
+    key = message._key.encode('utf-8')  # pylint: disable=protected-access
+    return int(hashlib.sha1(key).hexdigest()[:16], 16)
+
+
+def _header(path, message):
+    stat = os.stat(path)
+    return array('Q', [MAGIC, stat.st_size, stat.st_mtime_ns, _message_hash(message)])
+
+
+def load_index(path, message, index_path=None):
+    """
+    Return the offsets of the messages in a file from its index file, or
+    None if there is no index file or the data file has changed.
+    """
+    if index_path is None:
+        index_path = path + '.idx'
+
+    try:
+        with open(index_path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+
+    offsets = array('Q')
+    if len(data) % offsets.itemsize:
+        return None
+    offsets.frombytes(data)
+
+    if offsets[:HEADER_SIZE] != _header(path, message):
+        return None
+    return offsets[HEADER_SIZE:]
+
+
+def build_index(path, message, index_path=None):
+    """
+    Skim a file to find the offset of each message, and save the offsets in
+    an index file.  Returns the offsets.
+    """
+    if index_path is None:
+        index_path = path + '.idx'
+
+    header = _header(path, message)
+    with open(path, 'rb') as f:
+        if header[1]:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                offsets = record_offsets(buf, message)
+        else:
+            offsets = array('Q')
+
+    # Write the index to a temporary file first so a partially written index
+    # file is never used
+    temp_path = index_path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        header.tofile(f)
+        offsets.tofile(f)
+    os.replace(temp_path, index_path)
+
+    return offsets
+
+
+class RecordIndex(object):
+    """
+    Random access to the messages in a file.
+
+    :param path: The file of packed messages
+    :param message: The message in the file
+    :param index_path: The index file, by default path + '.idx'
+    :param save: If False no index file is read or written
+    """
+    def __init__(self, path, message, index_path=None, save=True):
+        self.path = path
+        self.message = message
+
+        if not save:
+            offsets = None
+        else:
+            offsets = load_index(path, message, index_path)
+            if offsets is None:
+                offsets = build_index(path, message, index_path)
+
+        with open(path, 'rb') as f:
+            size = f.seek(0, 2)
+            self._buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+        if offsets is None:
+            offsets = record_offsets(self._buf, message)
+        self.offsets = offsets
+
+    def close(self):
+        """Close the data file."""
+        if isinstance(self._buf, mmap.mmap):
+            self._buf.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def span(self, index):
+        """Return the start and end offsets of a message."""
+        if index < 0:
+            index += len(self.offsets)
+        start = self.offsets[index]
+        if index + 1 < len(self.offsets):
+            return (start, self.offsets[index + 1])
+        return (start, len(self._buf))
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.message.unpack_from(self._buf, self.offsets[i])[0]
+                    for i in range(*index.indices(len(self.offsets)))]
+        return self.message.unpack_from(self._buf, self.offsets[index])[0]
+
+    def __iter__(self):
+        for offset in self.offsets:
+            yield self.message.unpack_from(self._buf, offset)[0]
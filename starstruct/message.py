@@ -1,11 +1,20 @@
 """StarStruct class."""
 
 import collections
+import sys
+import types
 
 import struct
 import starstruct.modes
+from starstruct import registry
 from starstruct.element import Element
-from starstruct.startuple import StarTuple
+from starstruct.elementcallable import ElementCallable
+from starstruct.elementlength import ElementLength
+from starstruct.columns import unpack_columns
+from starstruct.projection import Projection
+from starstruct.startuple import StarTuple, TupleMapping
+from starstruct.transcode import transcode, transcode_into
+from starstruct.view import view_class
 
 
 # pylint: disable=line-too-long
@@ -13,7 +22,7 @@ class Message(object):
     """An object much like NamedTuple, but with additional formatting."""
 
     # pylint: disable=too-many-branches
-    def __init__(self, name, fields, mode=starstruct.modes.Mode.Native, alignment=1):
+    def __init__(self, name, fields, mode=starstruct.modes.Mode.Native, alignment=1, cache_packed=False, trusted=False, module=None):
         """
         Initialize a StarStruct object.
 
@@ -21,6 +30,22 @@ class Message(object):
         struct module functions for packing and unpacking data, and a
         namedtuple instance which is used to organize the data provided to the
         pack functions and returned from the unpack functions.
+
+        If cache_packed is True the namedtuples returned by unpack() and
+        make() keep their packed bytes, so they can be packed again without
+        packing each field, and tuples with the same bytes are equal without
+        comparing their values.
+
+        If trusted is True the values are assumed to have already been
+        validated: unpacked callable fields are not checked against their
+        expected values, enum values are not validated (values that aren't
+        members of the enum are unpacked as they are) and the sizes of
+        strings are not checked.  Use with_mode(trusted=True) for a trusted
+        variant of a message.
+
+        The message is registered by its definition and the name of the
+        module that defines it (see starstruct.registry), by default the
+        module that creates the message.
         """
 
         # The name must be a string, this is provided to the
@@ -29,8 +54,13 @@ class Message(object):
             raise TypeError('invalid name: {}'.format(name))
 
         self._name = name
+        if module is None:
+            module = sys._getframe(1).f_globals.get('__name__')  # pylint: disable=protected-access
+        self._module = module
         self.mode = mode
         self.alignment = alignment
+        self.cache_packed = cache_packed
+        self.trusted = trusted
 
         # The structure definition must be a list of
         #   ('name', 'format', <optional>)
@@ -42,6 +72,12 @@ class Message(object):
         if not isinstance(mode, starstruct.modes.Mode):
             raise TypeError('invalid mode: {}'.format(mode))
 
+        # Keep the fields so variants of this message can be created in other
+        # modes, each variant is only created once.
+        self._fields = fields
+        self._variants = {(mode, alignment, trusted): self}
+        self._origin = self
+
         # Create an ordered dictionary (so element order is preserved) out of
         # the individual message fields.  Ensure that there are no duplicate
         # field names.
@@ -64,19 +100,161 @@ class Message(object):
             # Give each element information about the other elements
             elem._elements = self._elements
 
+        if trusted:
+            for elem in self._elements.values():
+                elem.trust()
+
         # Now that the format has been validated, create a named tuple with the
         # correct fields.
         named_fields = [elem.name for elem in self._elements.values() if elem.name]
         self._tuple = StarTuple(self._name, named_fields, self._elements)
+        self._tuple._message = self
+
+        self._compile()
+
+        # Register the message so it (and its tuples) can be pickled
+        self._key = registry.schema_key(self._name, fields, mode, alignment,
+                                        module, cache_packed, trusted)
+        registry.register(self)
+
+    def __reduce__(self):
+        # Messages are pickled by their key, so the message has to be defined
+        # in the process that unpickles it
+        return (registry.lookup, (self._key,))
+
+    def _compile(self):
+        """
+        Determine the layout of the fixed size elements at the start of the
+        message, and create a template of the packed bytes for that part of
+        the message.
+
+        The template holds all constants, padding and alignment fill, so
+        packing a message only has to fill in the other fixed size elements
+        before appending the variable size elements.
+        """
+        # The offset of each element in the fixed size prefix of the message
+        self._layout = []
+        offset = 0
+        for elem in self._elements.values():
+            size = elem.static_size
+            if size is None:
+                break
+            self._layout.append((elem, offset))
+            offset += size
+        self._prefix_size = offset
+
+        # All elements after the first variable size element must be packed
+        # individually.
+        self._dynamic = list(self._elements.values())[len(self._layout):]
+
+        template = bytearray(self._prefix_size)
+        self._fill = []
+        for (elem, offset) in self._layout:
+            if elem.constant_bytes is None:
+                self._fill.append((elem, offset))
+            else:
+                template[offset:offset + elem.static_size] = elem.constant_bytes
+        self._template = bytes(template)
+
+        # The variable size elements need the values of the elements they
+        # reference (such as lengths and discriminators) to find their size,
+        # those are the only values that have to be unpacked to skip over
+        # the message.  Fixed size elements after the first variable size
+        # element (such as discriminated elements with messages of the same
+        # size) can also need them.  Lengths reference the element they are
+        # the length of, which doesn't have to be unpacked.
+        self._refs = {elem.ref for elem in self._dynamic
+                      if not isinstance(elem, ElementLength)
+                      and isinstance(getattr(elem, 'ref', None), str)}
+        self._skim = [(elem, offset) for (elem, offset) in self._layout
+                      if elem.name in self._refs]
+        self._skim_end = max((offset + elem.static_size for (elem, offset) in self._skim), default=0)
+
+        # Projections, views and transcoding plans depend on the layout, so
+        # they have to be recreated
+        self._projections = {}
+        self._view = None
+        self._plan = None
+
+    @property
+    def static_size(self):
+        """
+        The number of bytes every packed message occupies, or None if the
+        size depends on the packed values.
+        """
+        if self._dynamic:
+            return None
+        return self._prefix_size
 
     def update(self, mode=None, alignment=None):
-        """ Change the mode of a message. """
+        """
+        Change the mode of a message.
+
+        This changes the message in place, so it must not be used while the
+        message is being used by other threads, use with_mode() instead.
+        """
         if mode and not isinstance(mode, starstruct.modes.Mode):
             raise TypeError('invalid mode: {}'.format(mode))
 
+        if mode:
+            self.mode = mode
+
+        if alignment:
+            self.alignment = alignment
+
         # Change the mode for all elements
         for key in self._elements.keys():
-            self._elements[key].update(mode, alignment)
+            self._elements[key].update(self.mode, self.alignment)
+
+        # The sizes and constant values may have changed
+        self._compile()
+
+        # This message no longer matches its variants
+        self._variants = {(self.mode, self.alignment, self.trusted): self}
+
+        # Register the message in the new mode, the old key no longer
+        # describes it
+        registry.unregister(self)
+        self._key = registry.schema_key(self._name, self._fields, self.mode, self.alignment,
+                                        self._module, self.cache_packed, self.trusted)
+        registry.register(self)
+
+    def with_mode(self, mode=None, alignment=None, trusted=None):
+        """
+        Return a variant of this message that packs and unpacks in a
+        different mode or alignment, or that trusts the values it unpacks
+        and makes (see Message()).
+
+        Unlike update() this message is not changed, so one message can be
+        used with different modes at the same time.  Variants are only
+        created once, and the variants of sub-messages are shared by all of
+        the messages that use them.  The tuples unpacked by a variant are
+        instances of this message's tuple.
+        """
+        if mode is None:
+            mode = self.mode
+        if alignment is None:
+            alignment = self.alignment
+        if trusted is None:
+            trusted = self.trusted
+
+        key = (mode, alignment, trusted)
+        try:
+            return self._variants[key]
+        except KeyError:
+            pass
+
+        variant = Message(self._name, self._fields, mode, alignment, self.cache_packed, trusted,
+                          self._module)
+
+        # The variant's tuples are a subclass of this message's tuple that
+        # are packed by the variant
+        variant._tuple = type(self._name, (self._tuple,), {'_message': variant})
+        variant._variants = self._variants
+        variant._origin = self._origin
+
+        # If another thread created the same variant use the first one
+        return self._variants.setdefault(key, variant)
 
     def is_unpacked(self, other):
         """
@@ -114,32 +292,365 @@ class Message(object):
                     return False
         return True
 
-    def pack(self, obj=None, **kwargs):
-        """Pack the provided values using the initialized format."""
+    def _values(self, obj, kwargs):
+        """
+        Return the values to pack from a dictionary or tuple argument, or the
+        keyword arguments.
+        """
         # Handle a positional dictionary argument as well as the more generic kwargs
         if obj and isinstance(obj, dict):
-            kwargs = obj
-        return b''.join(elem.pack(kwargs) for elem in self._elements.values())
+            return obj
+        elif isinstance(obj, self._tuple):
+            # Access the tuple values by position rather than creating a
+            # dictionary
+            return obj._mapping()
+        elif hasattr(obj, '_asdict'):
+            # Other namedtuples (including tuples from other messages and
+            # projections) are packed by field name
+            return obj._asdict()
+        elif isinstance(obj, (tuple, list)):
+            # Any other sequence must have a value for each field in order
+            if len(obj) != len(self._tuple._fields):
+                raise ValueError('expected {} values for {}, got {}'.format(
+                    len(self._tuple._fields), self._name, len(obj)))
+            return TupleMapping(obj, self._tuple._index)
+        return kwargs
+
+    def pack(self, obj=None, **kwargs):
+        """
+        Pack the provided values using the initialized format.
+
+        The values can be provided as a dictionary, keyword arguments, a
+        namedtuple with the same field names, or a plain sequence of values in
+        field order.
+        """
+        # The tuples of variants of this message are also instances of its
+        # tuple, but their bytes are packed in another mode
+        if isinstance(obj, self._tuple) and obj._packed is not None and obj._message is self:
+            return bytes(obj._packed)
+        values = self._values(obj, kwargs)
+
+        if not self._fill and not self._dynamic:
+            # Every element is a constant
+            return self._template
+
+        buf = bytearray(self._template)
+        for (elem, offset) in self._fill:
+            elem.pack_into(values, buf, offset)
+        for elem in self._dynamic:
+            buf += elem.pack(values)
+        return bytes(buf)
+
+    def pack_tuple(self, values):
+        """
+        Pack a tuple of this message or a plain sequence of values in field
+        order.  The values are accessed by position, so no dictionary is
+        created.
+        """
+        if not isinstance(values, (tuple, list)):
+            raise TypeError('invalid values for {}: {}'.format(self._name, values))
+        return self.pack(values)
+
+    def pack_into(self, buf, offset=0, obj=None, **kwargs):
+        """
+        Pack the provided values into a writable buffer starting at offset.
+
+        Returns the offset following the packed message.
+        """
+        if isinstance(obj, self._tuple) and obj._packed is not None and obj._message is self:
+            end = offset + len(obj._packed)
+            buf[offset:end] = obj._packed
+            return end
+        values = self._values(obj, kwargs)
+
+        end = offset + self._prefix_size
+        buf[offset:end] = self._template
+        for (elem, pos) in self._fill:
+            elem.pack_into(values, buf, offset + pos)
+        for elem in self._dynamic:
+            end = elem.pack_into(values, buf, end)
+        return end
 
     def unpack_partial(self, buf):
         """
         Unpack a partial message from a buffer.
 
-        This doesn't re-use the "unpack_from" function name from the struct
-        module because the parameters and return values are not consistent
-        between this function and the struct module.
+        Returns the unpacked message and the unused bytes from the end of the
+        buffer, use unpack_from() to get the offset of the unused bytes
+        instead.
+        """
+        (msg, offset) = self.unpack_from(buf)
+        return (msg, buf[offset:])
+
+    def unpack_from(self, buf, offset=0):
+        """
+        Unpack a message from a buffer starting at offset.
+
+        Unlike unpack_partial() the remaining bytes are not sliced out of the
+        buffer, instead the offset following the message is returned.  This
+        allows many messages to be unpacked from a single large buffer.
         """
         msg = self._tuple._make([None] * len(self._tuple._fields))
-        for elem in self._elements.values():
-            (val, unused) = elem.unpack(msg, buf)
-            buf = unused
+        (msg, end) = self._unpack_elements(msg, self._elements.values(), buf, offset)
+
+        if self.cache_packed:
+            if isinstance(buf, bytes) and offset == 0 and end == len(buf):
+                msg._packed = buf
+            else:
+                # Other buffers could change, and a view of part of a buffer
+                # would keep all of it alive, so the bytes are copied
+                msg._packed = bytes(buf[offset:end])
+        return (msg, end)
+
+    def iter_unpack(self, buf, where=None, offset=0):
+        """
+        Unpack each message in a buffer of consecutive messages.
+
+        If where is provided (see starstruct.predicate) only the messages
+        that match it are unpacked, the others are skipped without being
+        unpacked.
+        """
+        test = where.compile(self) if where is not None else None
+        end = len(buf)
+        while offset < end:
+            if test is None or test(buf, offset):
+                (msg, offset) = self.unpack_from(buf, offset)
+                yield msg
+            else:
+                offset = self.skip(buf, offset)
+
+    def unpack_columns(self, buf, numpy_arrays=False):
+        """
+        Unpack a buffer of consecutive messages into a dictionary of field
+        names and columns of values, see starstruct.columns.
+        """
+        return unpack_columns(self, buf, numpy_arrays)
+
+    def transcode(self, buf, to_mode, offset=0):
+        """
+        Return the packed message at offset in the buffer converted to
+        another mode, without unpacking it.  See starstruct.transcode.
+        """
+        return transcode(self, buf, to_mode, offset)
+
+    def transcode_into(self, buf, to_mode, offset=0):
+        """
+        Convert the packed message at offset in a writable buffer to another
+        mode in place.  Returns the offset following the message.
+        """
+        return transcode_into(self, buf, to_mode, offset)
+
+    @staticmethod
+    def _unpack_elements(msg, elements, buf, offset):
+        """
+        Unpack the supplied elements into a (partially unpacked) message.
+        """
+        for elem in elements:
+            (val, offset) = elem.unpack_from(msg, buf, offset)
             # Update the unpacked message with all non-padding elements
             if elem.name:
                 msg = msg._replace(**dict([(elem.name, val)]))
-        return (msg, buf)
+        return (msg, offset)
+
+    def skip(self, buf, offset=0):
+        """
+        Find the end of a message in a buffer starting at offset, without
+        unpacking any values other than those needed to find the sizes of
+        the variable size elements.
+        """
+        if not self._dynamic:
+            return offset + self._prefix_size
+
+        ctx = types.SimpleNamespace()
+        for (elem, pos) in self._skim:
+            setattr(ctx, elem.name, elem.unpack_from(ctx, buf, offset + pos)[0])
+
+        offset += self._prefix_size
+        for elem in self._dynamic:
+            if elem.name in self._refs:
+                (val, offset) = elem.unpack_from(ctx, buf, offset)
+                setattr(ctx, elem.name, val)
+            else:
+                offset = elem.skip(ctx, buf, offset)
+        return offset
+
+    def frame_length(self, buf, offset=0):
+        """
+        Return the number of bytes the message starting at offset occupies,
+        or if the buffer is too short to tell, the negative number of
+        additional bytes needed.
+
+        Only the values needed to find the sizes of the variable size
+        elements are unpacked, and the size of lists of fixed size messages
+        is calculated.  The buffer doesn't have to hold the whole message,
+        only enough of it to find the size.
+        """
+        if not self._dynamic:
+            return self._prefix_size
+
+        missing = offset + self._skim_end - len(buf)
+        if missing > 0:
+            return -missing
+
+        ctx = types.SimpleNamespace()
+        for (elem, pos) in self._skim:
+            setattr(ctx, elem.name, elem.unpack_from(ctx, buf, offset + pos)[0])
+
+        end = offset + self._prefix_size
+        for elem in self._dynamic:
+            if elem.name in self._refs:
+                # The value of the element is needed to find the size of
+                # another element
+                missing = end + (elem.static_size or 1) - len(buf)
+                if missing > 0:
+                    return -missing
+                try:
+                    (val, end) = elem.unpack_from(ctx, buf, end)
+                except (struct.error, IndexError, ValueError):
+                    return -1
+                setattr(ctx, elem.name, val)
+            else:
+                end = elem.frame_end(ctx, buf, end)
+                if end < 0:
+                    return end
+        return end - offset
+
+    def _spans(self, buf, offset):
+        """
+        Find the start and end of each element of a packed message, only the
+        elements needed to find the sizes of the variable size elements are
+        unpacked.
+        """
+        spans = {}
+        for (elem, pos) in self._layout:
+            spans[elem.name] = (elem, offset + pos, offset + pos + elem.static_size)
+
+        ctx = types.SimpleNamespace()
+        for (elem, pos) in self._skim:
+            setattr(ctx, elem.name, elem.unpack_from(ctx, buf, offset + pos)[0])
+
+        offset += self._prefix_size
+        for elem in self._dynamic:
+            start = offset
+            if elem.name in self._refs:
+                (val, offset) = elem.unpack_from(ctx, buf, offset)
+                setattr(ctx, elem.name, val)
+            else:
+                offset = elem.skip(ctx, buf, offset)
+            spans[elem.name] = (elem, start, offset)
+        return (ctx, spans)
+
+    def patch(self, buf, offset=0, **fields):
+        """
+        Change the value of fields in a packed message without repacking the
+        rest of the message.
+
+        The buffer must be writable (such as a bytearray).  Fields can only
+        be patched if the packed size of the new value is the same as the old
+        value, so length and discriminator fields can't be patched.  Callable
+        fields that are packed from any of the patched fields are recomputed,
+        fields referenced as bytes are read straight from the buffer.
+        """
+        for name in fields:
+            if name not in self._tuple._fields:
+                raise ValueError('invalid field {} for {}'.format(name, self._name))
+            elif name in self._refs:
+                raise ValueError('field {} of {} determines the size of the message'.format(
+                    name, self._name))
+            elif isinstance(self._elements[name], ElementCallable):
+                raise ValueError('callable field {} of {} can not be patched'.format(
+                    name, self._name))
+
+        (ctx, spans) = self._spans(buf, offset)
+
+        values = dict(vars(ctx))
+        values.update(fields)
+        for name in fields:
+            (elem, start, end) = spans[name]
+
+            # Fixed size elements can reference fields (such as the
+            # discriminator of a discriminated element) that weren't needed
+            # to find the spans
+            ref = getattr(elem, 'ref', None)
+            if isinstance(ref, str) and ref not in values and ref in spans:
+                (ref_elem, ref_start, _) = spans[ref]
+                values[ref] = ref_elem.unpack_from(ctx, buf, ref_start)[0]
+
+            data = elem.pack(values)
+            if len(data) != end - start:
+                raise ValueError('patching {} of {} would change the length from {} to {}'.format(
+                    name, self._name, end - start, len(data)))
+            buf[start:end] = data
+
+        # Recompute any callable elements that depend on the patched fields
+        changed = set(fields)
+        for (elem, _, _) in spans.values():
+            if not isinstance(elem, ElementCallable) or elem._pack_func is None:
+                continue
+
+            refs = [ref.decode('utf-8') if isinstance(ref, bytes) else ref
+                    for ref in elem._pack_args]
+            if changed.isdisjoint(refs):
+                continue
+
+            self._pack_callable(elem, buf, ctx, spans, fields, values)
+            changed.add(elem.name)
+
+    @staticmethod
+    def _pack_callable(elem, buf, ctx, spans, fields=(), values=None):
+        """
+        Recompute a callable element of a packed message in the buffer.
+        Fields referenced as bytes are read straight from the buffer, the
+        other fields are made from values if they are in fields or else
+        unpacked from the buffer.
+        """
+        items = []
+        for ref in elem._pack_args:
+            name = ref.decode('utf-8') if isinstance(ref, bytes) else ref
+            (ref_elem, ref_start, ref_end) = spans[name]
+            if isinstance(ref, bytes):
+                items.append(bytes(buf[ref_start:ref_end]))
+            elif name in fields:
+                items.append(ref_elem.make(values))
+            else:
+                items.append(ref_elem.unpack_from(ctx, buf, ref_start)[0])
+
+        (_, start, end) = spans[elem.name]
+        buf[start:end] = elem.pack_result(elem._pack_func(*items))
+
+    def projection(self, *fields):
+        """
+        Return a Projection that only unpacks the named fields of this
+        message.  Projections are cached, so this can be called for each
+        message that is unpacked.
+        """
+        try:
+            return self._projections[fields]
+        except KeyError:
+            projection = Projection(self, fields)
+            self._projections[fields] = projection
+            return projection
+
+    def view(self, buf, offset=0):
+        """
+        Return a view that reads and writes the fields of a packed message
+        directly in the buffer, see starstruct.view.  The message must have
+        a fixed size.
+        """
+        if self._view is None:
+            self._view = view_class(self)
+        return self._view(buf, offset)
+
+    def unpack(self, buf, fields=None):
+        """
+        Unpack the buffer using the initialized format.
+
+        If fields is provided only those fields are unpacked, see
+        projection().
+        """
+        if fields is not None:
+            return self.projection(*fields).unpack(buf)
 
-    def unpack(self, buf):
-        """Unpack the buffer using the initialized format."""
         (msg, unused) = self.unpack_partial(buf)
         if unused:
             error = 'buffer not fully used by unpack: {}'.format(unused)
@@ -162,7 +673,8 @@ class Message(object):
             val = self._elements[field].make(kwargs)
             msg = msg._replace(**dict([(field, val)]))
 
-        # msg.__packed = self.pack(**kwargs)
+        if self.cache_packed:
+            msg._packed = self.pack(kwargs)
         return msg
 
     def __len__(self):
@@ -0,0 +1,209 @@
+"""
+A set of StarStruct messages that share a header.
+
+Messages can be distinguished by the value of a shared header field (such as
+an enum), in which case the set is created from a dictionary of header values
+and messages:
+
+.. code-block:: python
+
+    Messages = MessageSet({
+        MsgType.status: StatusMessage,
+        MsgType.command: CommandMessage,
+    }, key='type')
+
+    msg = Messages.unpack(data)
+
+Or they can be distinguished by a leading constant element, in which case the
+constant values may have different lengths:
+
+.. code-block:: python
+
+    Messages = MessageSet([
+        Message('Status', [('sync', 'B', (0xa5,)), ...]),
+        Message('Command', [('sync', 'BB', (0xa6, 0x01)), ...]),
+        Message('Config', [('sync', 'BB', (0xa6, 0x02)), ...]),
+    ])
+
+The header is only unpacked once, the selected message then continues
+unpacking the buffer after the header.
+"""
+
+import enum
+
+from starstruct.elementconstant import ElementConstant
+
+
+def _same_element(a, b):
+    """Determine if two header elements pack and unpack the same way."""
+    if type(a) is not type(b) or a.name != b.name or a.static_size != b.static_size:
+        return False
+    elif a.constant_bytes is not None or b.constant_bytes is not None:
+        # Constants and padding are the same if they pack the same bytes
+        return a.constant_bytes == b.constant_bytes
+    return a.format == b.format and getattr(a, 'ref', None) == getattr(b, 'ref', None)
+
+
+# pylint: disable=protected-access
+class MessageSet(object):
+    """
+    Unpack any of a set of messages that are distinguished by their header.
+
+    :param messages: Either a dictionary that maps values of the header's
+        key field to messages, or a list of messages that each start with a
+        unique constant element.
+    :param key: The name of the header field that identifies each message,
+        by default the first field.  Only used when messages is a dictionary.
+    """
+    def __init__(self, messages, key=None):
+        # For each message, track the elements that must be unpacked after
+        # the header.
+        self._body = {}
+
+        if isinstance(messages, dict):
+            self._init_keyed(messages, key)
+        else:
+            self._init_prefixed(list(messages))
+
+    def _init_keyed(self, messages, key):
+        if not messages:
+            raise ValueError('no messages provided')
+
+        first = next(iter(messages.values()))
+        names = list(first._elements.keys())
+        if key is None:
+            key = names[0]
+        elif key not in names:
+            raise ValueError('invalid key {} for {}'.format(key, first._name))
+
+        # The header is every element up to and including the key element,
+        # it has to be a fixed size and must be the same in every message.
+        self._header = list(first._elements.values())[:names.index(key) + 1]
+        if len(first._layout) < len(self._header):
+            raise ValueError('header of {} is not a fixed size'.format(first._name))
+        self._key = [elem.name for elem in self._header if elem.name].index(key)
+
+        for message in messages.values():
+            elements = list(message._elements.values())
+            header = elements[:len(self._header)]
+            if len(header) != len(self._header) or \
+                    not all(_same_element(a, b) for (a, b) in zip(header, self._header)):
+                raise ValueError('header of {} does not match {}'.format(message._name, first._name))
+            self._body[message] = elements[len(self._header):]
+
+        # Convert raw values to the enum values that the key element unpacks
+        key_elem = [elem for elem in self._header if elem.name][self._key]
+        self._table = {}
+        for (value, message) in messages.items():
+            if isinstance(key_elem.ref, type) and issubclass(key_elem.ref, enum.Enum):
+                value = key_elem.ref(value)
+            self._table[value] = message
+
+        self._dispatch = self._dispatch_keyed
+
+    def _init_prefixed(self, messages):
+        if not messages:
+            raise ValueError('no messages provided')
+
+        # Build a prefix trie of the packed constant values, each node is a
+        # dictionary of byte values to child nodes, the None entry of a node
+        # holds the message whose constant ends at that node.
+        self._trie = {}
+        prefixes = {}
+        for message in messages:
+            elem = next(iter(message._elements.values()), None)
+            if not isinstance(elem, ElementConstant):
+                raise ValueError('{} does not start with a constant'.format(message._name))
+
+            prefix = elem.constant_bytes
+            if prefix in prefixes:
+                raise ValueError('{} and {} have the same constant {}'.format(
+                    prefixes[prefix][0]._name, message._name, prefix))
+
+            # Unpacking the constant from the buffer would give the same value
+            value = elem._struct.unpack(prefix)
+            prefixes[prefix] = (message, value, len(prefix))
+
+            node = self._trie
+            for byte in prefix:
+                node = node.setdefault(byte, {})
+            node[None] = prefixes[prefix]
+
+            self._body[message] = list(message._elements.values())[1:]
+
+        if len({len(prefix) for prefix in prefixes}) == 1:
+            # When all of the constants are the same length a trie isn't
+            # needed to find the matching prefix.
+            self._prefixes = prefixes
+            self._prefix_size = len(next(iter(prefixes)))
+            self._dispatch = self._dispatch_prefix
+        else:
+            self._dispatch = self._dispatch_trie
+
+    @property
+    def messages(self):
+        """The messages in this set."""
+        return list(self._body)
+
+    def _dispatch_keyed(self, buf, offset):
+        msg = None
+        values = []
+        for elem in self._header:
+            (val, offset) = elem.unpack_from(msg, buf, offset)
+            if elem.name:
+                values.append(val)
+
+        try:
+            message = self._table[values[self._key]]
+        except KeyError:
+            raise ValueError('no message for {} in {}'.format(values[self._key], list(self._table)))
+        return (message, values, offset)
+
+    def _dispatch_prefix(self, buf, offset):
+        prefix = bytes(buf[offset:offset + self._prefix_size])
+        try:
+            (message, value, size) = self._prefixes[prefix]
+        except KeyError:
+            raise ValueError('no message for {} in {}'.format(prefix, list(self._prefixes)))
+        return (message, [value], offset + size)
+
+    def _dispatch_trie(self, buf, offset):
+        # Find the longest constant that matches the buffer
+        match = None
+        node = self._trie
+        for byte in memoryview(buf)[offset:]:
+            node = node.get(byte)
+            if node is None:
+                break
+            match = node.get(None, match)
+
+        if match is None:
+            raise ValueError('no message for {}'.format(bytes(buf[offset:offset + 8])))
+
+        (message, value, size) = match
+        return (message, [value], offset + size)
+
+    def message_for(self, buf, offset=0):
+        """
+        Return the message that matches the header in the buffer.
+        """
+        return self._dispatch(buf, offset)[0]
+
+    def unpack_from(self, buf, offset=0):
+        """
+        Unpack whichever message matches the header in the buffer starting at
+        offset.  Returns the unpacked message and the offset following it.
+        """
+        (message, values, offset) = self._dispatch(buf, offset)
+        body = self._body[message]
+
+        msg = message._tuple._make(values + [None] * (len(message._tuple._fields) - len(values)))
+        return message._unpack_elements(msg, body, buf, offset)
+
+    def unpack(self, buf):
+        """Unpack whichever message matches the header in the buffer."""
+        (msg, offset) = self.unpack_from(buf)
+        if offset != len(buf):
+            error = 'buffer not fully used by unpack: {}'.format(buf[offset:])
+            raise ValueError(error)
+        return msg
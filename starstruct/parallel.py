@@ -0,0 +1,147 @@
+"""
+Decode large files of messages with a pool of worker processes.
+
+.. code-block:: python
+
+    for batch in unpack_file('capture.bin', Frame, workers=4):
+        for frame in batch:
+            handle(frame)
+
+The file is split into chunks at record boundaries.  For fixed size messages
+the boundaries are calculated, for variable size messages the file is first
+skimmed (see Message.skip()) to find the offset of each record, unless the
+offsets are provided.  Each worker maps the file into memory once and decodes
+the chunks it is given, the unpacked messages are returned to the parent
+process in batches (see starstruct.registry for how they are pickled) and are
+yielded in file order.
+
+The workers must be able to find the message in the registry.  By default they
+import the module that defined the message, if other modules are needed to
+define it (such as the modules of nested messages created at runtime) they
+must be provided as schemas so the workers can import them.
+"""
+
+import collections
+import mmap
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+
+from starstruct import registry
+
+
+# The state of a worker process, set by the pool initializer
+_worker = {}
+
+
+def record_offsets(buf, message, offset=0, end=None):
+    """
+    Return the offset of each message in the buffer as an array('Q'),
+    without unpacking the messages.
+    """
+    if end is None:
+        end = len(buf)
+
+    offsets = array('Q')
+    size = message.static_size
+    if size is not None:
+        offsets.extend(range(offset, end - size + 1, size))
+        return offsets
+
+    skip = message.skip
+    while offset < end:
+        offsets.append(offset)
+        offset = skip(buf, offset)
+    return offsets
+
+
+def unpack_range(buf, message, offset, end):
+    """Unpack all of the messages in buf from offset to end."""
+    ret = []
+    unpack_from = message.unpack_from
+    while offset < end:
+        (msg, offset) = unpack_from(buf, offset)
+        ret.append(msg)
+    return ret
+
+
+def _init_worker(path, key, variant, schemas):
+    registry.load_schemas(*schemas)
+    with open(path, 'rb') as f:
+        _worker['buf'] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # Variants are only registered once they are created, so create the
+    # variant from the message its module defines
+    _worker['message'] = registry.lookup(key).with_mode(*variant)
+
+
+def _unpack_chunk(offset, end):
+    return unpack_range(_worker['buf'], _worker['message'], offset, end)
+
+
+def _chunks(buf, message, batch_size, offsets):
+    """Return the (start, end) offsets of each batch of records."""
+    size = message.static_size
+    if size is not None and offsets is None:
+        if len(buf) % size:
+            raise ValueError('file size {} is not a multiple of the {} message size {}'.format(
+                len(buf), message._name, size))  # pylint: disable=protected-access
+        step = size * batch_size
+        return [(start, min(start + step, len(buf))) for start in range(0, len(buf), step)]
+
+    if offsets is None:
+        offsets = record_offsets(buf, message)
+    bounds = list(offsets[::batch_size]) + [len(buf)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def unpack_file(path, message, workers=None, batch_size=10000, offsets=None, schemas=None,
+                mp_context=None):
+    """
+    Unpack every message in a file using a pool of worker processes, and
+    yield the messages in batches in file order.
+
+    :param path: The file of packed messages
+    :param message: The message in the file
+    :param workers: The number of worker processes, by default the number of
+        CPUs.  If workers is 0 the file is decoded in this process.
+    :param batch_size: The number of messages in each batch
+    :param offsets: The offset of each message in the file (such as an
+        array from record_offsets()), only needed for variable size messages
+    :param schemas: Modules that the workers import to define the message, by
+        default the module that defined the message
+    :param mp_context: The multiprocessing context used to start the workers
+    """
+    with open(path, 'rb') as f:
+        if not f.seek(0, 2):
+            # Empty files can't be mapped
+            return
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    try:
+        chunks = _chunks(buf, message, batch_size, offsets)
+
+        if workers == 0:
+            for (start, end) in chunks:
+                yield unpack_range(buf, message, start, end)
+            return
+        elif workers is None:
+            workers = os.cpu_count() or 1
+
+        # pylint: disable=protected-access
+        if schemas is None:
+            schemas = (message._module,)
+        variant = (message.mode, message.alignment, message.trusted)
+        with ProcessPoolExecutor(workers, mp_context=mp_context, initializer=_init_worker,
+                                 initargs=(path, message._origin._key, variant, schemas)) as executor:
+            # Only keep a few batches in flight for each worker, so the
+            # decoded messages don't all have to be held in memory
+            window = 2 * workers
+            pending = collections.deque()
+            for (start, end) in chunks:
+                pending.append(executor.submit(_unpack_chunk, start, end))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+    finally:
+        buf.close()
@@ -0,0 +1,190 @@
+"""
+Predicates that select messages by checking their packed bytes.
+
+.. code-block:: python
+
+    from starstruct.predicate import Field
+
+    alarms = (Field('msg_type') == MsgType.alarm) & (Field('severity') >= 3)
+    for msg in Frame.iter_unpack(capture, where=alarms):
+        handle(msg)
+
+A predicate is compiled for a message into a function that reads the raw
+struct values of the fields it uses from their offsets in the message, so
+messages that don't match are skipped without being unpacked.  Only fields
+in the fixed size part at the start of a message can be used.  Values are
+converted to the raw values that are packed before comparing, so enum fields
+are compared by the value of the enum members.
+"""
+
+import enum
+import operator
+from decimal import Decimal
+
+from starstruct.elementbase import ElementBase
+from starstruct.elementenum import ElementEnum
+from starstruct.elementfixedpoint import ElementFixedPoint
+from starstruct.elementlength import ElementLength
+from starstruct.elementnum import ElementNum
+
+
+class Predicate(object):
+    """The base class of predicates, predicates are combined with & | ~."""
+
+    def __and__(self, other):
+        return All(self, other)
+
+    def __or__(self, other):
+        return Any(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+    def compile(self, message):
+        """
+        Return a function that takes a buffer and the offset of a message,
+        and returns True if the message matches the predicate.
+        """
+        raise NotImplementedError
+
+
+class Comparison(Predicate):
+    """Compare the value of a field with a value."""
+
+    def __init__(self, name, op, value):
+        self.name = name
+        self.op = op
+        self.value = value
+
+    def __repr__(self):
+        return 'Comparison({!r}, {}, {!r})'.format(self.name, self.op.__name__, self.value)
+
+    def compile(self, message):
+        # pylint: disable=protected-access
+        offsets = {elem.name: (elem, offset) for (elem, offset) in message._layout if elem.name}
+        if self.name not in offsets:
+            if self.name in message._elements:
+                raise ValueError('field {} of {} is not at a fixed offset'.format(
+                    self.name, message._name))
+            raise ValueError('invalid field {} for {}'.format(self.name, message._name))
+
+        (elem, pos) = offsets[self.name]
+        if not isinstance(elem, (ElementBase, ElementNum, ElementEnum, ElementLength, ElementFixedPoint)) \
+                or len(elem._struct.unpack(bytes(elem._struct.size))) != 1:
+            raise TypeError('field {} of {} can not be compared'.format(self.name, message._name))
+
+        if self.op is _contains:
+            value = frozenset(_raw(elem, val) for val in self.value)
+        else:
+            value = _raw(elem, self.value)
+
+        unpack_from = elem._struct.unpack_from
+        op = self.op
+
+        def test(buf, offset):
+            return op(unpack_from(buf, offset + pos)[0], value)
+        return test
+
+
+class All(Predicate):
+    """Match messages that match every one of the predicates."""
+
+    def __init__(self, *predicates):
+        self.predicates = predicates
+
+    def __repr__(self):
+        return 'All{!r}'.format(self.predicates)
+
+    def compile(self, message):
+        tests = [predicate.compile(message) for predicate in self.predicates]
+
+        def test(buf, offset):
+            return all(test(buf, offset) for test in tests)
+        return test
+
+
+class Any(Predicate):
+    """Match messages that match any of the predicates."""
+
+    def __init__(self, *predicates):
+        self.predicates = predicates
+
+    def __repr__(self):
+        return 'Any{!r}'.format(self.predicates)
+
+    def compile(self, message):
+        tests = [predicate.compile(message) for predicate in self.predicates]
+
+        def test(buf, offset):
+            return any(test(buf, offset) for test in tests)
+        return test
+
+
+class Not(Predicate):
+    """Match messages that don't match the predicate."""
+
+    def __init__(self, predicate):
+        self.predicate = predicate
+
+    def __repr__(self):
+        return 'Not({!r})'.format(self.predicate)
+
+    def compile(self, message):
+        inner = self.predicate.compile(message)
+
+        def test(buf, offset):
+            return not inner(buf, offset)
+        return test
+
+
+def _contains(value, values):
+    return value in values
+
+
+def _raw(elem, value):
+    """Convert a value to the raw value that is packed for the element."""
+    if isinstance(elem, ElementEnum):
+        if isinstance(value, str):
+            value = getattr(elem.ref, value)
+        return elem.ref(value).value
+    elif isinstance(elem, ElementFixedPoint):
+        return Decimal(value) * elem._scale  # pylint: disable=protected-access
+    elif isinstance(value, enum.Enum):
+        return value.value
+    return value
+
+
+class Field(object):
+    """
+    A field of a message, comparing a field with a value creates a predicate.
+    """
+    # Comparisons don't return booleans, so fields can't be hashed
+    __hash__ = None
+
+    def __init__(self, name):
+        self.name = name
+
+    def __repr__(self):
+        return 'Field({!r})'.format(self.name)
+
+    def __eq__(self, value):
+        return Comparison(self.name, operator.eq, value)
+
+    def __ne__(self, value):
+        return Comparison(self.name, operator.ne, value)
+
+    def __lt__(self, value):
+        return Comparison(self.name, operator.lt, value)
+
+    def __le__(self, value):
+        return Comparison(self.name, operator.le, value)
+
+    def __gt__(self, value):
+        return Comparison(self.name, operator.gt, value)
+
+    def __ge__(self, value):
+        return Comparison(self.name, operator.ge, value)
+
+    def isin(self, values):
+        """Match messages where the field has any of the values."""
+        return Comparison(self.name, _contains, list(values))
@@ -0,0 +1,88 @@
+"""
+Projections unpack only some of the fields of a StarStruct message.
+
+.. code-block:: python
+
+    Route = Frame.projection('source_id', 'seq')
+
+    for buf in frames:
+        route = Route.unpack(buf)
+        forward(route.source_id, route.seq, buf)
+
+Fields in the fixed size part of the message are unpacked directly from their
+offsets in the layout.  Variable size elements before a requested field are
+skipped, only the length or discriminator fields they reference are unpacked
+to find their size.  No other fields are unpacked or converted.
+"""
+
+import collections
+import types
+
+from starstruct.elementcallable import ElementCallable
+from starstruct.elementlength import ElementLength
+
+
+# pylint: disable=protected-access,too-few-public-methods
+class Projection(object):
+    """
+    Unpack the named fields of a message into a namedtuple.
+
+    :param message: The message to unpack fields from
+    :param fields: The names of the fields to unpack
+    """
+    def __init__(self, message, fields):
+        if not fields:
+            raise ValueError('no fields provided for {}'.format(message._name))
+
+        for name in fields:
+            if name not in message._tuple._fields:
+                raise ValueError('invalid field {} for {}'.format(name, message._name))
+            if isinstance(message._elements[name], ElementCallable):
+                # Callable elements are verified using the other fields of
+                # the message
+                raise ValueError('callable field {} of {} can not be projected'.format(
+                    name, message._name))
+
+        self.message = message
+        self.fields = tuple(fields)
+        self._tuple = collections.namedtuple(message._name + 'Projection', self.fields)
+
+        # Only the variable size elements up to the last requested field
+        # have to be stepped over.
+        needed = [index for (index, elem) in enumerate(message._dynamic) if elem.name in fields]
+        dynamic = message._dynamic[:needed[-1] + 1] if needed else []
+
+        # Keep the fields that the requested fields and the skipped
+        # variable size elements reference (such as discriminators), length
+        # fields reference the element they are the length of which isn't
+        # needed.
+        keep = set(fields)
+        for elem in [message._elements[name] for name in fields] + dynamic:
+            ref = getattr(elem, 'ref', None)
+            if isinstance(ref, str) and not isinstance(elem, ElementLength):
+                keep.add(ref)
+
+        self._static = [(elem, offset) for (elem, offset) in message._layout
+                        if elem.name in keep]
+        self._dynamic = [(elem, elem.name in keep) for elem in dynamic]
+        self._prefix_size = message._prefix_size
+
+    def unpack(self, buf, offset=0):
+        """
+        Unpack the requested fields of the message starting at offset.
+
+        Unlike Message.unpack() the rest of the buffer is not checked.
+        """
+        ctx = types.SimpleNamespace()
+        for (elem, pos) in self._static:
+            setattr(ctx, elem.name, elem.unpack_from(ctx, buf, offset + pos)[0])
+
+        offset += self._prefix_size
+        for (elem, keep) in self._dynamic:
+            if keep:
+                (val, offset) = elem.unpack_from(ctx, buf, offset)
+                setattr(ctx, elem.name, val)
+            else:
+                offset = elem.skip(ctx, buf, offset)
+
+        return self._tuple._make([getattr(ctx, name) for name in self.fields])
@@ -0,0 +1,126 @@
+"""
+Registry of messages that allows messages and unpacked tuples to be pickled.
+
+Every message is registered by a key made from its name, a description of its
+fields, its options and the name of the module that defines it, which is the
+same in every process that defines the message.
+Messages and the tuples they unpack are pickled as their key (and values),
+so they can be returned from process pool workers even though the tuple
+classes are created dynamically, and even if the message uses lambdas.
+
+Messages with the same name, fields and options that are defined by the same
+module have the same key, tuples are always restored as instances of the
+first of those messages that is registered.
+
+Worker processes must define the same messages, which usually happens when
+the module that defines them is imported.  load_schemas() can be used as the
+pool initializer to do that once for each worker:
+
+.. code-block:: python
+
+    with ProcessPoolExecutor(initializer=load_schemas,
+                             initargs=('myproject.messages',)) as executor:
+        frames = list(executor.map(decode_chunk, chunks))
+"""
+
+import enum
+import hashlib
+import importlib
+import weakref
+
+import starstruct
+
+
+# The registered messages, a message is removed once it is no longer used
+_messages = weakref.WeakValueDictionary()
+
+
+def _module_name(module):
+    """Return the name of a module that is the same in every process."""
+    if module == '__mp_main__':
+        # Spawned worker processes import the main module by another name
+        return '__main__'
+    return module
+
+
+def _describe(obj):
+    """
+    Return a description of part of a field that does not depend on the
+    process it was created in.
+    """
+    if isinstance(obj, starstruct.message.Message):
+        return obj._key  # pylint: disable=protected-access
+    elif isinstance(obj, (str, bytes, int, float, bool, type(None), enum.Enum)):
+        return repr(obj)
+    elif isinstance(obj, (tuple, list)):
+        return '({})'.format(', '.join(_describe(item) for item in obj))
+    elif isinstance(obj, (set, frozenset)):
+        return '{{{}}}'.format(', '.join(sorted(_describe(item) for item in obj)))
+    elif isinstance(obj, dict):
+        # Dictionaries are not always iterated in the same order in every
+        # process, so sort them like sets
+        return '{{{}}}'.format(', '.join(sorted('{}: {}'.format(_describe(key), _describe(val))
+                                                for (key, val) in obj.items())))
+    elif hasattr(obj, '__code__'):
+        # Functions, the line number tells lambdas (which all have the same
+        # name) apart
+        return '{}.{}:{}'.format(_module_name(obj.__module__), obj.__qualname__,
+                                 obj.__code__.co_firstlineno)
+    elif hasattr(obj, '__qualname__'):
+        # Classes and builtin functions
+        return '{}.{}'.format(_module_name(obj.__module__), obj.__qualname__)
+
+    text = repr(obj)
+    if ' at 0x' in text:
+        # The default repr includes the address of the object
+        return '{}.{}'.format(type(obj).__module__, type(obj).__qualname__)
+    return text
+
+
+def schema_key(name, fields, mode, alignment, module=None, cache_packed=False, trusted=False):
+    """
+    Return the key for a message with the supplied name, fields, mode,
+    alignment and options, defined by module.
+    """
+    description = _describe((_module_name(module), fields, mode, alignment, cache_packed, trusted))
+    digest = hashlib.sha1(description.encode('utf-8')).hexdigest()
+    return '{}-{}'.format(name, digest[:16])
+
+
+def register(message):
+    """
+    Register a message so it can be found by its key.  If a message with the
+    same key is already registered the first message is kept.
+    """
+    # pylint: disable=protected-access
+    return _messages.setdefault(message._key, message)
+
+
+def unregister(message):
+    """Remove a message from the registry, if it is registered."""
+    # pylint: disable=protected-access
+    if _messages.get(message._key) is message:
+        del _messages[message._key]
+
+
+def lookup(key):
+    """Return the message registered with key."""
+    try:
+        return _messages[key]
+    except KeyError:
+        raise KeyError('message {} is not registered, the module that defines it must be '
+                       'imported (see load_schemas())'.format(key)) from None
+
+
+def restore(key, values):
+    """Create a tuple of the message registered with key."""
+    return lookup(key)._tuple._make(values)  # pylint: disable=protected-access
+
+
+def load_schemas(*modules):
+    """
+    Import the modules that define messages, so the messages are registered.
+    This can be used as the initializer of a process pool.
+    """
+    for module in modules:
+        importlib.import_module(module)
@@ -1,6 +1,44 @@
 
 import collections
 
+from starstruct import registry
+
+
+class TupleMapping(object):
+    """
+    Access the values of a StarTuple by field name, without converting the
+    tuple into a dictionary.  This allows tuples to be packed by the same
+    elements that pack dictionaries.
+    """
+    __slots__ = ('_values', '_index')
+
+    def __init__(self, values, index):
+        self._values = values
+        self._index = index
+
+    def __getitem__(self, name):
+        return self._values[self._index[name]]
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def get(self, name, default=None):
+        """Return the value of a field, or default for unknown fields."""
+        if name in self._index:
+            return self._values[self._index[name]]
+        return default
+
+    def keys(self):
+        """Return the field names."""
+        return self._index.keys()
+
+
+def _hashable(value):
+    """Return a value that can be hashed, lists are converted to tuples."""
+    if isinstance(value, list):
+        return tuple(_hashable(item) for item in value)
+    return value
+
 
 def StarTuple(name, named_fields, elements):
     restricted_fields = {
@@ -20,7 +58,13 @@ def StarTuple(name, named_fields, elements):
 
         # Startuple additions
         'pack',
+        'pack_into',
         '_elements',
+        '_packed',
+        '_message',
+        '_index',
+        '_mapping',
+        '__reduce__',
         '__str__',
         '_name',
     }
@@ -30,16 +74,41 @@ def StarTuple(name, named_fields, elements):
     if intersection:
         raise ValueError('Restricted field used. Bad fields: {0}'.format(intersection))
 
-    named_tuple = collections.namedtuple(name, named_fields)
+    named_tuple = type(name, (collections.namedtuple(name, named_fields),), {
+        # The packed bytes of the tuple, only set by messages that cache the
+        # packed bytes.  Since tuples are immutable the bytes are still valid
+        # unless the tuple holds mutable values (such as lists) that have been
+        # changed, _replace() creates a new tuple without packed bytes.
+        '_packed': None,
+
+        # The message that created the tuple, used to pack the tuple
+        '_message': None,
+
+        # The position of each field in the tuple
+        '_index': {field: index for (index, field) in enumerate(named_fields)},
+    })
 
     # TODO: Auto update and replace!
 
+    def this_mapping(self):
+        return TupleMapping(self, self._index)
+
     def this_pack(self):
-        packed = bytes()
-        for _, value in self._elements.items():
-            packed += value.pack(self._asdict())
+        if self._packed is not None:
+            return bytes(self._packed)
+        elif self._message is not None:
+            return self._message.pack(self)
+
+        values = self._mapping()
+        return b''.join(value.pack(values) for value in self._elements.values())
+
+    def this_pack_into(self, buf, offset=0):
+        if self._message is not None:
+            return self._message.pack_into(buf, offset, self)
 
-        return packed
+        data = self.pack()
+        buf[offset:offset + len(data)] = data
+        return offset + len(data)
 
     def this_str(self):
         import pprint
@@ -58,7 +127,39 @@ def StarTuple(name, named_fields, elements):
 
         return fmt
 
+    def this_eq(self, other):
+        # Tuples that were created from the same packed bytes are equal
+        # without comparing every field, otherwise the values are compared
+        # (the bytes can differ in padding)
+        if self._packed is not None and type(other) is type(self) \
+                and other._packed is not None and self._packed == other._packed:
+            return True
+        return tuple.__eq__(self, other)
+
+    def this_ne(self, other):
+        ret = this_eq(self, other)
+        return ret if ret is NotImplemented else not ret
+
+    def this_hash(self):
+        # Tuples are hashed by their values like they are compared, lists
+        # (of sub-messages) are hashed like tuples
+        return hash(tuple(_hashable(value) for value in self))
+
+    def this_reduce(self):
+        # The tuple classes are created dynamically, so they can't be found by
+        # name when unpickling.  Instead the tuple is restored by the message
+        # that created it, which is found by its key.
+        if self._message is None:
+            raise TypeError('{} can only be pickled if it was created by a Message'.format(name))
+        return (registry.restore, (self._message._key, tuple(self)))
+
+    named_tuple._mapping = this_mapping
     named_tuple.pack = this_pack
+    named_tuple.pack_into = this_pack_into
+    named_tuple.__eq__ = this_eq
+    named_tuple.__ne__ = this_ne
+    named_tuple.__hash__ = this_hash
+    named_tuple.__reduce__ = this_reduce
     named_tuple.__str__ = this_str
     named_tuple._elements = elements
     named_tuple._name = name
@@ -0,0 +1,178 @@
+"""
+Resynchronizing stream reader for StarStruct messages.
+
+Reads messages from a lossy byte stream (such as a noisy serial link).  The
+leading constant element (sync word) or escaped start sequence of the message
+is used to find the start of each frame with bytes.find(), and the candidate
+frame is verified by unpacking it, which also checks any callable (checksum)
+elements.  When a candidate does not unpack the reader skips ahead to the next
+occurrence of the sync sequence rather than retrying every byte offset.  A
+candidate that is incomplete is only unpacked again once the number of bytes
+that Message.frame_length() says it needs have been received.
+
+.. code-block:: python
+
+    def frame_crc(*parts):
+        return binascii.crc32(b''.join(parts))
+
+    Frame = Message('Frame', [
+        ('sync', 'H', (0xeb90,)),
+        ('length', 'B', 'samples'),
+        ('samples', Sample, 'length'),
+        ('crc', 'I', {(frame_crc, b'length', b'samples')}),
+    ])
+
+    reader = StreamReader(Frame)
+    while True:
+        for frame in reader.feed(port.read(4096)):
+            handle(frame)
+
+    print('lost {} bytes'.format(reader.skipped))
+
+"""
+
+import struct
+
+from starstruct.elementconstant import ElementConstant
+from starstruct.elementescaped import ElementEscaped
+from starstruct.elementnone import ElementNone
+
+
+def sync_sequence(message) -> bytes:
+    """
+    Return the sequence of bytes that every packed message starts with.
+
+    This is the packed value of a leading constant element, or the start
+    sequence of a leading escaped element.
+    """
+    for elem in message._elements.values():  # pylint: disable=protected-access
+        if isinstance(elem, ElementNone):
+            # None elements take up no space, so look at the next element
+            continue
+        elif isinstance(elem, ElementConstant):
+            return elem.pack({})
+        elif isinstance(elem, ElementEscaped) and elem.escapor.start:
+            return elem.escapor.start
+        break
+
+    raise TypeError('message {} does not start with a sync sequence'.format(
+        message._name))  # pylint: disable=protected-access
+
+
+class StreamReader(object):
+    """
+    Unpack messages from a stream of bytes, resynchronizing on the message's
+    sync sequence whenever corrupt or missing data is found.
+
+    :param message: The message to unpack from the stream
+    :param sync: The sequence every message starts with, by default the
+        sequence is determined from the message
+    :param max_length: The largest frame size expected.  A candidate frame
+        that can't be unpacked is assumed to be incomplete until either a
+        following frame is unpacked or this many bytes have been received.
+    """
+    def __init__(self, message, sync=None, max_length=65536):
+        self.message = message
+        self.sync = sync if sync is not None else sync_sequence(message)
+        if not self.sync:
+            raise ValueError('invalid sync sequence: {}'.format(self.sync))
+        self.max_length = max_length
+
+        # The total number of bytes discarded, and the number of times that
+        # bytes had to be discarded to find the next message
+        self.skipped = 0
+        self.resyncs = 0
+
+        # The bytes that have not been consumed yet, and where to look for the
+        # next sync sequence.  hold is the start of a frame that may just be
+        # incomplete, it is kept until the buffer reaches the size the frame
+        # needs (need) unless a following frame unpacks successfully.
+        self._buf = bytearray()
+        self._search = 0
+        self._hold = None
+        self._need = 0
+
+    def feed(self, data: bytes=b'', final: bool=False) -> list:
+        """
+        Add data to the stream and return all messages that are complete.
+
+        :param data: The bytes received from the stream
+        :param final: If no more data will be received, any incomplete frame
+            left in the stream is discarded
+        :returns: A list of the unpacked messages
+        """
+        buf = self._buf
+        buf += data
+        ret = []
+
+        # Only try the held frame again once enough data has arrived, so a
+        # frame fed a byte at a time isn't unpacked after every byte
+        if self._hold is not None and (final or len(buf) >= self._need):
+            self._search = self._hold
+            self._hold = None
+
+        pos = 0
+        search = self._search
+        while True:
+            start = buf.find(self.sync, search)
+            if start < 0:
+                if self._hold is not None:
+                    keep = self._hold
+                elif final:
+                    keep = len(buf)
+                else:
+                    # Keep anything that could be the start of the next sync
+                    # sequence
+                    keep = max(pos, len(buf) - len(self.sync) + 1)
+                self._skip(keep - pos)
+                pos = keep
+                search = max(keep, len(buf) - len(self.sync) + 1)
+                break
+
+            try:
+                (msg, end) = self.message.unpack_from(buf, start)
+            except (struct.error, ValueError, IndexError):
+                if self._hold is None and not final and len(buf) - start < self.max_length:
+                    self._hold_frame(buf, start)
+
+                # Look for the next sync sequence
+                search = start + 1
+                continue
+
+            self._skip(start - pos)
+            ret.append(msg)
+            pos = search = end
+            self._hold = None
+
+        # Discard the consumed bytes
+        del buf[:pos]
+        self._search = search - pos
+        if self._hold is not None:
+            self._hold -= pos
+            self._need -= pos
+        return ret
+
+    def _hold_frame(self, buf, start):
+        """Hold the frame at start if it is incomplete."""
+        try:
+            length = self.message.frame_length(buf, start)
+        except (struct.error, ValueError, IndexError, KeyError):
+            length = -1
+
+        if length < 0:
+            self._hold = start
+            self._need = len(buf) - length
+        elif start + length > len(buf):
+            self._hold = start
+            self._need = start + length
+
+    def flush(self) -> list:
+        """
+        Unpack any remaining messages, discarding any incomplete frame.
+        """
+        return self.feed(final=True)
+
+    def _skip(self, count):
+        if count:
+            self.skipped += count
+            self.resyncs += 1
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+
+"""Tests for unpacking messages into columns"""
+
+import enum
+import unittest
+from array import array
+from binascii import crc32
+
+import pytest
+
+from starstruct import columns
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.parallel import record_offsets
+
+
+class MsgType(enum.Enum):
+    """Message types for testing columns"""
+    status = 1
+    alarm = 2
+
+
+def checksum(*fields):
+    return crc32(b''.join(fields))
+
+
+def double(val):
+    return val * 2
+
+
+def half(val):
+    return val // 2
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestColumns(unittest.TestCase):
+    """Columns module tests"""
+
+    Sample = Message('Sample', [
+        ('x', 'B'),
+    ], Mode.Big)
+
+    Fixed = Message('Fixed', [
+        ('sync', 'H', (0xeb90,)),
+        ('msg_type', 'B', MsgType),
+        ('pad', 'x'),
+        ('seq', 'I'),
+        ('level', 'F', 'h', 4),
+        ('name', '4s'),
+        ('data', {
+            MsgType.status: Sample,
+            MsgType.alarm: Sample,
+        }, 'msg_type'),
+    ], Mode.Big)
+
+    Variable = Message('Variable', [
+        ('msg_type', 'B', MsgType),
+        ('length', 'B', 'samples'),
+        ('samples', Sample, 'length'),
+        ('temperature', 'f'),
+    ], Mode.Little)
+
+    def test_fixed(self):
+        values = [{
+            'msg_type': MsgType.alarm if i % 2 else MsgType.status,
+            'seq': i * 1000,
+            'level': i / 4 - 2,
+            'name': str(i),
+            'data': {'x': i},
+        } for i in range(20)]
+        data = b''.join(self.Fixed.pack(v) for v in values)
+
+        cols = self.Fixed.unpack_columns(data)
+        assert set(cols) == {'sync', 'msg_type', 'seq', 'level', 'name', 'data'}
+        assert cols['msg_type'] == array('B', [v['msg_type'].value for v in values])
+        assert cols['seq'] == array('I', [v['seq'] for v in values])
+        assert cols['level'] == array('d', [v['level'] for v in values])
+        assert cols['name'] == [v['name'] for v in values]
+        assert [d.x for d in cols['data']] == list(range(20))
+
+        with pytest.raises(ValueError):
+            self.Fixed.unpack_columns(data[:-1])
+
+    def test_variable(self):
+        values = [{
+            'msg_type': MsgType.status,
+            'samples': [{'x': j} for j in range(i % 3)],
+            'temperature': i / 2,
+        } for i in range(20)]
+        data = b''.join(self.Variable.pack(v) for v in values)
+
+        cols = self.Variable.unpack_columns(data)
+        assert cols['length'] == array('B', [i % 3 for i in range(20)])
+        assert cols['temperature'] == array('f', [v['temperature'] for v in values])
+        assert [[s.x for s in samples] for samples in cols['samples']] == [list(range(i % 3)) for i in range(20)]
+
+    def test_callable(self):
+        Checked = Message('Checked', [
+            ('seq', 'I'),
+            ('length', 'B', 'samples'),
+            ('samples', self.Sample, 'length'),
+            ('crc', 'I', {(checksum, b'seq', b'samples')}),
+            ('doubled', 'H', {'make': (double, 'seq'), 'pack': (double, 'seq'), 'unpack': (half, 'doubled')}, False),
+        ], Mode.Big)
+
+        for message in (Checked, Checked.with_mode(trusted=True)):
+            data = b''.join(message.pack(seq=i, samples=[{'x': i}] * (i % 3)) for i in range(10))
+            cols = message.unpack_columns(data)
+            assert cols['crc'] == [message.unpack_from(data, offset)[0].crc
+                                   for offset in record_offsets(data, message)]
+            # The unpack function is called
+            assert cols['doubled'] == list(range(10))
+
+        # The corrupted checksum is detected, unless the message is trusted
+        fixed = Message('FixedChecked', [
+            ('seq', 'I'),
+            ('crc', 'I', {(checksum, b'seq')}),
+        ], Mode.Big)
+        data = bytearray(b''.join(fixed.pack(seq=i) for i in range(10)))
+        data[-1] ^= 0xff
+        with pytest.raises(ValueError):
+            fixed.unpack_columns(data)
+        assert len(fixed.with_mode(trusted=True).unpack_columns(data)['crc']) == 10
+
+        data = bytearray(b''.join(Checked.pack(seq=i, samples=[]) for i in range(3)))
+        data[5] ^= 0xff
+        with pytest.raises(ValueError):
+            Checked.unpack_columns(data)
+
+    def test_empty(self):
+        cols = self.Variable.unpack_columns(b'')
+        assert cols['temperature'] == array('f')
+
+    @pytest.mark.skipif(columns.numpy is None, reason='requires NumPy')
+    def test_numpy(self):
+        data = b''.join(self.Variable.pack(msg_type=MsgType.alarm, samples=[], temperature=i) for i in range(5))
+        cols = self.Variable.unpack_columns(data, numpy_arrays=True)
+        assert list(cols['temperature']) == [0, 1, 2, 3, 4]
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""Tests for the starstruct class"""
+
+import struct
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.elementbitpacked import ElementBitPacked
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestElementBitPacked(unittest.TestCase):
+    """ElementBitPacked module tests"""
+
+    def test_valid(self):
+        """Test field formats that are valid ElementBitPacked elements."""
+        assert ElementBitPacked.valid(('hdr', 'H', [('version', 3), ('length', 12), ('flag', 1)]))
+        assert ElementBitPacked.valid(('hdr', 'B', [('x', 4, True), ('y', 4)]))
+
+    def test_not_valid(self):
+        """Test field formats that are not valid ElementBitPacked elements."""
+        assert not ElementBitPacked.valid(('hdr', 'h', [('x', 4)]))
+        assert not ElementBitPacked.valid(('hdr', '2H', [('x', 4)]))
+        assert not ElementBitPacked.valid(('hdr', 'H', []))
+        assert not ElementBitPacked.valid(('hdr', 'H', [('x', 0)]))
+        assert not ElementBitPacked.valid(('hdr', 'H', 'x'))
+
+        with pytest.raises(ValueError):
+            Message('test', [('hdr', 'B', [('x', 4), ('y', 5)])])
+
+    def test_pack_unpack(self):
+        test_msg = Message('test', [
+            ('hdr', 'H', [('version', 3), ('length', 12), ('flag', 1)]),
+            ('offset', 'B', [('x', 3, True), ('y', 4, True)]),
+        ], Mode.Big)
+
+        packed = test_msg.pack(hdr={'version': 5, 'length': 0x123, 'flag': 1}, offset=(-4, 7))
+        assert packed == struct.pack('>HB', (5 << 13) | (0x123 << 1) | 1, (0b100 << 5) | (0b0111 << 1))
+
+        unpacked = test_msg.unpack(packed)
+        assert unpacked.hdr == (5, 0x123, 1)
+        assert unpacked.hdr.length == 0x123
+        assert unpacked.offset.x == -4
+        assert unpacked.offset.y == 7
+        assert unpacked == test_msg.make(hdr={'version': 5, 'length': 0x123, 'flag': 1}, offset=[-4, 7])
+        assert test_msg.pack_tuple(unpacked) == packed
+
+        # Missing subfields are zero
+        assert test_msg.unpack(test_msg.pack(hdr={'length': 1}, offset={})).hdr == (0, 1, 0)
+
+        for (hdr, offset) in [({'version': 8}, {}), ({'flag': -1}, {}), ({}, {'x': 4}), ({}, {'y': -9}), ({}, (1,))]:
+            with pytest.raises(ValueError):
+                test_msg.pack(hdr=hdr, offset=offset)
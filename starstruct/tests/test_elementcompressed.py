@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+
+"""Tests for the elementcompressed class"""
+
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.elementcompressed import ElementCompressed
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestElementCompressed(unittest.TestCase):
+    """ElementCompressed module tests"""
+
+    Entry = Message('CompressedEntry', [
+        ('level', 'B'),
+        ('code', 'H'),
+        ('text', '16s'),
+    ], Mode.Little)
+
+    def test_valid(self):
+        """Test field formats that are valid ElementCompressed elements."""
+        assert ElementCompressed.valid(('a', self.Entry, {'compress': 'zlib'}))
+        assert ElementCompressed.valid(('b', self.Entry, {'compress': {'codec': 'bz2', 'level': 1}}))
+
+    def test_not_valid(self):
+        """Test field formats that are not valid ElementCompressed elements."""
+        assert not ElementCompressed.valid(('a', self.Entry, {'escape': {}}))
+        assert not ElementCompressed.valid(('b', 'H', {'compress': 'zlib'}))
+        assert not ElementCompressed.valid(('c', self.Entry))
+
+        with pytest.raises(ValueError):
+            Message('test', [('a', self.Entry, {'compress': 'zip'})])
+
+    def test_pack_unpack(self):
+        entries = [{'level': i % 3, 'code': 100 + i % 5, 'text': b'disk full'} for i in range(50)]
+        raw = b''.join(self.Entry.pack(entry) for entry in entries)
+
+        for codec in ['zlib', 'lzma', 'bz2']:
+            with self.subTest(codec):  # pylint: disable=no-member
+                test_msg = Message('test', [
+                    ('source', 'H'),
+                    ('entries', self.Entry, {'compress': {'codec': codec, 'level': 1, 'threshold': 64}}),
+                    ('crc', 'I'),
+                ], Mode.Big)
+
+                packed = test_msg.pack(source=1, entries=entries, crc=2)
+                assert packed[2] == 1
+                assert len(packed) < len(raw)
+
+                unpacked = test_msg.unpack(packed)
+                assert unpacked.source == 1
+                assert unpacked.crc == 2
+                assert [entry.code for entry in unpacked.entries] == [entry['code'] for entry in entries]
+                assert unpacked.entries[0].text == 'disk full'
+                assert test_msg.skip(packed) == len(packed)
+                assert test_msg.unpack_from(memoryview(b'\x00' + packed), 1)[1] == len(packed) + 1
+
+                # Small payloads are stored without compressing them
+                packed = test_msg.pack(source=1, entries=entries[:2], crc=2)
+                assert packed[2:4] == b'\x00\x26'
+                assert packed[4:-4] == b''.join(self.Entry.with_mode(Mode.Big).pack(entry) for entry in entries[:2])
+                assert len(test_msg.unpack(packed).entries) == 2
+                assert test_msg.unpack(test_msg.pack(source=1, entries=[], crc=2)).entries == []
+
+    def test_errors(self):
+        test_msg = Message('test', [
+            ('entries', self.Entry, {'compress': 'zlib'}),
+        ], Mode.Little)
+
+        packed = test_msg.pack(entries=[{'level': 1, 'code': 2, 'text': b'x'}] * 10)
+        with pytest.raises(ValueError):
+            test_msg.unpack(packed[:-1])
+        with pytest.raises(ValueError):
+            test_msg.unpack(b'\x02' + packed[1:])
@@ -1,8 +1,9 @@
 """Tests for the starstruct class"""
 
-# import pytest
+import pytest
 
 from starstruct.message import Message
+from starstruct.elementescaped import ByteStuffing, COBS, HDLC, SLIP
 # from starstruct.modes import Mode
 
 
@@ -43,3 +44,124 @@ class TestStarStruct:
 
         unpacked = TestStruct.unpack(packed)
         assert unpacked == made
+        assert TestStruct.skip(packed + b'\x00') == len(packed)
+
+    def test_stuffed_items(self):
+        """A separator inside of an item must not break the frame"""
+        test_data = {
+            'escaped_data': [
+                {'x': 0x7e, 'y': 0x7d, 'z': 0x7e7e},
+                {'x': 0xc0, 'y': 0xdb, 'z': 0x0000},
+                {'x': 0x12, 'y': 0x12, 'z': 0x1212},
+            ],
+        }
+
+        for stuffing in ('slip', 'hdlc', 'cobs'):
+            delimiter = {'slip': b'\xc0', 'hdlc': b'\x7e', 'cobs': b'\x00'}[stuffing]
+            TestStruct = Message('TestStruct', [
+                ('escaped_data', self.Repeated, {
+                    'escape': {
+                        'start': delimiter,
+                        'separator': delimiter,
+                        'end': delimiter * 2,
+                        'stuffing': stuffing,
+                    },
+                }),
+                ('trailer', 'H'),
+            ])
+
+            test_data['trailer'] = 0x0102
+            packed = TestStruct.pack(test_data)
+            assert packed.count(delimiter) == len(test_data['escaped_data']) + 3
+
+            unpacked = TestStruct.unpack(packed)
+            assert unpacked == TestStruct.make(test_data)
+            assert TestStruct.skip(memoryview(packed)) == len(packed)
+
+    def test_stuffed_no_separator(self):
+        TestStruct = Message('TestStruct', [
+            ('escaped_data', self.Repeated, {
+                'escape': {
+                    'start': b'\x7e',
+                    'end': b'\x7e',
+                    'stuffing': 'hdlc',
+                },
+            }),
+        ])
+
+        test_data = {
+            'escaped_data': [
+                {'x': 0x7e, 'y': 1, 'z': 2},
+                {'x': 3, 'y': 0x7d, 'z': 0x7e7d},
+            ],
+        }
+
+        packed = TestStruct.pack(test_data)
+        assert packed.count(b'\x7e') == 2
+        assert TestStruct.unpack(packed) == TestStruct.make(test_data)
+        assert TestStruct.skip(b'\x01' + packed, 1) == len(packed) + 1
+
+    def test_stuffed_empty(self):
+        TestStruct = Message('TestStruct', [
+            ('escaped_data', self.Repeated, {
+                'escape': {
+                    'start': b'\xc0',
+                    'separator': b'\xdb\xde',
+                    'end': b'\xc0',
+                    'stuffing': 'slip',
+                },
+            }),
+        ])
+
+        packed = TestStruct.pack({'escaped_data': []})
+        assert packed == b'\xc0\xc0'
+        assert TestStruct.unpack(packed).escaped_data == []
+        assert TestStruct.skip(packed) == 2
+
+    def test_stuffing(self):
+        data = bytes(range(256)) * 2
+
+        for stuffing in (SLIP, HDLC, COBS):
+            stuffed = stuffing.stuff(data)
+            assert stuffing.unstuff(stuffed) == data
+
+        assert b'\x7e' not in HDLC.stuff(data)
+        assert b'\xc0' not in SLIP.stuff(data)
+        assert b'\x00' not in COBS.stuff(data)
+        assert COBS.unstuff(COBS.stuff(b'')) == b''
+        assert COBS.unstuff(COBS.stuff(b'\x01' * 254 + b'\x00')) == b'\x01' * 254 + b'\x00'
+
+        # HDLC style stuffing can escape any additional byte
+        stuffing = HDLC.reserve(b'\x12')
+        assert b'\x12' not in stuffing.stuff(data)
+        assert stuffing.unstuff(stuffing.stuff(data)) == data
+
+    def test_bad_stuffing(self):
+        # SLIP only knows how to escape its own frame end byte
+        with pytest.raises(ValueError):
+            SLIP.reserve(b'\x12')
+
+        # COBS delimiters have to start with a zero byte
+        with pytest.raises(ValueError):
+            COBS.reserve(b'\x7e')
+
+        # The substitute bytes must not overlap with reserved bytes
+        with pytest.raises(ValueError):
+            ByteStuffing(0x7d, {0x7d: 0x5d, 0x5d: 0x7e})
+
+        with pytest.raises(ValueError):
+            HDLC.unstuff(b'\x01\x7d\x01')
+
+        with pytest.raises(ValueError):
+            Message('TestStruct', [
+                ('escaped_data', self.Repeated, {
+                    'escape': {'start': b'\x7e', 'stuffing': 'hdlc'},
+                }),
+            ])
+
+        with pytest.raises(ValueError):
+            Message('TestStruct', [
+                ('escaped_data', self.Repeated, {
+                    'escape': {'end': b'\x7e', 'stuffing': 'unknown'},
+                }),
+            ])
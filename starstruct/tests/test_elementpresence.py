@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+"""Tests for the elementpresence class"""
+
+import enum
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.elementpresence import ElementPresence
+
+
+class Color(enum.Enum):
+    red = 1
+    blue = 2
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestElementPresence(unittest.TestCase):
+    """ElementPresence module tests"""
+
+    def test_valid(self):
+        """Test field formats that are valid ElementPresence elements."""
+        assert ElementPresence.valid(('present', 'B', ['a', 'b']))
+        assert ElementPresence.valid(('present', 'H', {'a': 1, 'b': None}))
+
+    def test_not_valid(self):
+        """Test field formats that are not valid ElementPresence elements."""
+        assert not ElementPresence.valid(('present', 'b', ['a']))
+        assert not ElementPresence.valid(('present', 'H', []))
+        assert not ElementPresence.valid(('present', 'H', [('a', 1)]))
+        assert not ElementPresence.valid(('present', 'H', 'a'))
+
+        with pytest.raises(TypeError):
+            Message('test', [('present', 'B', ['a'])])
+        with pytest.raises(TypeError):
+            Message('test', [('a', 'B'), ('present', 'B', ['a'])])
+        with pytest.raises(ValueError):
+            Message('test', [('present', 'B', ['f{}'.format(i) for i in range(9)])] +
+                    [('f{}'.format(i), 'B') for i in range(9)])
+
+    def test_pack_unpack(self):
+        test_msg = Message('test', [
+            ('id', 'B'),
+            ('present', 'H', ['rate', 'color', 'name']),
+            ('rate', 'I'),
+            ('color', 'B', Color),
+            ('name', '4s'),
+            ('crc', 'B'),
+        ], Mode.Big)
+
+        packed = test_msg.pack(id=1, color=Color.blue, crc=9)
+        assert packed == b'\x01\x00\x02\x02\x09'
+
+        unpacked = test_msg.unpack(packed)
+        assert unpacked == (1, 2, None, Color.blue, None, 9)
+        assert test_msg.pack(unpacked) == packed
+        assert test_msg.skip(packed) == len(packed)
+        assert test_msg.make(id=1, color=Color.blue, crc=9) == unpacked
+
+        packed = test_msg.pack(id=1, rate=500, color=Color.red, name='abcd', crc=9)
+        assert packed == b'\x01\x00\x07\x00\x00\x01\xf4\x01abcd\x09'
+        assert test_msg.unpack(packed) == (1, 7, 500, Color.red, 'abcd', 9)
+        assert test_msg.skip(packed) == len(packed)
+
+        assert test_msg.pack(id=2, crc=0) == b'\x02\x00\x00\x00'
+
+        # Fields that are not present can't be patched
+        buf = bytearray(test_msg.pack(id=1, rate=1, crc=9))
+        test_msg.patch(buf, rate=2, crc=3)
+        assert test_msg.unpack(buf) == (1, 1, 2, None, None, 3)
+        with pytest.raises(ValueError):
+            test_msg.patch(buf, name='abcd')
+
+    def test_defaults(self):
+        test_msg = Message('test', [
+            ('present', 'B', {'rate': 100, 'gain': 1.5}),
+            ('rate', 'I'),
+            ('gain', 'f'),
+        ], Mode.Little)
+
+        packed = test_msg.pack(gain=0.5)
+        assert packed == b'\x02\x00\x00\x00\x3f'
+        assert test_msg.unpack(packed) == (2, 100, 0.5)
+        assert test_msg.unpack(b'\x00') == (0, 100, 1.5)
+
+        # Variants in other modes have their own optional elements
+        big = test_msg.with_mode(Mode.Big)
+        assert big.pack(rate=1) == b'\x01\x00\x00\x00\x01'
+        assert test_msg.pack(rate=1) == b'\x01\x01\x00\x00\x00'
+
+    def test_round_trip(self):
+        test_msg = Message('test', [
+            ('present', 'B', {'rate': 100, 'gain': 1.5, 'offset': 0}),
+            ('rate', 'I'),
+            ('gain', 'f'),
+            ('offset', 'h'),
+        ], Mode.Little)
+
+        # Fields that were left out are left out again, even though they
+        # unpack as their defaults
+        packed = test_msg.pack(gain=0.5, offset=0)
+        assert len(packed) == 7
+        unpacked = test_msg.unpack(packed)
+        assert unpacked == (6, 100, 0.5, 0)
+        assert test_msg.pack(unpacked) == packed
+        assert test_msg.make(unpacked._asdict()).present == 6
+
+        # Fields that are changed from their defaults are included
+        changed = unpacked._replace(rate=5)
+        assert test_msg.pack(changed) == b'\x07\x05\x00\x00\x00\x00\x00\x00\x3f\x00\x00'
+        assert test_msg.unpack(test_msg.pack(changed)) == (7, 5, 0.5, 0)
+
+    def test_sparse(self):
+        names = ['f{}'.format(i) for i in range(64)]
+        test_msg = Message('test', [('present', 'Q', names)] + [(name, 'i') for name in names], Mode.Little)
+
+        packed = test_msg.pack(f3=-1, f60=7)
+        assert len(packed) == 16
+        unpacked = test_msg.unpack(packed)
+        assert unpacked.f3 == -1
+        assert unpacked.f60 == 7
+        assert unpacked.f0 is None
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""Tests for the elementvarint class"""
+
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.elementvarint import ElementVarint
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestElementVarint(unittest.TestCase):
+    """ElementVarint module tests"""
+
+    def test_valid(self):
+        """Test field formats that are valid ElementVarint elements."""
+        assert ElementVarint.valid(('a', 'V'))
+        assert ElementVarint.valid(('b', 'v'))
+        assert ElementVarint.valid(('c', 'V', 'data'))
+
+    def test_not_valid(self):
+        """Test field formats that are not valid ElementVarint elements."""
+        assert not ElementVarint.valid(('a', 'Q'))
+        assert not ElementVarint.valid(('b', 'v', 'data'))
+        assert not ElementVarint.valid(('c', '2V'))
+        assert not ElementVarint.valid(('d', 'V', ''))
+
+    def test_pack_unpack(self):
+        test_msg = Message('test', [
+            ('a', 'V'),
+            ('b', 'v'),
+            ('c', 'B'),
+        ], Mode.Big)
+
+        test_values = [
+            (0, 0, b'\x00\x00'),
+            (1, -1, b'\x01\x01'),
+            (127, 1, b'\x7f\x02'),
+            (128, -64, b'\x80\x01\x7f'),
+            (300, 64, b'\xac\x02\x80\x01'),
+            (2 ** 64 - 1, -2 ** 63, b'\xff' * 9 + b'\x01' + b'\xff' * 9 + b'\x01'),
+            (2 ** 21, 2 ** 63 - 1, b'\x80\x80\x80\x01' + b'\xfe' + b'\xff' * 8 + b'\x01'),
+        ]
+        for (a, b, data) in test_values:
+            with self.subTest((a, b)):  # pylint: disable=no-member
+                packed = test_msg.pack(a=a, b=b, c=7)
+                assert packed == data + b'\x07'
+                assert test_msg.unpack(packed) == (a, b, 7)
+                assert test_msg.unpack_from(memoryview(b'\x00' + packed), 1) == ((a, b, 7), len(packed) + 1)
+                assert test_msg.skip(packed) == len(packed)
+
+        for (a, b) in [(-1, 0), (2 ** 64, 0), (0, 2 ** 63)]:
+            with pytest.raises(ValueError):
+                test_msg.pack(a=a, b=b, c=0)
+
+        with pytest.raises(ValueError):
+            test_msg.unpack(b'\x80')
+        with pytest.raises(ValueError):
+            test_msg.unpack(b'\x80' * 11)
+
+    def test_length(self):
+        sample = Message('VarintSample', [('x', 'H')], Mode.Little)
+        test_msg = Message('test', [
+            ('count', 'V', 'samples'),
+            ('samples', sample, 'count'),
+            (b'size', 'V'),
+            ('data', sample, b'size'),
+        ], Mode.Little)
+
+        samples = [{'x': i} for i in range(200)]
+        packed = test_msg.pack(samples=samples, size=4, data=[{'x': 1}, {'x': 2}])
+        assert packed[:2] == b'\xc8\x01'
+        assert len(packed) == 2 + 400 + 1 + 4
+
+        unpacked = test_msg.unpack(packed)
+        assert unpacked.count == 200
+        assert [s.x for s in unpacked.samples] == list(range(200))
+        assert unpacked.size == 4
+        assert [s.x for s in unpacked.data] == [1, 2]
+        assert test_msg.skip(packed) == len(packed)
+
+        columns = test_msg.unpack_columns(packed + packed)
+        assert columns['count'] == [200, 200]
+
+    def test_alignment(self):
+        test_msg = Message('test', [
+            ('a', 'V'),
+            ('b', 'H'),
+        ], Mode.Little, alignment=2)
+
+        packed = test_msg.pack(a=300, b=5)
+        assert packed == b'\xac\x02\x05\x00'
+        packed = test_msg.pack(a=1, b=5)
+        assert packed == b'\x01\x00\x05\x00'
+        assert test_msg.unpack(packed) == (1, 5)
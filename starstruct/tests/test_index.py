@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""Tests for record index files"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+import pytest
+
+from starstruct.index import RecordIndex, build_index, load_index
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+Sample = Message('Sample', [
+    ('x', 'B'),
+    ('y', 'h'),
+], Mode.Big)
+
+Frame = Message('Frame', [
+    ('seq', 'I'),
+    ('length', 'B', 'samples'),
+    ('samples', Sample, 'length'),
+    ('escaped', Sample, {
+        'escape': {
+            'start': b'\x7e',
+            'end': b'\x7e',
+            'stuffing': 'hdlc',
+        },
+    }),
+], Mode.Big)
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestIndex(unittest.TestCase):
+    """Index module tests"""
+
+    def setUp(self):
+        self.tempdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tempdir)
+        self.path = os.path.join(self.tempdir, 'capture.bin')
+
+        self.packed = [Frame.pack(seq=i, samples=[{'x': j, 'y': 0x7e7d} for j in range(i % 4)],
+                                  escaped=[{'x': 0x7e, 'y': i}] * (i % 3))
+                       for i in range(30)]
+        with open(self.path, 'wb') as f:
+            f.write(b''.join(self.packed))
+
+    def test_build_index(self):
+        offsets = build_index(self.path, Frame)
+        assert list(offsets) == [sum(len(p) for p in self.packed[:i]) for i in range(30)]
+        assert os.path.exists(self.path + '.idx')
+        assert load_index(self.path, Frame) == offsets
+
+        # The index is for a different message
+        assert load_index(self.path, Sample) is None
+
+        # The data file has changed
+        with open(self.path, 'ab') as f:
+            f.write(self.packed[0])
+        assert load_index(self.path, Frame) is None
+
+    def test_record_index(self):
+        with RecordIndex(self.path, Frame) as frames:
+            assert len(frames) == 30
+            assert frames[0] == Frame.unpack(self.packed[0])
+            assert frames[-1] == Frame.unpack(self.packed[-1])
+            assert [f.seq for f in frames[10:20:3]] == [10, 13, 16, 19]
+            assert [f.seq for f in frames] == list(range(30))
+            assert frames.span(-1) == (frames.offsets[-1], frames.offsets[-1] + len(self.packed[-1]))
+
+            with pytest.raises(IndexError):
+                frames[30]  # pylint: disable=pointless-statement
+
+        # The index file is reused
+        mtime = os.stat(self.path + '.idx').st_mtime_ns
+        with RecordIndex(self.path, Frame) as frames:
+            assert frames[5].seq == 5
+        assert os.stat(self.path + '.idx').st_mtime_ns == mtime
+
+    def test_no_save(self):
+        with RecordIndex(self.path, Frame, save=False) as frames:
+            assert len(frames) == 30
+        assert not os.path.exists(self.path + '.idx')
@@ -232,3 +232,416 @@ class TestStarStruct(unittest.TestCase):
         assert 'pack' in str(e)
         assert '_elements' in str(e)
         assert '_fields' in str(e)
+
+    def test_template(self):
+        """Constants and padding are packed from the message template."""
+        test_msg = Message('test', [
+            ('sync', 'H', (0xeb90,)),
+            ('pad', '2x'),
+            ('status', 'B'),
+            ('version', 'BB', (1, 2)),
+        ], Mode.Big)
+
+        assert test_msg.static_size == 7
+        assert test_msg.pack(status=7) == b'\xeb\x90\x00\x00\x07\x01\x02'
+        assert test_msg.unpack(b'\xeb\x90\x00\x00\x07\x01\x02').status == 7
+
+        heartbeat = Message('heartbeat', [
+            ('sync', 'H', (0xeb90,)),
+            ('pad', '2x'),
+        ], Mode.Big)
+        assert heartbeat.pack() == b'\xeb\x90\x00\x00'
+
+        # Only the fixed size prefix is in the template
+        test_msg = Message('test', self.teststruct, Mode.Little)
+        assert test_msg.static_size is None
+        assert test_msg._prefix_size == 25  # pylint: disable=protected-access
+
+    def test_alignment(self):
+        """Alignment padding is the same for pack and unpack."""
+        test_msg = Message('test', [
+            ('a', 'B'),
+            ('b', 'H'),
+            ('c', 'b'),
+            ('d', '3s'),
+            ('e', '2x'),
+        ], Mode.Little)
+        test_msg.update(alignment=4)
+
+        assert test_msg.static_size == 20
+        packed = test_msg.pack(a=1, b=2, c=-3, d='abc')
+        assert packed == b'\x01\x00\x00\x00\x02\x00\x00\x00\xfd\x00\x00\x00abc\x00\x00\x00\x00\x00'
+        assert test_msg.unpack(packed) == test_msg.make(a=1, b=2, c=-3, d='abc')
+
+    def test_patch(self):
+        """Fields can be changed in place in a packed message."""
+        def frame_sum(*parts):
+            return sum(b''.join(parts)) & 0xffff
+
+        Sample = Message('Sample', [('x', 'B'), ('y', 'H')], Mode.Big)
+        test_msg = Message('test', [
+            ('seq', 'I'),
+            ('length', 'B', 'samples'),
+            ('samples', Sample, 'length'),
+            ('hop_count', 'B'),
+            ('type', 'B', SimpleEnum),
+            ('checksum', 'H', {(frame_sum, b'seq', b'samples', b'hop_count')}),
+        ], Mode.Big)
+
+        values = {
+            'seq': 1,
+            'samples': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}],
+            'hop_count': 0,
+            'type': SimpleEnum.one,
+        }
+        buf = bytearray(test_msg.pack(values))
+        test_msg.patch(buf, seq=2, hop_count=5, type=SimpleEnum.three)
+
+        values.update(seq=2, hop_count=5, type=SimpleEnum.three)
+        assert bytes(buf) == test_msg.pack(values)
+        assert test_msg.unpack(buf).hop_count == 5
+
+        # Patch a message in the middle of a larger buffer
+        buf = bytearray(b'\xff' * 3) + buf
+        test_msg.patch(memoryview(buf), 3, samples=[{'x': 5, 'y': 6}, {'x': 7, 'y': 8}])
+        values.update(samples=[{'x': 5, 'y': 6}, {'x': 7, 'y': 8}])
+        assert bytes(buf[3:]) == test_msg.pack(values)
+
+        with pytest.raises(ValueError):
+            test_msg.patch(buf, 3, samples=[{'x': 5, 'y': 6}])
+
+        with pytest.raises(ValueError):
+            test_msg.patch(buf, 3, length=1)
+
+        with pytest.raises(ValueError):
+            test_msg.patch(buf, 3, checksum=0)
+
+        with pytest.raises(ValueError):
+            test_msg.patch(buf, 3, bogus=0)
+
+    def test_patch_discriminated(self):
+        """Fixed size discriminated fields are patched using their discriminator."""
+        Point = Message('Point', [('x', 'h'), ('y', 'h')], Mode.Big)
+        Value = Message('Value', [('value', 'i')], Mode.Big)
+        test_msg = Message('test', [
+            ('t', 'B', SimpleEnum),
+            ('d', {
+                SimpleEnum.one: Point,
+                SimpleEnum.two: Value,
+            }, 't'),
+        ], Mode.Big)
+        assert test_msg.static_size == 5
+
+        buf = bytearray(test_msg.pack(t=SimpleEnum.one, d={'x': 1, 'y': 2}))
+        test_msg.patch(buf, d={'x': 7, 'y': 8})
+        assert bytes(buf) == test_msg.pack(t=SimpleEnum.one, d={'x': 7, 'y': 8})
+
+        buf = bytearray(test_msg.pack(t=SimpleEnum.two, d={'value': 3}))
+        test_msg.patch(buf, d={'value': -5})
+        assert test_msg.unpack(buf).d.value == -5
+
+    def test_view(self):
+        """Views access the fields of a packed message in place."""
+        Position = Message('Position', [('x', 'i'), ('y', 'i')], Mode.Little)
+        test_msg = Message('test', [
+            ('sync', 'H', (0xeb90,)),
+            ('seq', 'I'),
+            ('type', 'B', SimpleEnum),
+            ('pad', '3x'),
+            ('name', '8s'),
+            ('big', '8B'),
+            ('position', Position),
+            ('history', Position, 2),
+        ], Mode.Little)
+
+        values = {
+            'seq': 7,
+            'type': SimpleEnum.two,
+            'name': 'abc',
+            'big': 1 << 40,
+            'position': {'x': 1, 'y': -1},
+            'history': [{'x': 2, 'y': 3}, {'x': 4, 'y': 5}],
+        }
+        buf = bytearray(b'\xff' * 2) + test_msg.pack(values)
+        view = test_msg.view(buf, 2)
+        assert type(view) is type(test_msg.view(buf))  # pylint: disable=unidiomatic-typecheck
+
+        assert view.sync == (0xeb90,)
+        assert view.seq == 7
+        assert view.type == SimpleEnum.two
+        assert view.name == 'abc'
+        assert view.big == 1 << 40
+        assert view.position.y == -1
+        assert [p.x for p in view.history] == [2, 4]
+
+        view.seq += 1
+        view.type = SimpleEnum.three
+        view.name = 'defgh'
+        view.big = 5
+        view.position.x = 100
+        view.history[1].y = 50
+
+        values.update(seq=8, type=SimpleEnum.three, name='defgh', big=5,
+                      position={'x': 100, 'y': -1},
+                      history=[{'x': 2, 'y': 3}, {'x': 4, 'y': 50}])
+        assert bytes(buf[2:]) == test_msg.pack(values)
+        assert view._asdict()['seq'] == 8  # pylint: disable=protected-access
+
+        with pytest.raises(AttributeError):
+            view.sync = (0,)
+
+        with pytest.raises(AttributeError):
+            view.bogus = 1
+
+        with pytest.raises(TypeError):
+            Message('test', self.teststruct).view(bytearray(100))
+
+    def test_cache_packed(self):
+        """Unpacked messages can keep their packed bytes."""
+        Sample = Message('Sample', [('x', 'B'), ('y', 'H')], Mode.Big)
+        test_msg = Message('test', [
+            ('seq', 'I'),
+            ('length', 'B', 'samples'),
+            ('samples', Sample, 'length'),
+        ], Mode.Big, cache_packed=True)
+
+        values = {'seq': 1, 'samples': [{'x': 1, 'y': 2}]}
+        packed = test_msg.pack(values)
+
+        made = test_msg.make(values)
+        assert made._packed == packed  # pylint: disable=protected-access
+        assert made.pack() == packed
+
+        unpacked = test_msg.unpack(packed)
+        assert unpacked._packed is packed  # pylint: disable=protected-access
+        assert unpacked.pack() is packed
+        assert test_msg.pack(unpacked) is packed
+
+        # Messages in a larger buffer copy their bytes, so they don't keep
+        # the buffer alive
+        (second, _) = test_msg.unpack_from(b'\x00' + packed, 1)
+        assert type(second._packed) is bytes  # pylint: disable=protected-access,unidiomatic-typecheck
+        (third, _) = test_msg.unpack_from(memoryview(b'\x00' + packed), 1)
+        assert type(third._packed) is bytes  # pylint: disable=protected-access,unidiomatic-typecheck
+        assert second.pack() == packed
+
+        # Mutable buffers are copied
+        buf = bytearray(packed)
+        copied = test_msg.unpack(buf)
+        buf[0] = 0xff
+        assert copied.pack() == packed
+
+        # Tuples with lists can be hashed, and are compared and hashed by
+        # their values whether or not they have packed bytes
+        uncached = Message('test', test_msg._fields, Mode.Big).unpack(packed)
+        uncached = test_msg._tuple._make(uncached)  # pylint: disable=protected-access
+        assert uncached._packed is None  # pylint: disable=protected-access
+        assert unpacked == made == second == uncached
+        assert hash(unpacked) == hash(made) == hash(second) == hash(uncached)
+        assert len({unpacked, made, second, uncached}) == 1
+
+        # Packed bytes that only differ in padding are equal
+        padded = Message('padded', [('x', 'B'), ('pad', 'x')], cache_packed=True)
+        assert padded.unpack(b'\x01\x00') == padded.unpack(b'\x01\xff')
+
+        # Tuples of variants in other modes are packed from their values
+        little = test_msg.with_mode(Mode.Little)
+        little_packed = little.pack(values)
+        assert little_packed != packed
+        assert little.pack(unpacked) == little_packed
+        assert test_msg.pack(little.unpack(little_packed)) == packed
+        buf = bytearray(len(packed))
+        assert little.pack_into(buf, 0, unpacked) == len(packed)
+        assert bytes(buf) == little_packed
+
+        # Replacing a field discards the packed bytes
+        changed = unpacked._replace(seq=2)  # pylint: disable=protected-access
+        assert changed._packed is None  # pylint: disable=protected-access
+        assert changed.pack() == test_msg.pack(seq=2, samples=[{'x': 1, 'y': 2}])
+        assert changed != unpacked
+
+    def test_with_mode(self):
+        """Variants in other modes don't change the original message."""
+        Sample = Message('Sample', [('x', 'H')], Mode.Little)
+        test_msg = Message('test', [
+            ('a', 'H'),
+            ('type', 'B', SimpleEnum),
+            ('length', 'B', 'samples'),
+            ('samples', Sample, 'length'),
+            ('data', {
+                SimpleEnum.one: Sample,
+                SimpleEnum.two: None,
+            }, 'type'),
+        ], Mode.Little)
+        values = {'a': 1, 'type': SimpleEnum.one, 'samples': [{'x': 2}], 'data': {'x': 3}}
+
+        big = test_msg.with_mode(Mode.Big)
+        assert test_msg.with_mode(Mode.Big) is big
+        assert test_msg.with_mode(Mode.Little) is test_msg
+        assert big.with_mode(Mode.Little) is test_msg
+
+        assert test_msg.pack(values) == b'\x01\x00\x01\x01\x02\x00\x03\x00'
+        assert big.pack(values) == b'\x00\x01\x01\x01\x00\x02\x00\x03'
+        assert test_msg.mode == Mode.Little
+        assert Sample.mode == Mode.Little
+        assert Sample.pack(x=1) == b'\x01\x00'
+
+        # Variants of sub-messages are shared by all messages
+        other = Message('other', [('sample', Sample)], Mode.Big)
+        assert other._elements['sample'].format is Sample.with_mode(Mode.Big)  # pylint: disable=protected-access
+
+        # Unpacked tuples are instances of the original message's tuple, and
+        # are packed by the variant
+        unpacked = big.unpack(big.pack(values))
+        assert isinstance(unpacked, test_msg._tuple)  # pylint: disable=protected-access
+        assert unpacked == test_msg.unpack(test_msg.pack(values))
+        assert unpacked.pack() == big.pack(values)
+
+        aligned = test_msg.with_mode(alignment=4)
+        assert aligned.mode == Mode.Little
+        assert aligned.static_size is None
+        assert aligned.unpack(aligned.pack(values)) == unpacked
+
+    def test_trailing_discriminated(self):
+        """Fixed size discriminated fields can follow variable size fields."""
+        from starstruct.parallel import record_offsets
+        from starstruct.predicate import Field
+
+        Sample = Message('Sample', [('x', 'B')], Mode.Big)
+        Point = Message('Point', [('x', 'h'), ('y', 'h')], Mode.Big)
+        Value = Message('Value', [('value', 'i')], Mode.Big)
+        test_msg = Message('test', [
+            ('t', 'B', SimpleEnum),
+            ('cnt', 'B', 'items'),
+            ('items', Sample, 'cnt'),
+            ('d', {SimpleEnum.one: Point, SimpleEnum.two: Value}, 't'),
+        ], Mode.Big)
+
+        first = test_msg.pack(t=SimpleEnum.one, items=[{'x': 1}], d={'x': 2, 'y': 3})
+        second = test_msg.pack(t=SimpleEnum.two, items=[], d={'value': 4})
+        assert test_msg.skip(first) == len(first)
+        assert test_msg.frame_length(first) == len(first)
+        assert list(record_offsets(first + second, test_msg)) == [0, len(first)]
+        assert [msg.d for msg in test_msg.iter_unpack(first + second, where=Field('t') == SimpleEnum.two)] == \
+            [test_msg.unpack(second).d]
+
+        buf = bytearray(first)
+        test_msg.patch(buf, d={'x': 5, 'y': 6})
+        assert bytes(buf) == test_msg.pack(t=SimpleEnum.one, items=[{'x': 1}], d={'x': 5, 'y': 6})
+
+        little = test_msg.with_mode(Mode.Little)
+        assert test_msg.transcode(second, Mode.Little) == little.pack(t=SimpleEnum.two, items=[], d={'value': 4})
+
+    def test_frame_length(self):
+        """The size of a message is found from a partial buffer."""
+        Sample = Message('Sample', [('x', 'B'), ('y', 'H')], Mode.Big)
+        Group = Message('Group', [
+            ('count', 'B', 'samples'),
+            ('samples', Sample, 'count'),
+        ], Mode.Big)
+        test_msg = Message('test', [
+            ('seq', 'I'),
+            ('length', 'H', 'samples'),
+            ('type', 'B', SimpleEnum),
+            ('samples', Sample, 'length'),
+            ('payload', {
+                SimpleEnum.one: None,
+                SimpleEnum.two: Sample,
+                SimpleEnum.three: Group,
+            }, 'type'),
+            (b'size', 'B', 'data'),
+            ('data', Sample, b'size'),
+            ('groups', 'V', 'items'),
+            ('items', Group, 'groups'),
+            ('crc', 'H'),
+        ], Mode.Big)
+
+        assert Sample.frame_length(b'') == 3
+
+        values = {
+            'seq': 1,
+            'samples': [{'x': i % 256, 'y': i} for i in range(300)],
+            'type': SimpleEnum.three,
+            'payload': {'samples': [{'x': 1, 'y': 2}] * 2},
+            'size': 6,
+            'data': [{'x': 1, 'y': 2}] * 2,
+            'items': [{'samples': [{'x': 1, 'y': 2}] * 3}, {'samples': []}],
+            'crc': 0,
+        }
+        packed = test_msg.pack(values)
+        assert test_msg.frame_length(packed) == len(packed)
+        assert test_msg.frame_length(b'\x00' + packed, 1) == len(packed)
+
+        # The samples are not needed to find the size of the message, only
+        # the length fields
+        assert test_msg.frame_length(packed[:3]) == -4
+        assert test_msg.frame_length(packed[:6]) == -1
+        # 300 samples and the count of the payload group
+        assert test_msg.frame_length(packed[:7]) == -901
+        assert test_msg.frame_length(packed[:907]) == -1
+        assert test_msg.frame_length(packed[:908]) == -7
+        assert test_msg.frame_length(packed[:914]) == -1
+        assert test_msg.frame_length(packed[:915]) == -7
+        assert test_msg.frame_length(packed[:921]) == -1
+        assert test_msg.frame_length(packed[:922]) == -1
+        # The count of the second group follows the first group
+        assert test_msg.frame_length(packed[:923]) == -10
+        assert test_msg.frame_length(packed[:932]) == -1
+        assert test_msg.frame_length(packed[:933]) == len(packed)
+        assert len(packed) == 935
+
+    def test_trusted(self):
+        """Trusted messages don't check the values they unpack."""
+        Item = Message('Item', [('kind', 'B', SimpleEnum), ('name', '4s')], Mode.Big)
+
+        def add(a, b):
+            return a + b
+
+        test_msg = Message('test', [
+            ('a', 'H'),
+            ('b', 'H'),
+            ('total', 'I', {(add, 'a', 'b')}),
+            ('count', 'B', 'items'),
+            ('items', Item, 'count'),
+        ], Mode.Big)
+        trusted = test_msg.with_mode(trusted=True)
+        assert trusted is test_msg.with_mode(trusted=True)
+        assert trusted is not test_msg
+        assert trusted.with_mode(trusted=False) is test_msg
+        assert trusted.trusted and not test_msg.trusted
+
+        # The total doesn't match, and 9 isn't a SimpleEnum value
+        packed = b'\x00\x01\x00\x02\x00\x00\x00\x04\x02\x01abcd\x09efgh'
+        with pytest.raises(ValueError):
+            test_msg.unpack(packed)
+
+        # The unpacked total is still computed by the function, but it isn't
+        # compared to the packed value
+        unpacked = trusted.unpack(packed)
+        assert unpacked.total == 3
+        assert unpacked.items[0].kind == SimpleEnum.one
+        assert unpacked.items[1].kind == 9
+        assert isinstance(unpacked, test_msg._tuple)
+        assert trusted.pack(unpacked) == packed[:7] + b'\x03' + packed[8:]
+
+        made = trusted.make(a=1, b=2, total=4, count=1, items=[{'kind': 9, 'name': 'abcd'}])
+        assert made.total == 4
+        assert made.items[0].kind == 9
+
+        # Trusted messages can be created directly
+        direct = Message('direct', [('kind', 'B', SimpleEnum)], trusted=True)
+        assert direct.unpack(b'\x07').kind == 7
+
+        # Unknown discriminator values are reported like untrusted messages
+        # report them
+        selected = Message('selected', [
+            ('kind', 'B', SimpleEnum),
+            ('data', {SimpleEnum.one: Item, SimpleEnum.two: None}, 'kind'),
+            ('name', '4s'),
+        ], Mode.Big, trusted=True)
+        assert selected.unpack(b'\x02abcd').data is None
+        for func in (selected.unpack, selected.skip, selected.frame_length):
+            with pytest.raises(ValueError):
+                func(b'\x07abcd')
+        with pytest.raises(ValueError):
+            selected.make(kind=7, name='abcd')
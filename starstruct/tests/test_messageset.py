@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+"""Tests for the message set class"""
+
+import enum
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.messageset import MessageSet
+from starstruct.modes import Mode
+
+
+class MsgType(enum.Enum):
+    """Message types for testing message sets"""
+    status = 1
+    command = 2
+    config = 3
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestMessageSet(unittest.TestCase):
+    """MessageSet module tests"""
+
+    Status = Message('Status', [
+        ('source', 'H'),
+        ('type', 'B', MsgType),
+        ('temperature', 'h'),
+    ], Mode.Big)
+
+    Command = Message('Command', [
+        ('source', 'H'),
+        ('type', 'B', MsgType),
+        ('command', '8s'),
+    ], Mode.Big)
+
+    def test_keyed(self):
+        messages = MessageSet({
+            MsgType.status: self.Status,
+            2: self.Command,
+        }, key='type')
+
+        status = self.Status.pack(source=7, type=MsgType.status, temperature=-40)
+        command = self.Command.pack(source=8, type=MsgType.command, command='reset')
+
+        assert messages.message_for(status) is self.Status
+        assert messages.message_for(command) is self.Command
+        assert messages.unpack(status) == self.Status.unpack(status)
+        assert messages.unpack(command) == self.Command.unpack(command)
+
+        (msg, offset) = messages.unpack_from(status + command, len(status))
+        assert msg == self.Command.unpack(command)
+        assert offset == len(status + command)
+
+        # config is a valid enum value, but not in the set
+        with pytest.raises(ValueError):
+            messages.unpack(self.Status.pack(source=1, type=MsgType.config, temperature=0))
+
+    def test_constant_header(self):
+        Sync = Message('Sync', [
+            ('sync', 'H', (0xeb90,)),
+            ('pad', 'x'),
+            ('type', 'B', MsgType),
+            ('temperature', 'h'),
+        ], Mode.Big)
+        SyncCommand = Message('SyncCommand', [
+            ('sync', 'H', (0xeb90,)),
+            ('pad', 'x'),
+            ('type', 'B', MsgType),
+            ('command', '8s'),
+        ], Mode.Big)
+        messages = MessageSet({MsgType.status: Sync, MsgType.command: SyncCommand}, key='type')
+
+        command = SyncCommand.pack(type=MsgType.command, command='reset')
+        assert command[:2] == b'\xeb\x90'
+        assert messages.unpack(command) == SyncCommand.unpack(command)
+
+        # A different sync word is a different header
+        Other = Message('Other', [
+            ('sync', 'H', (0xeb91,)),
+            ('pad', 'x'),
+            ('type', 'B', MsgType),
+        ], Mode.Big)
+        with pytest.raises(ValueError):
+            MessageSet({MsgType.status: Sync, MsgType.config: Other}, key='type')
+
+    def test_bad_header(self):
+        Other = Message('Other', [
+            ('source', 'I'),
+            ('type', 'B', MsgType),
+        ])
+
+        with pytest.raises(ValueError):
+            MessageSet({MsgType.status: self.Status, MsgType.config: Other}, key='type')
+
+        with pytest.raises(ValueError):
+            MessageSet({MsgType.status: self.Status}, key='bad')
+
+    def test_prefixed(self):
+        Short = Message('Short', [
+            ('sync', 'B', (0xa5,)),
+            ('value', 'B'),
+        ])
+        Long1 = Message('Long1', [
+            ('sync', 'BB', (0xa6, 0x01)),
+            ('value', 'H'),
+        ], Mode.Little)
+        Long2 = Message('Long2', [
+            ('sync', 'BB', (0xa6, 0x02)),
+            ('value', 'I'),
+        ], Mode.Little)
+        Longer = Message('Longer', [
+            ('sync', 'BBB', (0xa6, 0x02, 0xff)),
+            ('value', 'B'),
+        ], Mode.Little)
+
+        messages = MessageSet([Short, Long1, Long2, Longer])
+        for (message, value) in ((Short, 1), (Long1, 0x1234), (Long2, 0x12345678), (Longer, 3)):
+            packed = message.pack(value=value)
+            assert messages.message_for(packed) is message
+            assert messages.unpack(packed) == message.unpack(packed)
+
+        with pytest.raises(ValueError):
+            messages.unpack(b'\xa6\x03\x00')
+
+        # All the same length
+        messages = MessageSet([Long1, Long2])
+        packed = Long2.pack(value=5)
+        assert messages.unpack(packed) == Long2.unpack(packed)
+
+        with pytest.raises(ValueError):
+            MessageSet([Long1, Long1])
+
+        with pytest.raises(ValueError):
+            MessageSet([self.Status])
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+
+"""Tests for parallel decoding of files"""
+
+import enum
+import multiprocessing
+import os
+import tempfile
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.parallel import record_offsets, unpack_file
+
+
+class Code(enum.Enum):
+    """Codes for testing trusted messages"""
+    one = 1
+    two = 2
+
+
+Sample = Message('Sample', [
+    ('x', 'B'),
+    ('y', 'h'),
+], Mode.Big)
+
+Frame = Message('Frame', [
+    ('seq', 'I'),
+    ('length', 'B', 'samples'),
+    ('samples', Sample, 'length'),
+], Mode.Big)
+
+Coded = Message('Coded', [
+    ('code', 'B', Code),
+    ('value', 'H'),
+], Mode.Big)
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestParallel(unittest.TestCase):
+    """Parallel module tests"""
+
+    def write(self, data):
+        (fd, path) = tempfile.mkstemp()
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def frames(self, count):
+        return [Frame.pack(seq=i, samples=[{'x': j, 'y': -i} for j in range(i % 4)])
+                for i in range(count)]
+
+    def test_record_offsets(self):
+        packed = self.frames(10)
+        data = b''.join(packed)
+
+        offsets = record_offsets(data, Frame)
+        assert offsets.typecode == 'Q'
+        assert list(offsets) == [sum(len(p) for p in packed[:i]) for i in range(10)]
+
+        assert list(record_offsets(b'\x00' * 9, Sample)) == [0, 3, 6]
+
+    def test_fixed_size(self):
+        data = b''.join(Sample.pack(x=i % 256, y=-i) for i in range(100))
+        path = self.write(data)
+
+        batches = list(unpack_file(path, Sample, workers=2, batch_size=30))
+        assert [len(batch) for batch in batches] == [30, 30, 30, 10]
+        assert [msg.y for batch in batches for msg in batch] == [-i for i in range(100)]
+
+        with pytest.raises(ValueError):
+            list(unpack_file(self.write(data[:-1]), Sample, workers=0))
+
+    def test_variable_size(self):
+        packed = self.frames(50)
+        path = self.write(b''.join(packed))
+        expected = [Frame.unpack(p) for p in packed]
+
+        batches = list(unpack_file(path, Frame, workers=2, batch_size=7))
+        assert [msg for batch in batches for msg in batch] == expected
+
+        batches = list(unpack_file(path, Frame, workers=0, batch_size=20))
+        assert [len(batch) for batch in batches] == [20, 20, 10]
+
+        offsets = record_offsets(b''.join(packed), Frame)
+        batches = list(unpack_file(path, Frame, workers=0, offsets=offsets))
+        assert batches == [expected]
+
+    def test_trusted(self):
+        data = b''.join(bytes((i % 4, 0, i)) for i in range(20))
+        path = self.write(data)
+
+        trusted = Coded.with_mode(trusted=True)
+        expected = [msg for batch in unpack_file(path, trusted, workers=0, batch_size=8) for msg in batch]
+        assert [msg.code for msg in expected[:4]] == [0, Code.one, Code.two, 3]
+        batches = list(unpack_file(path, trusted, workers=1, batch_size=8))
+        assert [msg for batch in batches for msg in batch] == expected
+
+    @pytest.mark.skipif('spawn' not in multiprocessing.get_all_start_methods(),
+                        reason='requires the spawn start method')
+    def test_spawn(self):
+        # Spawned workers import the module that defined the message to
+        # register it
+        packed = self.frames(20)
+        path = self.write(b''.join(packed))
+        context = multiprocessing.get_context('spawn')
+
+        batches = list(unpack_file(path, Frame, workers=2, batch_size=7, mp_context=context))
+        assert [msg for batch in batches for msg in batch] == [Frame.unpack(p) for p in packed]
+
+        trusted = Coded.with_mode(trusted=True)
+        path = self.write(b''.join(bytes((i % 4, 0, i)) for i in range(20)))
+        expected = [msg for batch in unpack_file(path, trusted, workers=0) for msg in batch]
+        batches = list(unpack_file(path, trusted, workers=1, batch_size=8, mp_context=context))
+        assert [msg for batch in batches for msg in batch] == expected
+
+    def test_empty(self):
+        assert list(unpack_file(self.write(b''), Frame)) == []
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+
+"""Tests for message predicates"""
+
+import enum
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.predicate import Field
+
+
+class MsgType(enum.Enum):
+    """Message types for testing predicates"""
+    status = 1
+    alarm = 2
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestPredicate(unittest.TestCase):
+    """Predicate module tests"""
+
+    Sample = Message('Sample', [
+        ('x', 'B'),
+    ], Mode.Big)
+
+    Frame = Message('Frame', [
+        ('msg_type', 'B', MsgType),
+        ('severity', 'b'),
+        ('level', 'F', 'H', 4),
+        ('length', 'B', 'samples'),
+        ('samples', Sample, 'length'),
+        ('after', 'B'),
+    ], Mode.Big)
+
+    def frames(self):
+        return [{
+            'msg_type': MsgType.alarm if i % 3 == 0 else MsgType.status,
+            'severity': i % 5 - 1,
+            'level': i / 4,
+            'samples': [{'x': j} for j in range(i % 4)],
+            'after': i,
+        } for i in range(40)]
+
+    def select(self, where):
+        data = b''.join(self.Frame.pack(f) for f in self.frames())
+        return [msg.after for msg in self.Frame.iter_unpack(data, where=where)]
+
+    def test_iter_unpack(self):
+        data = b''.join(self.Frame.pack(f) for f in self.frames())
+        assert list(self.Frame.iter_unpack(data)) == [self.Frame.make(f) for f in self.frames()]
+
+    def test_comparisons(self):
+        frames = self.frames()
+        assert self.select(Field('msg_type') == MsgType.alarm) == [f['after'] for f in frames if f['msg_type'] == MsgType.alarm]
+        assert self.select(Field('msg_type') != 'alarm') == [f['after'] for f in frames if f['msg_type'] != MsgType.alarm]
+        assert self.select(Field('severity') >= 2) == [f['after'] for f in frames if f['severity'] >= 2]
+        assert self.select(Field('severity') < 0) == [f['after'] for f in frames if f['severity'] < 0]
+        assert self.select(Field('level') > 8.5) == [f['after'] for f in frames if f['level'] > 8.5]
+        assert self.select(Field('length').isin([1, 3])) == [f['after'] for f in frames if len(f['samples']) in (1, 3)]
+
+    def test_combined(self):
+        frames = self.frames()
+        alarms = (Field('msg_type') == 2) & (Field('severity') >= 2)
+        assert self.select(alarms) == [f['after'] for f in frames if f['msg_type'] == MsgType.alarm and f['severity'] >= 2]
+        assert self.select(~alarms) == [f['after'] for f in frames if not (f['msg_type'] == MsgType.alarm and f['severity'] >= 2)]
+        assert self.select((Field('severity') == -1) | (Field('severity') == 3)) == [f['after'] for f in frames if f['severity'] in (-1, 3)]
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            (Field('bogus') == 1).compile(self.Frame)
+
+        with pytest.raises(ValueError):
+            (Field('after') == 1).compile(self.Frame)
+
+        with pytest.raises(ValueError):
+            (Field('msg_type') == 7).compile(self.Frame)
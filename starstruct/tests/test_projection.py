@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+
+"""Tests for message projections"""
+
+import enum
+import unittest
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class MsgType(enum.Enum):
+    """Message types for testing projections"""
+    status = 1
+    data = 2
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestProjection(unittest.TestCase):
+    """Projection module tests"""
+
+    Sample = Message('Sample', [
+        ('x', 'B'),
+        ('y', 'H'),
+    ], Mode.Big)
+
+    Status = Message('Status', [
+        ('temperature', 'h'),
+    ], Mode.Big)
+
+    Data = Message('Data', [
+        ('count', 'B', 'samples'),
+        ('samples', Sample, 'count'),
+    ], Mode.Big)
+
+    Frame = Message('Frame', [
+        ('source_id', 'H'),
+        ('msg_type', 'B', MsgType),
+        ('length', 'B', 'samples'),
+        ('samples', Sample, 'length'),
+        ('name', '8s'),
+        ('payload', {
+            MsgType.status: Status,
+            MsgType.data: Data,
+        }, 'msg_type'),
+        ('seq', 'I'),
+    ], Mode.Big)
+
+    def frame(self, seq, msg_type=MsgType.data):
+        payload = {'temperature': -4} if msg_type == MsgType.status else \
+            {'count': 2, 'samples': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}]}
+        return {
+            'source_id': 0x1234,
+            'msg_type': msg_type,
+            'length': seq % 3,
+            'samples': [{'x': i, 'y': seq} for i in range(seq % 3)],
+            'name': 'frame',
+            'payload': payload,
+            'seq': seq,
+        }
+
+    def test_static_fields(self):
+        packed = self.Frame.pack(self.frame(5))
+        route = self.Frame.unpack(packed, fields=('source_id', 'msg_type'))
+        assert route == (0x1234, MsgType.data)
+        assert route.msg_type == MsgType.data
+
+    def test_dynamic_fields(self):
+        for seq in range(6):
+            for msg_type in MsgType:
+                packed = self.Frame.pack(self.frame(seq, msg_type))
+                full = self.Frame.unpack(packed)
+
+                route = self.Frame.unpack(packed, fields=('seq', 'source_id', 'name'))
+                assert tuple(route) == (full.seq, full.source_id, full.name)
+
+                assert tuple(self.Frame.unpack(packed, fields=('payload',))) == (full.payload,)
+
+    def test_static_discriminated(self):
+        """The discriminator of a fixed size discriminated field is unpacked."""
+        Point = Message('Point', [('x', 'h'), ('y', 'h')], Mode.Big)
+        Reading = Message('Reading', [('value', 'i')], Mode.Big)
+        Fixed = Message('Fixed', [
+            ('source_id', 'H'),
+            ('msg_type', 'B', MsgType),
+            ('payload', {
+                MsgType.status: Point,
+                MsgType.data: Reading,
+            }, 'msg_type'),
+            ('seq', 'I'),
+        ], Mode.Big)
+        assert Fixed.static_size == 11
+
+        packed = Fixed.pack(source_id=1, msg_type=MsgType.status, payload={'x': -2, 'y': 3}, seq=4)
+        projected = Fixed.unpack(packed, fields=('payload',))
+        assert projected.payload == Fixed.unpack(packed).payload
+        assert (projected.payload.x, projected.payload.y) == (-2, 3)
+
+    def test_projection_cache(self):
+        projection = self.Frame.projection('source_id', 'seq')
+        assert self.Frame.projection('source_id', 'seq') is projection
+        assert projection.fields == ('source_id', 'seq')
+
+        packed = self.Frame.pack(self.frame(1)) + self.Frame.pack(self.frame(2))
+        offset = self.Frame.skip(packed)
+        assert projection.unpack(packed, offset).seq == 2
+
+    def test_skip(self):
+        for seq in range(4):
+            packed = self.Frame.pack(self.frame(seq))
+            assert self.Frame.skip(packed) == len(packed)
+            assert self.Frame.skip(b'\x00' + packed, 1) == len(packed) + 1
+
+    def test_invalid_fields(self):
+        with pytest.raises(ValueError):
+            self.Frame.projection()
+
+        with pytest.raises(ValueError):
+            self.Frame.projection('source_id', 'bogus')
+
+        checked = Message('Checked', [
+            ('data', 'H'),
+            ('crc', 'B', {(sum, 'data')}),
+        ])
+        with pytest.raises(ValueError):
+            checked.projection('crc')
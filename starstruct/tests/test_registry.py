@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+
+"""Tests for pickling messages and tuples"""
+
+import enum
+import multiprocessing
+import os
+import pickle
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from starstruct import registry
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class MsgType(enum.Enum):
+    """Message types for testing the registry"""
+    sample = 1
+    empty = 2
+
+
+Sample = Message('Sample', [
+    ('x', 'B'),
+    ('y', 'h'),
+], Mode.Big)
+
+Frame = Message('Frame', [
+    ('type', 'B', MsgType),
+    ('length', 'B', 'samples'),
+    ('samples', Sample, 'length'),
+    ('crc', 'B', {(lambda *parts: sum(b''.join(parts)) & 0xff, b'samples')}),
+], Mode.Big)
+
+Keyed = Message('Keyed', [
+    ('type', 'B', MsgType),
+    ('payload', {
+        MsgType.sample: Sample,
+        MsgType.empty: None,
+    }, 'type'),
+    ('flags', 'B', {'pack': (len, 'payload'), 'unpack': (len, 'payload')}),
+], Mode.Big)
+
+
+def unpack_frames(data):
+    """Unpack all frames in a buffer, used by the process pool test."""
+    frames = []
+    offset = 0
+    while offset < len(data):
+        (frame, offset) = Frame.unpack_from(data, offset)
+        frames.append(frame)
+    return frames
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestRegistry(unittest.TestCase):
+    """Registry module tests"""
+
+    values = {
+        'type': MsgType.sample,
+        'samples': [{'x': 1, 'y': -2}, {'x': 3, 'y': -4}],
+    }
+
+    def test_schema_key(self):
+        # The same definition always has the same key
+        assert Message('Sample', [('x', 'B'), ('y', 'h')], Mode.Big)._key == Sample._key  # pylint: disable=protected-access
+        assert Message('Sample', [('x', 'B'), ('y', 'H')], Mode.Big)._key != Sample._key  # pylint: disable=protected-access
+        assert Sample.with_mode(Mode.Little)._key != Sample._key  # pylint: disable=protected-access
+
+        # Messages defined by other modules, or with other options, have
+        # other keys
+        other = Message('Sample', [('x', 'B'), ('y', 'h')], Mode.Big, module='other.module')
+        assert other._key != Sample._key  # pylint: disable=protected-access
+        assert registry.lookup(other._key) is other  # pylint: disable=protected-access
+        cached = Message('Sample', [('x', 'B'), ('y', 'h')], Mode.Big, cache_packed=True)
+        assert cached._key != Sample._key  # pylint: disable=protected-access
+        assert pickle.loads(pickle.dumps(cached)) is cached
+
+    def test_lambda_key(self):
+        first = Message('Lambdas', [('x', 'B'), ('y', 'B', {(lambda x: x + 1, 'x')})])
+        second = Message('Lambdas', [('x', 'B'), ('y', 'B', {(lambda x: x + 2, 'x')})])
+        assert first._key != second._key  # pylint: disable=protected-access
+
+    def test_key_in_other_interpreters(self):
+        # Keys depend on the definition, not on the hash seed or object
+        # addresses of the process
+        code = 'import starstruct.tests.test_registry as t; print(t.Frame._key, t.Keyed._key)'
+        keys = set()
+        for seed in ('1', '2'):
+            env = dict(os.environ, PYTHONHASHSEED=seed)
+            output = subprocess.check_output([sys.executable, '-c', code], env=env,
+                                             cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+            keys.add(output.decode().strip())
+        assert keys == {'{} {}'.format(Frame._key, Keyed._key)}  # pylint: disable=protected-access
+
+    def test_update_key(self):
+        changed = Message('Changed', [('x', 'H')], Mode.Big)
+        old_key = changed._key  # pylint: disable=protected-access
+        changed.update(Mode.Little)
+        assert changed._key != old_key  # pylint: disable=protected-access
+        assert registry.lookup(changed._key) is changed  # pylint: disable=protected-access
+        with pytest.raises(KeyError):
+            registry.lookup(old_key)
+
+    def test_pickle_tuple(self):
+        frame = Frame.unpack(Frame.pack(self.values))
+        restored = pickle.loads(pickle.dumps(frame))
+        assert restored == frame
+        assert type(restored) is type(frame)  # pylint: disable=unidiomatic-typecheck
+        assert type(restored.samples[0]) is type(frame.samples[0])  # pylint: disable=unidiomatic-typecheck
+        assert restored.pack() == frame.pack()
+
+        little = Sample.with_mode(Mode.Little)
+        sample = little.unpack(b'\x01\x02\x00')
+        assert pickle.loads(pickle.dumps(sample)).pack() == b'\x01\x02\x00'
+
+    def test_pickle_message(self):
+        assert pickle.loads(pickle.dumps(Frame)) is Frame
+
+        with pytest.raises(KeyError):
+            registry.lookup('Missing-0000000000000000')
+
+    def test_pickle_trusted(self):
+        trusted = Frame.with_mode(trusted=True)
+        assert trusted._key != Frame._key  # pylint: disable=protected-access
+        assert pickle.loads(pickle.dumps(trusted)) is trusted
+
+        # 9 is not a MsgType value, so only the trusted message can restore
+        # the tuple
+        frame = trusted.unpack(b'\x09\x00\x00')
+        restored = pickle.loads(pickle.dumps(frame))
+        assert restored == frame
+        assert restored.type == 9
+        assert type(restored) is type(frame)  # pylint: disable=unidiomatic-typecheck
+
+    @pytest.mark.skipif('fork' not in multiprocessing.get_all_start_methods(),
+                        reason='requires the fork start method')
+    def test_process_pool(self):
+        data = [Frame.pack(self.values) * count for count in range(1, 4)]
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(2, mp_context=context, initializer=registry.load_schemas,
+                                 initargs=(__name__,)) as executor:
+            results = list(executor.map(unpack_frames, data))
+
+        assert results == [unpack_frames(chunk) for chunk in data]
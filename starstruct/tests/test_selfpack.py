@@ -2,6 +2,7 @@
 
 """Tests for the starstruct class and its self packing"""
 
+import collections
 import struct
 import unittest
 
@@ -77,3 +78,61 @@ class TestStarStruct(unittest.TestCase):
         packed = TestStruct.pack(test_data_no_data)
         assert packed == struct.pack('H', 0) + (struct.pack('B', 0) + struct.pack('H', 0)) * num_repeats
         assert packed == made.pack()
+
+    def test_pack_into(self):
+        TestStruct = Message('TestStruct', [
+            ('a', 'b'),
+            ('length', 'H', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+            ('repeated_data', self.Repeated, 2),
+        ])
+        test_data = {
+            'a': -3,
+            'vardata': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}],
+            'repeated_data': [{'x': 5, 'z': 6}],
+        }
+
+        made = TestStruct.make(test_data)
+        packed = TestStruct.pack(test_data)
+        assert made.pack() == packed
+        assert TestStruct.pack(made) == packed
+
+        buf = bytearray(len(packed) + 2)
+        assert made.pack_into(buf, 1) == len(packed) + 1
+        assert buf == b'\x00' + packed + b'\x00'
+
+        buf = bytearray(len(packed))
+        assert TestStruct.pack_into(memoryview(buf), 0, test_data) == len(packed)
+        assert buf == packed
+
+    def test_pack_tuple(self):
+        TestStruct = Message('TestStruct', [
+            ('a', 'b'),
+            ('length', 'H', 'vardata'),
+            ('vardata', self.VarTest, 'length'),
+            ('repeated_data', self.Repeated, 2),
+        ])
+        test_data = {
+            'a': -3,
+            'vardata': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}],
+            'repeated_data': [{'x': 5, 'z': 6}, {'x': 7, 'z': 8}],
+        }
+        packed = TestStruct.pack(test_data)
+
+        # Nested items can be tuples in field order
+        values = (-3, 2, [(1, 2), (3, 4)], [(5, 6), (7, 8)])
+        assert TestStruct.pack_tuple(values) == packed
+        assert TestStruct.pack(list(values)) == packed
+        assert TestStruct.pack_tuple(TestStruct.unpack(packed)) == packed
+
+        # Other namedtuples are packed by field name, not by position
+        YX = collections.namedtuple('YX', ['y', 'x'])
+        assert self.VarTest.pack(YX(y=2, x=1)) == self.VarTest.pack({'x': 1, 'y': 2})
+        assert TestStruct.pack(a=-3, vardata=[YX(y=2, x=1), YX(y=4, x=3)],
+                               repeated_data=[(5, 6), (7, 8)]) == packed
+
+        with self.assertRaises(ValueError):
+            TestStruct.pack_tuple(values[:3])
+
+        with self.assertRaises(TypeError):
+            TestStruct.pack_tuple(test_data)
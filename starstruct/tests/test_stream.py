@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+
+"""Tests for the stream reader"""
+
+import unittest
+from binascii import crc32
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+from starstruct.stream import StreamReader, sync_sequence
+
+
+def frame_crc(*parts):
+    return crc32(b''.join(parts))
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestStreamReader(unittest.TestCase):
+    """StreamReader module tests"""
+
+    Sample = Message('Sample', [
+        ('x', 'B'),
+        ('y', 'H'),
+    ], Mode.Big)
+
+    Frame = Message('Frame', [
+        ('sync', 'H', (0xeb90,)),
+        ('length', 'B', 'samples'),
+        ('samples', Sample, 'length'),
+        ('crc', 'I', {(frame_crc, b'length', b'samples')}),
+    ], Mode.Big)
+
+    def frames(self, count):
+        return [self.Frame.make({
+            'length': i % 4,
+            'samples': [{'x': i, 'y': j} for j in range(i % 4)],
+        }) for i in range(count)]
+
+    def test_sync_sequence(self):
+        assert sync_sequence(self.Frame) == b'\xeb\x90'
+
+        with pytest.raises(TypeError):
+            sync_sequence(self.Sample)
+
+    def test_clean_stream(self):
+        frames = self.frames(10)
+        data = b''.join(self.Frame.pack(f._asdict()) for f in frames)
+
+        reader = StreamReader(self.Frame)
+        assert reader.feed(data) == frames
+        assert reader.skipped == 0
+        assert reader.resyncs == 0
+
+    def test_split_stream(self):
+        frames = self.frames(10)
+        data = b''.join(self.Frame.pack(f._asdict()) for f in frames)
+
+        reader = StreamReader(self.Frame)
+        unpacked = []
+        for i in range(len(data)):
+            unpacked.extend(reader.feed(data[i:i + 1]))
+        assert unpacked == frames
+        assert reader.skipped == 0
+
+    def test_resync(self):
+        frames = self.frames(6)
+        packed = [self.Frame.pack(f._asdict()) for f in frames]
+
+        # Garbage between frames, a frame with a lost byte, and a frame with
+        # a corrupt checksum
+        data = b'\x01\x02\xeb' + packed[0] + packed[1][:5] + packed[1][6:] + packed[2] + \
+            packed[3][:-1] + b'\x00' + packed[4] + b'\xeb\x90' + packed[5]
+
+        reader = StreamReader(self.Frame)
+        assert reader.feed(data) == [frames[0], frames[2], frames[4], frames[5]]
+        assert reader.skipped == 3 + (len(packed[1]) - 1) + len(packed[3]) + 2
+        assert reader.resyncs == 4
+
+    def test_flush(self):
+        frames = self.frames(3)
+        packed = [self.Frame.pack(f._asdict()) for f in frames]
+
+        reader = StreamReader(self.Frame)
+        assert reader.feed(packed[0] + packed[1] + packed[2][:-2]) == frames[:2]
+        assert reader.skipped == 0
+
+        assert reader.flush() == []
+        assert reader.skipped == len(packed[2]) - 2
+
+    def test_incomplete_frame_retries(self):
+        """Incomplete frames are only unpacked again once they can be complete."""
+        frame = self.Frame.make({'length': 200, 'samples': [{'x': 1, 'y': i} for i in range(200)]})
+        data = self.Frame.pack(frame._asdict())
+
+        attempts = []
+
+        class Counted(object):
+            """Count the frames the reader tries to unpack."""
+            def __init__(self, message):
+                self.message = message
+
+            def unpack_from(self, buf, offset=0):
+                attempts.append(len(buf))
+                return self.message.unpack_from(buf, offset)
+
+            def frame_length(self, buf, offset=0):
+                return self.message.frame_length(buf, offset)
+
+        reader = StreamReader(Counted(self.Frame), sync=b'\xeb\x90')
+        unpacked = []
+        for i in range(len(data)):
+            unpacked.extend(reader.feed(bytearray(data[i:i + 1])))
+        assert unpacked == [frame]
+        assert reader.skipped == 0
+
+        # Once after the sync sequence and the length, and once complete
+        assert attempts == [2, 3, len(data)]
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""Tests for using messages from multiple threads"""
+
+import decimal
+import enum
+import unittest
+from binascii import crc32
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class MsgType(enum.Enum):
+    """Message types for testing threads"""
+    sample = 1
+    empty = 2
+
+
+def frame_crc(*parts):
+    return crc32(b''.join(parts))
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestThreads(unittest.TestCase):
+    """Concurrent pack and unpack tests"""
+
+    Sample = Message('Sample', [
+        ('x', 'B'),
+        ('y', 'h'),
+        ('value', 'F', 'I', 8, 12),
+    ])
+
+    Frame = Message('Frame', [
+        ('sync', 'H', (0xeb90,)),
+        ('type', 'B', MsgType),
+        ('length', 'B', 'samples'),
+        ('samples', Sample, 'length'),
+        ('data', {
+            MsgType.sample: Sample,
+            MsgType.empty: None,
+        }, 'type'),
+        ('name', '8s'),
+        ('crc', 'I', {(frame_crc, b'type', b'samples', b'name')}),
+    ])
+
+    threads = 8
+    iterations = 200
+
+    def frame(self, index):
+        return {
+            'type': MsgType.sample if index % 2 else MsgType.empty,
+            'samples': [{'x': i, 'y': -index, 'value': Decimal(index) / 4} for i in range(index % 5)],
+            'data': {'x': 1, 'y': 2, 'value': '0.5'},
+            'name': str(index),
+        }
+
+    def run_threads(self, worker):
+        with ThreadPoolExecutor(self.threads) as executor:
+            results = list(executor.map(worker, range(self.threads)))
+        assert all(results)
+
+    def test_pack_unpack(self):
+        """Every thread packs and unpacks the same messages."""
+        modes = [Mode.Little, Mode.Big, Mode.Native]
+
+        def worker(thread):
+            message = self.Frame.with_mode(modes[thread % len(modes)])
+            for i in range(self.iterations):
+                values = self.frame(i + thread)
+                packed = message.pack(values)
+                unpacked = message.unpack(packed)
+                assert unpacked.type == values['type']
+                assert [s.value for s in unpacked.samples] == [s['value'] for s in values['samples']]
+                assert unpacked.pack() == packed
+                assert message.unpack(packed, fields=('name',)).name == values['name']
+            return True
+
+        self.run_threads(worker)
+
+    def test_decimal_context(self):
+        """Unpacking fixed point values does not change the decimal context."""
+        prec = decimal.getcontext().prec
+
+        def worker(thread):
+            with decimal.localcontext() as ctx:
+                ctx.prec = 10 + thread
+                for i in range(self.iterations):
+                    packed = self.Sample.pack(x=0, y=0, value=Decimal(i) / 8)
+                    assert self.Sample.unpack(packed).value == Decimal(i) / 8
+                    assert decimal.getcontext().prec == 10 + thread
+            return True
+
+        self.run_threads(worker)
+        assert decimal.getcontext().prec == prec
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+"""Tests for transcoding packed messages between modes"""
+
+import enum
+import unittest
+from decimal import Decimal
+
+import pytest
+
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class Kind(enum.Enum):
+    empty = 0
+    point = 1
+    label = 2
+
+
+def frame_sum(*parts):
+    return sum(b''.join(parts) * 3 + b''.join(parts)[::2]) & 0xffff
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestTranscode(unittest.TestCase):
+    """Transcoding tests"""
+
+    Sample = Message('TranscodeSample', [('x', 'h'), ('y', 'H')], Mode.Big)
+    Point = Message('TranscodePoint', [('x', 'f'), ('y', 'd'), ('tag', 'B')], Mode.Big)
+    Label = Message('TranscodeLabel', [('text', '5s'), ('size', 'I')], Mode.Big)
+
+    def test_fixed(self):
+        test_msg = Message('test', [
+            ('kind', 'B', Kind),
+            ('value', 'F', 'i', 8),
+            ('name', '6s'),
+            ('counts', '3H'),
+            ('ratio', 'f'),
+            ('flag', '?'),
+            ('big', 'q'),
+        ], Mode.Big)
+        values = {
+            'kind': Kind.label,
+            'value': Decimal('-1.5'),
+            'name': 'abc',
+            'counts': 0x123456789abc,
+            'ratio': 0.25,
+            'flag': True,
+            'big': -2 ** 40,
+        }
+        little = test_msg.with_mode(Mode.Little)
+
+        packed = test_msg.pack(values)
+        assert test_msg.transcode(packed, Mode.Little) == little.pack(values)
+        assert little.transcode(little.pack(values), Mode.Network) == packed
+        assert test_msg.transcode(packed, Mode.Network) == packed
+
+        # Convert a message in the middle of a buffer in place
+        buf = bytearray(b'\xff' + packed + b'\xee')
+        assert test_msg.transcode_into(buf, Mode.Little, 1) == len(packed) + 1
+        assert buf == b'\xff' + little.pack(values) + b'\xee'
+
+    def test_variable(self):
+        test_msg = Message('test', [
+            ('seq', 'I'),
+            ('length', 'H', 'samples'),
+            ('samples', self.Sample, 'length'),
+            ('kind', 'B', Kind),
+            ('payload', {
+                Kind.empty: None,
+                Kind.point: self.Point,
+                Kind.label: self.Label,
+            }, 'kind'),
+            ('count', 'V', 'points'),
+            ('points', self.Point, 'count'),
+            ('fixed', self.Sample, 2),
+            ('checksum', 'H', {(frame_sum, b'seq', b'samples', b'payload', b'points')}),
+        ], Mode.Big)
+        little = test_msg.with_mode(Mode.Little)
+
+        for (kind, payload) in [(Kind.empty, None), (Kind.point, {'x': 0.5, 'y': -3.25, 'tag': 7}), (Kind.label, {'text': 'hi', 'size': 70000})]:
+            with self.subTest(kind):  # pylint: disable=no-member
+                values = {
+                    'seq': 0x01020304,
+                    'samples': [{'x': -i, 'y': i * 300} for i in range(200)],
+                    'kind': kind,
+                    'payload': payload,
+                    'points': [{'x': 1.0, 'y': 2.0, 'tag': 3}] * 3,
+                    'fixed': [{'x': 1, 'y': 2}, {'x': 3, 'y': 4}],
+                }
+                packed = test_msg.pack(values)
+                converted = test_msg.transcode(packed, Mode.Little)
+                assert converted == little.pack(values)
+                assert little.transcode(converted, Mode.Big) == packed
+
+    def test_fixed_discriminated(self):
+        Value = Message('TranscodeValue', [('v', 'i')], Mode.Big)
+        Entry = Message('TranscodeEntry', [
+            ('kind', 'B', Kind),
+            ('data', {
+                Kind.point: self.Sample,
+                Kind.label: Value,
+            }, 'kind'),
+        ], Mode.Big)
+        test_msg = Message('test', [
+            ('seq', 'H'),
+            ('nothing', None),
+            ('entry', Entry),
+            ('pair', Entry, 2),
+            ('count', 'B', 'entries'),
+            ('entries', Entry, 'count'),
+            ('end', 'H'),
+        ], Mode.Big)
+        assert Entry.static_size == 5
+        little = test_msg.with_mode(Mode.Little)
+
+        point = {'kind': Kind.point, 'data': {'x': -2, 'y': 3}}
+        value = {'kind': Kind.label, 'data': {'v': 0x01020304}}
+        values = {
+            'seq': 0x0102,
+            'entry': value,
+            'pair': [point, value],
+            'entries': [value, point, point],
+            'end': 0x0304,
+        }
+        packed = test_msg.pack(values)
+        converted = test_msg.transcode(packed, Mode.Little)
+        assert converted == little.pack(values)
+        assert little.transcode(converted, Mode.Big) == packed
+
+        # Only the fixed size part of the message
+        fixed = Message('test', [('nothing', None), ('entry', Entry), ('seq', 'H')], Mode.Big)
+        packed = fixed.pack(entry=point, seq=5)
+        assert fixed.transcode(packed, Mode.Little) == fixed.with_mode(Mode.Little).pack(entry=point, seq=5)
+
+    def test_presence(self):
+        test_msg = Message('test', [
+            ('present', 'H', ['rate', 'gain', 'name']),
+            ('rate', 'I'),
+            ('gain', 'f'),
+            ('name', '4s'),
+        ], Mode.Big)
+        little = test_msg.with_mode(Mode.Little)
+
+        for values in [{}, {'gain': 1.5}, {'rate': 9, 'name': 'ab'}]:
+            with self.subTest(values):  # pylint: disable=no-member
+                assert test_msg.transcode(test_msg.pack(values), Mode.Little) == little.pack(values)
+
+    def test_not_supported(self):
+        test_msg = Message('test', [
+            ('samples', self.Sample, {'compress': 'zlib'}),
+        ], Mode.Big)
+
+        with pytest.raises(TypeError):
+            test_msg.transcode(test_msg.pack(samples=[{'x': 1, 'y': 2}]), Mode.Little)
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""Tests for converting packed messages between message formats"""
+
+import enum
+import unittest
+from binascii import crc32
+from decimal import Decimal
+
+import pytest
+
+import starstruct
+from starstruct.message import Message
+from starstruct.modes import Mode
+
+
+class Kind(enum.Enum):
+    data = 1
+    ack = 2
+
+
+def payload_crc(*parts):
+    return crc32(b''.join(parts))
+
+
+# pylint: disable=line-too-long,invalid-name
+class TestTranscoder(unittest.TestCase):
+    """Transcoder tests"""
+
+    V1 = Message('TranscoderV1', [
+        ('kind', 'B', Kind),
+        ('src', 'H'),
+        ('dst', 'H'),
+        ('length', 'B'),
+        ('gain', 'F', 'i', 8),
+        ('name', '8s'),
+        ('temp', 'f'),
+    ], Mode.Big)
+
+    V2 = Message('TranscoderV2', [
+        ('magic', 'H', (0xabcd,)),
+        ('version', 'B'),
+        ('kind', 'H', Kind),
+        ('source', 'H'),
+        ('dst', 'H'),
+        ('name', '8s'),
+        ('length', 'I'),
+        ('gain', 'F', 'i', 16),
+        ('temp', 'd'),
+        ('pad', '3x'),
+        ('crc', 'I', {(payload_crc, b'source', b'dst', b'name')}),
+    ], Mode.Big)
+
+    values = {
+        'kind': Kind.ack,
+        'src': 7,
+        'dst': 300,
+        'length': 200,
+        'gain': Decimal('1.5'),
+        'name': 'probe',
+        'temp': 0.25,
+    }
+
+    def expected(self):
+        values = dict(self.values)
+        values['source'] = values.pop('src')
+        values['version'] = 2
+        return self.V2.pack(values)
+
+    def test_compiled(self):
+        upgrade = starstruct.transcoder(self.V1, self.V2, {'source': 'src', 'version': 2})
+        assert upgrade.compiled
+
+        # The source and destination fields are copied together
+        assert upgrade.copies == [(1, 5, 5, 9), (10, 18, 9, 17)]
+        assert [elem.name for (_, _, elem, _) in upgrade.converted] == ['gain']
+
+        packed = self.V1.pack(self.values)
+        assert upgrade.convert(packed) == self.expected()
+        assert self.V2.unpack(upgrade.convert(packed)).kind == Kind.ack
+
+        assert upgrade.convert_many(packed * 3) == self.expected() * 3
+        assert upgrade.convert(b'\x00' + packed, 1) == self.expected()
+        with pytest.raises(ValueError):
+            upgrade.convert_many(packed + b'\x00')
+
+    def test_mode(self):
+        """Fields are converted between byte orders."""
+        little = self.V1.with_mode(Mode.Little)
+        upgrade = starstruct.transcoder(little, self.V2, {'source': 'src', 'version': 2})
+        assert upgrade.copies == [(10, 18, 9, 17)]
+        assert upgrade.convert(little.pack(self.values)) == self.expected()
+
+        downgrade = starstruct.transcoder(self.V2, little, {'src': 'source'})
+        assert downgrade.convert(self.expected()) == little.pack(self.values)
+
+    def test_variable(self):
+        Sample = Message('TranscoderSample', [('x', 'B')], Mode.Big)
+        src = Message('test', [
+            ('seq', 'B'),
+            ('count', 'B', 'samples'),
+            ('samples', Sample, 'count'),
+        ], Mode.Big)
+        dst = Message('test', [
+            ('seq', 'H'),
+            ('count', 'H', 'samples'),
+            ('samples', Sample, 'count'),
+        ], Mode.Little)
+
+        convert = starstruct.transcoder(src, dst)
+        assert not convert.compiled
+
+        packed = src.pack(seq=5, samples=[{'x': 1}, {'x': 2}])
+        assert convert.convert(packed) == dst.pack(seq=5, samples=[{'x': 1}, {'x': 2}])
+        assert convert.convert_many(packed * 2) == dst.pack(seq=5, samples=[{'x': 1}, {'x': 2}]) * 2
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            starstruct.transcoder(self.V1, self.V2)
+        with pytest.raises(ValueError):
+            starstruct.transcoder(self.V1, self.V2, {'source': 'source', 'version': 2})
+        with pytest.raises(ValueError):
+            starstruct.transcoder(self.V1, self.V2, {'source': 'src', 'version': 2, 'other': 1})
@@ -0,0 +1,305 @@
+"""
+Convert packed messages between byte orders without unpacking them.
+
+.. code-block:: python
+
+    # Frame is a Mode.Big message
+    little = Frame.transcode(packed, Mode.Little)
+    Frame.with_mode(Mode.Little).unpack(little) == Frame.unpack(packed)
+
+The layout of a message is the same in every mode, so converting a message
+only has to reverse the bytes of each numeric value.  Each message has a
+plan of the values to reverse, which is built from the struct formats of its
+elements the first time the message is transcoded.  Only the values of the
+fields that determine the size of the message (such as lengths and
+discriminators) are unpacked, no enums, strings, decimals or tuples are
+created.
+
+Runs of values of the same size (such as a list of fixed size messages that
+only hold 16 bit values) are reversed with a single array.byteswap() call,
+other runs with one struct call that reads them in one byte order and
+writes them in the other.  Callable fields that are computed from the packed
+bytes of other fields (such as checksums) are recomputed.
+
+Compressed and escaped elements can not be transcoded.
+"""
+
+import re
+import struct
+import types
+from array import array
+
+from starstruct.elementcallable import ElementCallable
+from starstruct.elementdiscriminated import ElementDiscriminated
+from starstruct.elementnum import ElementNum
+from starstruct.elementpresence import ElementOptional
+from starstruct.elementvariable import ElementVariable
+from starstruct.elementvarint import ElementVarint
+
+
+# The unsigned struct format and array type code used to reverse values of
+# each size, the bits of floats are copied without converting them
+CODES = {2: 'H', 4: 'I', 8: 'Q'}
+TYPECODES = {array(code).itemsize: code for code in 'HILQ'}
+
+
+def _runs(fmt):
+    """
+    Return a list of (size, count) runs of the values in a struct format,
+    runs of bytes that are copied as they are have a size of 1.
+    """
+    runs = []
+    for (count, code) in re.findall(r'(\d*)([a-zA-Z?])', fmt.lstrip('@=<>!')):
+        count = int(count) if count else 1
+        size = struct.calcsize('<' + code)
+        if code in 'spx' or size == 1:
+            runs.append((1, count * size))
+        else:
+            runs.append((size, count))
+    return runs
+
+
+def _element_runs(elem):
+    """Return the runs of a fixed size element, or None."""
+    if elem.static_size == 0:
+        # Elements that take no space (such as ElementNone)
+        return []
+    elif isinstance(elem, ElementVariable) and not elem.variable_repeat:
+        # A fixed number of fixed size messages, unless the messages have
+        # to be reversed one at a time
+        runs = plan(elem.format).runs
+        return None if runs is None else runs * elem.ref
+    elif getattr(elem, '_struct', None) is not None:
+        if isinstance(elem, ElementNum):
+            # Number elements are a single value spread over all of the
+            # values of the format
+            runs = [(elem._struct.size, 1)]  # pylint: disable=protected-access
+        else:
+            runs = _runs(elem._struct.format)  # pylint: disable=protected-access
+        padding = elem.static_size - elem._struct.size  # pylint: disable=protected-access
+        if padding:
+            runs.append((1, padding))
+        return runs
+    return None
+
+
+class Swapper(object):
+    """
+    Reverse the bytes of the values in a fixed size block of a buffer.
+
+    :param runs: The (size, count) runs of values in the block
+    """
+    def __init__(self, runs):
+        # Merge neighbouring runs of the same size
+        self.runs = []
+        for (size, count) in runs:
+            if count and self.runs and self.runs[-1][0] == size:
+                self.runs[-1] = (size, self.runs[-1][1] + count)
+            elif count:
+                self.runs.append((size, count))
+
+        self.size = sum(size * count for (size, count) in self.runs)
+        sizes = {size for (size, _) in self.runs}
+
+        self._typecode = None
+        self._little = None
+        self._big = None
+        if sizes == {1} or not sizes:
+            # Nothing to reverse
+            self.swap = self._copy
+            self.swap_many = self._copy_many
+        elif not sizes <= set(CODES) | {1}:
+            # Reverse values of unusual sizes one at a time
+            self.swap = self._swap_slices
+            self.swap_many = self._swap_slices_many
+        elif len(sizes) == 1:
+            self._typecode = TYPECODES[sizes.pop()]
+            self.swap = self._swap_array
+            self.swap_many = self._swap_array_many
+        else:
+            fmt = ''.join('{}{}'.format(count, 's' if size == 1 else CODES[size])
+                          for (size, count) in self.runs)
+            self._little = struct.Struct('<' + fmt)
+            self._big = struct.Struct('>' + fmt)
+            self.swap = self._swap_struct
+            self.swap_many = self._swap_struct_many
+
+    def _copy(self, buf, offset):
+        return offset + self.size
+
+    def _copy_many(self, buf, offset, count):
+        return offset + self.size * count
+
+    def _swap_array(self, buf, offset):
+        return self._swap_array_many(buf, offset, 1)
+
+    def _swap_array_many(self, buf, offset, count):
+        end = offset + self.size * count
+        values = array(self._typecode)
+        values.frombytes(buf[offset:end])
+        values.byteswap()
+        buf[offset:end] = values
+        return end
+
+    def _swap_slices(self, buf, offset):
+        for (size, count) in self.runs:
+            if size == 1:
+                offset += count
+                continue
+            for _ in range(count):
+                buf[offset:offset + size] = bytes(buf[offset:offset + size])[::-1]
+                offset += size
+        return offset
+
+    def _swap_slices_many(self, buf, offset, count):
+        for _ in range(count):
+            offset = self._swap_slices(buf, offset)
+        return offset
+
+    def _swap_struct(self, buf, offset):
+        self._big.pack_into(buf, offset, *self._little.unpack_from(buf, offset))
+        return offset + self.size
+
+    def _swap_struct_many(self, buf, offset, count):
+        for _ in range(count):
+            offset = self._swap_struct(buf, offset)
+        return offset
+
+
+class Plan(object):
+    """
+    The values to reverse in a message.
+
+    :param message: The message to transcode
+    """
+    # pylint: disable=protected-access
+    def __init__(self, message):
+        self.message = message
+
+        # Fixed size elements with values that depend on other fields (such
+        # as discriminated elements with messages of the same size) are
+        # copied with the prefix, and then reversed on their own
+        self.runs = []
+        self.fixed = []
+        for (elem, pos) in message._layout:
+            runs = _element_runs(elem)
+            if runs is None and isinstance(elem, (ElementVariable, ElementDiscriminated)):
+                self.fixed.append((elem, pos))
+                runs = [(1, elem.static_size)]
+            elif runs is None:
+                raise TypeError('field {} of {} can not be transcoded'.format(elem.name, message._name))
+            self.runs.extend(runs)
+        self.prefix = Swapper(self.runs)
+        if message._dynamic or self.fixed:
+            self.runs = None
+
+        # The fields that have to be unpacked before their bytes are
+        # reversed
+        refs = message._refs | {elem.ref for (elem, _) in self.fixed if isinstance(elem.ref, str)}
+        self.skim = [(elem, pos) for (elem, pos) in message._layout if elem.name in refs]
+
+        # The variable size elements, and the swapper of each fixed size one
+        self.dynamic = []
+        for elem in message._dynamic:
+            if isinstance(elem, ElementOptional):
+                self.dynamic.append((elem, Swapper(_element_runs(elem.element))))
+            elif isinstance(elem, (ElementVariable, ElementDiscriminated, ElementVarint)):
+                self.dynamic.append((elem, None))
+            else:
+                runs = _element_runs(elem) if elem.static_size is not None else None
+                if runs is None:
+                    raise TypeError('field {} of {} can not be transcoded'.format(elem.name, message._name))
+                self.dynamic.append((elem, Swapper(runs)))
+
+        # Callables computed from packed bytes have to be computed again in
+        # the new byte order
+        self.callables = [elem for elem in message._elements.values()
+                          if isinstance(elem, ElementCallable) and elem._pack_func is not None
+                          and any(isinstance(arg, bytes) for arg in elem._pack_args)]
+
+    def swap(self, buf, offset, to_mode):
+        """Reverse the values of the message at offset, returns the end offset."""
+        message = self.message
+        start = offset
+
+        # The fields the variable size elements depend on have to be
+        # unpacked before their bytes are reversed
+        ctx = types.SimpleNamespace()
+        for (elem, pos) in self.skim:
+            setattr(ctx, elem.name, elem.unpack_from(ctx, buf, offset + pos)[0])
+
+        for (elem, pos) in self.fixed:
+            _swap_element(elem, ctx, buf, offset + pos, to_mode)
+        offset = self.prefix.swap(buf, offset)
+        for (elem, swapper) in self.dynamic:
+            if elem.name in message._refs:
+                setattr(ctx, elem.name, elem.unpack_from(ctx, buf, offset)[0])
+
+            if swapper is None:
+                offset = _swap_element(elem, ctx, buf, offset, to_mode)
+            elif isinstance(elem, ElementOptional):
+                if getattr(ctx, elem.ref) & elem.mask:
+                    offset = swapper.swap(buf, offset)
+            else:
+                offset = swapper.swap(buf, offset)
+
+        if self.callables:
+            target = message.with_mode(to_mode)
+            (ctx, spans) = target._spans(buf, start)
+            for elem in self.callables:
+                target._pack_callable(target._elements[elem.name], buf, ctx, spans)
+        return offset
+
+
+def _swap_element(elem, ctx, buf, offset, to_mode):
+    """Reverse the values of a variable size element."""
+    if isinstance(elem, ElementVarint):
+        return elem.skip(ctx, buf, offset)
+    elif isinstance(elem, ElementDiscriminated):
+        fmt = elem.format[getattr(ctx, elem.ref)]
+        if fmt is None:
+            return offset
+        return plan(fmt).swap(buf, offset, to_mode)
+
+    # A variable element
+    fmt = plan(elem.format)
+    if elem.object_length:
+        count = getattr(ctx, elem.ref) if elem.variable_repeat else elem.ref
+        if fmt.runs is not None and not fmt.callables:
+            return fmt.prefix.swap_many(buf, offset, count)
+        for _ in range(count):
+            offset = fmt.swap(buf, offset, to_mode)
+        return offset
+
+    end = offset + getattr(ctx, elem.ref)
+    if fmt.runs is not None and not fmt.callables:
+        return fmt.prefix.swap_many(buf, offset, (end - offset) // fmt.prefix.size)
+    while offset < end:
+        offset = fmt.swap(buf, offset, to_mode)
+    return offset
+
+
+def plan(message):
+    """Return the transcoding plan of a message, which is only built once."""
+    # pylint: disable=protected-access
+    if message._plan is None:
+        message._plan = Plan(message)
+    return message._plan
+
+
+def transcode_into(message, buf, to_mode, offset=0):
+    """
+    Convert a packed message in a writable buffer to another mode in place.
+    Returns the offset following the message.
+    """
+    if to_mode.to_byteorder() == message.mode.to_byteorder():
+        return message.skip(buf, offset)
+    return plan(message).swap(buf, offset, to_mode)
+
+
+def transcode(message, buf, to_mode, offset=0):
+    """Return the packed message at offset in the buffer in another mode."""
+    end = message.skip(buf, offset)
+    out = bytearray(buf[offset:end])
+    transcode_into(message, out, to_mode)
+    return bytes(out)
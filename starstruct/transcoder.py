@@ -0,0 +1,287 @@
+"""
+Convert packed messages from one message format to another.
+
+.. code-block:: python
+
+    # Version 2 of a frame renamed 'src' to 'source', widened 'length' from
+    # 'B' to 'H' and added a 'version' constant
+    upgrade = starstruct.transcoder(FrameV1, FrameV2, {'source': 'src', 'version': 2})
+    v2 = upgrade.convert(v1)
+    v2_capture = upgrade.convert_many(v1_capture)
+
+The mapping maps the names of fields of the destination message to the names
+of fields of the source message, any other value is a constant value for the
+destination field.  Destination fields that are not in the mapping are
+copied from the source field with the same name.  Callable, constant and
+padding fields of the destination message are packed as usual.
+
+If both messages have a fixed size the conversion is compiled into a plan
+that works directly on the packed bytes:
+
+* fields that are packed the same way in both messages are copied, fields
+  that are next to each other in both messages are copied together
+* integer and enum fields of different sizes or byte orders are converted
+  with struct, without creating enum members
+* other fields that changed are unpacked and packed again
+* constants are packed once into a template of the destination message
+
+Messages with variable size elements are converted by unpacking the source
+message and packing the destination message.
+"""
+
+import enum
+import struct
+import types
+
+from starstruct.elementbase import ElementBase
+from starstruct.elementcallable import ElementCallable
+from starstruct.elementenum import ElementEnum
+from starstruct.elementnum import ElementNum
+
+
+INT_CODES = frozenset('bBhHiIlLqQ?')
+FLOAT_CODES = frozenset('efd')
+BYTE_CODES = frozenset('0123456789xcbB?sp')
+
+
+def _raw_code(elem):
+    """
+    Return the struct format character of an element whose packed value can
+    be converted with struct alone, or None.
+    """
+    if not isinstance(elem, (ElementBase, ElementNum, ElementEnum, ElementCallable)):
+        return None
+
+    # pylint: disable=protected-access
+    fmt = elem._struct.format.lstrip('@=<>!')
+    if len(fmt) != 1 or fmt not in INT_CODES | FLOAT_CODES:
+        return None
+    return fmt
+
+
+def _convertible(src, dst):
+    """Return True if a value can be converted from src to dst with struct."""
+    src_code = _raw_code(src)
+    dst_code = _raw_code(dst)
+    if src_code is None or dst_code is None or isinstance(dst, ElementCallable):
+        return False
+    elif (src_code in FLOAT_CODES) != (dst_code in FLOAT_CODES):
+        return False
+
+    # Enum values can only be converted to the same enum
+    src_enum = src.ref if isinstance(src, ElementEnum) else None
+    dst_enum = dst.ref if isinstance(dst, ElementEnum) else None
+    return src_enum is dst_enum
+
+
+def _struct_key(elem):
+    """
+    Return the struct format of an element without the mode, and the byte
+    order if it matters.
+    """
+    # pylint: disable=protected-access
+    fmt = elem._struct.format.lstrip('@=<>!')
+    if set(fmt) <= BYTE_CODES:
+        return (None, fmt)
+    return (elem._mode.to_byteorder(), fmt)
+
+
+def _same_encoding(src, dst):
+    """Return True if the packed bytes of src are also valid for dst."""
+    if type(src) is not type(dst) or isinstance(dst, ElementCallable):
+        return False
+    elif src.static_size != dst.static_size:
+        return False
+    elif getattr(src, '_struct', None) is not None:
+        if _struct_key(src) != _struct_key(dst):
+            return False
+    elif src.format is not dst.format:
+        return False
+    return getattr(src, 'ref', None) == getattr(dst, 'ref', None)
+
+
+class Transcoder(object):
+    """
+    Convert packed messages from one message format to another, see
+    starstruct.transcoder().
+
+    :param src: The message to convert from
+    :param dst: The message to convert to
+    :param mapping: The source field name of destination fields, or a
+        constant value for them
+    """
+    # pylint: disable=protected-access,too-many-instance-attributes
+    def __init__(self, src, dst, mapping=None):
+        self.src = src
+        self.dst = dst
+
+        mapping = dict(mapping or {})
+        for name in mapping:
+            if name not in dst._tuple._fields:
+                raise ValueError('invalid field {} for {}'.format(name, dst._name))
+
+        # The source field of each destination field, and the constants
+        self.sources = {}
+        self.constants = {}
+        for elem in dst._elements.values():
+            if not elem.name or elem.constant_bytes is not None:
+                continue
+            elif isinstance(elem, ElementCallable) and elem._pack_func is not None:
+                continue
+
+            source = mapping.get(elem.name, elem.name)
+            if not isinstance(source, str):
+                self.constants[elem.name] = source
+            elif source in src._tuple._fields:
+                self.sources[elem.name] = source
+            elif elem.name in mapping:
+                raise ValueError('invalid field {} for {}'.format(source, src._name))
+            else:
+                raise ValueError('field {} of {} has no source field or value'.format(
+                    elem.name, dst._name))
+
+        self.compiled = src.static_size is not None and dst.static_size is not None
+        if self.compiled:
+            self._compile()
+
+    def __repr__(self):
+        return 'Transcoder({}, {})'.format(self.src._name, self.dst._name)
+
+    def _compile(self):
+        src_offsets = {elem.name: (elem, pos) for (elem, pos) in self.src._layout if elem.name}
+
+        # Pack the constants into the template once
+        template = bytearray(self.dst._template)
+        for (elem, pos) in self.dst._layout:
+            if elem.name in self.constants:
+                elem.pack_into(self.constants, template, pos)
+        self.template = bytes(template)
+
+        copies = []
+        raw = []
+        self.converted = []
+        for (elem, pos) in self.dst._layout:
+            if elem.name not in self.sources:
+                continue
+
+            (src_elem, src_pos) = src_offsets[self.sources[elem.name]]
+            if _same_encoding(src_elem, elem):
+                if copies and copies[-1][1] == src_pos and copies[-1][3] == pos:
+                    # Extend the previous copy
+                    (start, _, dst_start, _) = copies[-1]
+                    copies[-1] = (start, src_pos + elem.static_size, dst_start, pos + elem.static_size)
+                else:
+                    copies.append((src_pos, src_pos + elem.static_size, pos, pos + elem.static_size))
+            elif _convertible(src_elem, elem):
+                raw.append((src_pos, src_elem._struct, pos, elem._struct))
+            else:
+                self.converted.append((src_elem, src_pos, elem, pos))
+        self.copies = copies
+
+        # Read all of the values converted with struct in one call
+        self.raw_read = None
+        self.raw_writes = []
+        if raw:
+            reads = sorted({(src_pos, src_struct.format) for (src_pos, src_struct, _, _) in raw})
+            fmt = self.src.mode.value
+            end = 0
+            for (src_pos, src_fmt) in reads:
+                fmt += '{}x{}'.format(src_pos - end, src_fmt.lstrip('@=<>!'))
+                end = src_pos + struct.calcsize(src_fmt)
+            self.raw_read = struct.Struct(fmt)
+
+            index = {src_pos: i for (i, (src_pos, _)) in enumerate(reads)}
+            self.raw_writes = [(dst_struct.pack_into, pos, index[src_pos])
+                               for (src_pos, _, pos, dst_struct) in raw]
+
+        self.callables = [elem for elem in self.dst._elements.values()
+                          if isinstance(elem, ElementCallable) and elem._pack_func is not None]
+        self.size = self.dst._prefix_size
+        self.src_size = self.src._prefix_size
+
+    def _values(self, msg):
+        """Return the values of the destination fields from a source tuple."""
+        values = dict(self.constants)
+        for (name, source) in self.sources.items():
+            values[name] = getattr(msg, source)
+        return values
+
+    def convert_into(self, buf, out, offset=0, out_offset=0):
+        """
+        Convert the message at offset in the buffer into the writable out
+        buffer at out_offset.  Returns the offsets following the source and
+        destination messages.
+        """
+        if not self.compiled:
+            (msg, end) = self.src.unpack_from(buf, offset)
+            return (end, self.dst.pack_into(out, out_offset, self._values(msg)))
+
+        out[out_offset:out_offset + self.size] = self.template
+        for (start, end, dst_start, dst_end) in self.copies:
+            out[out_offset + dst_start:out_offset + dst_end] = buf[offset + start:offset + end]
+
+        if self.raw_read is not None:
+            values = self.raw_read.unpack_from(buf, offset)
+            for (pack_into, pos, index) in self.raw_writes:
+                pack_into(out, out_offset + pos, values[index])
+
+        if self.converted:
+            ctx = types.SimpleNamespace()
+            for (src_elem, src_pos, elem, pos) in self.converted:
+                val = src_elem.unpack_from(ctx, buf, offset + src_pos)[0]
+                if isinstance(elem, ElementEnum) and isinstance(val, enum.Enum) \
+                        and not isinstance(val, elem.ref):
+                    val = val.value
+                elem.pack_into({elem.name: val}, out, out_offset + pos)
+
+        if self.callables:
+            (ctx, spans) = self.dst._spans(out, out_offset)
+            for elem in self.callables:
+                self.dst._pack_callable(elem, out, ctx, spans)
+
+        return (offset + self.src_size, out_offset + self.size)
+
+    def convert(self, buf, offset=0):
+        """Return the message at offset in the buffer converted."""
+        if not self.compiled:
+            msg = self.src.unpack_from(buf, offset)[0]
+            return self.dst.pack(self._values(msg))
+
+        out = bytearray(self.size)
+        self.convert_into(buf, out, offset)
+        return bytes(out)
+
+    def convert_many(self, buf):
+        """Convert a buffer of consecutive messages."""
+        if not self.compiled:
+            out = bytearray()
+            offset = 0
+            while offset < len(buf):
+                (msg, offset) = self.src.unpack_from(buf, offset)
+                out += self.dst.pack(self._values(msg))
+            return bytes(out)
+
+        if len(buf) % self.src_size:
+            raise ValueError('buffer size {} is not a multiple of the {} message size {}'.format(
+                len(buf), self.src._name, self.src_size))
+
+        count = len(buf) // self.src_size
+        out = bytearray(count * self.size)
+        offset = 0
+        out_offset = 0
+        for _ in range(count):
+            (offset, out_offset) = self.convert_into(buf, out, offset, out_offset)
+        return bytes(out)
+
+
+def transcoder(src, dst, mapping=None):
+    """
+    Return a Transcoder that converts packed src messages into packed dst
+    messages.
+
+    :param src: The message to convert from
+    :param dst: The message to convert to
+    :param mapping: A dictionary of destination field names and the source
+        field names or constant values for them
+    """
+    return Transcoder(src, dst, mapping)
@@ -0,0 +1,131 @@
+"""
+Views read and write the fields of a packed message directly in a buffer.
+
+.. code-block:: python
+
+    Position = Message('Position', [
+        ('x', 'i'),
+        ('y', 'i'),
+    ])
+
+    Shared = Message('Shared', [
+        ('seq', 'I'),
+        ('state', 'B', State),
+        ('position', Position),
+    ])
+
+    shm = bytearray(Shared.static_size)
+    view = Shared.view(shm)
+    view.seq += 1
+    view.state = State.running
+    view.position.x = 10
+
+Each message creates a view class with a property for each field the first
+time a view is requested, so creating a view only stores the buffer and
+offset.  Only messages with a fixed size can be viewed.
+"""
+
+import collections
+
+from starstruct.elementbase import ElementBase
+from starstruct.elementcallable import ElementCallable
+from starstruct.elementconstant import ElementConstant
+from starstruct.elementdiscriminated import ElementDiscriminated
+from starstruct.elementvariable import ElementVariable
+
+
+class View(object):
+    """
+    The base class for message views.
+
+    :param buf: The buffer that holds the packed message, it must be writable
+        (such as a bytearray, mmap or memoryview) to change fields
+    :param offset: The position of the message in the buffer
+    """
+    __slots__ = ('_buf', '_offset')
+
+    # The message and field names are set for each view class
+    _message = None
+    _fields = ()
+
+    def __init__(self, buf, offset=0):
+        self._buf = buf
+        self._offset = offset
+
+    def _asdict(self):
+        """Return the current values of all fields."""
+        return collections.OrderedDict((name, getattr(self, name)) for name in self._fields)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join(
+            '{}={!r}'.format(name, getattr(self, name)) for name in self._fields))
+
+
+def _accessor(elem, offset):
+    """Create the property that accesses an element at offset."""
+    if isinstance(elem, ElementBase):
+        # The struct value does not need to be converted
+        unpack_from = elem._struct.unpack_from  # pylint: disable=protected-access
+        pack_into = elem._struct.pack_into  # pylint: disable=protected-access
+
+        def get_base(self):
+            return unpack_from(self._buf, self._offset + offset)[0]
+
+        def set_base(self, value):
+            pack_into(self._buf, self._offset + offset, value)
+
+        return property(get_base, set_base)
+
+    elif isinstance(elem, ElementVariable):
+        fmt = elem.format
+        size = fmt.static_size
+
+        def get_variable(self):
+            if elem.list_return:
+                return [fmt.view(self._buf, self._offset + offset + i * size)
+                        for i in range(elem.ref)]
+            return fmt.view(self._buf, self._offset + offset)
+
+        return property(get_variable)
+
+    elif isinstance(elem, ElementCallable):
+        # The value is not verified, since that requires the values of the
+        # other fields
+        unpack_from = elem._struct.unpack_from  # pylint: disable=protected-access
+
+        def get_callable(self):
+            ret = unpack_from(self._buf, self._offset + offset)
+            return ret[0] if len(ret) == 1 else ret
+
+        return property(get_callable)
+
+    def get_value(self):
+        return elem.unpack_from(self, self._buf, self._offset + offset)[0]
+
+    if isinstance(elem, (ElementConstant, ElementDiscriminated)):
+        return property(get_value)
+
+    def set_value(self, value):
+        elem.pack_into({elem.name: value}, self._buf, self._offset + offset)
+
+    return property(get_value, set_value)
+
+
+# pylint: disable=protected-access
+def view_class(message):
+    """
+    Create a View subclass with a property for each field of the message.
+    """
+    if message.static_size is None:
+        raise TypeError('message {} does not have a fixed size'.format(message._name))
+
+    attrs = {
+        '__slots__': (),
+        '_message': message,
+        '_fields': message._tuple._fields,
+    }
+    for (elem, offset) in message._layout:
+        if elem.name:
+            attrs[elem.name] = _accessor(elem, offset)
+
+    return type(message._name + 'View', (View,), attrs)